@@ -1,6 +1,7 @@
 import pandas as pd
 import os
 import json
+from gold_ranking_store import GoldRankingStore
 
 gold = r'c:\Users\Claiton\Documents\GitHub\Conjunto de Dados Financeiros da Empresa\data\03_gold'
 
@@ -20,23 +21,22 @@ data['unidades_vendidas'] = int(fato['unidades_vendidas'].sum())
 data['cpv'] = float(fato['custo_produtos_vendidos'].sum())
 data['ticket_medio'] = float(fato['receita_liquida'].sum() / fato['unidades_vendidas'].sum())
 
+# Rankings (pré-calculados; aplica apenas a cauda nova do fato)
+dir_rankings = os.path.join(gold, '_rankings')
+rankings = GoldRankingStore.carregar(dir_rankings) or GoldRankingStore()
+if rankings.sincronizar(fato, tempo):
+    rankings.salvar(dir_rankings)
+
 # Por Pais
-m = fato.merge(geo, on='geografia_sk')
-by_c = m.groupby('pais').agg({'receita_liquida':'sum','lucro':'sum'}).sort_values('receita_liquida', ascending=False).reset_index()
-data['por_pais'] = by_c.to_dict('records')
+by_c = rankings.tabela_ranking('pais', 'receita_liquida', geo)
+data['por_pais'] = by_c[['pais','receita_liquida','lucro']].to_dict('records')
 
 # Por Segmento
-m2 = fato.merge(seg, on='segmento_sk')
-by_s = m2.groupby('nome_segmento').agg({'receita_liquida':'sum'}).sort_values('receita_liquida', ascending=False).reset_index()
-data['por_segmento'] = by_s.to_dict('records')
+by_s = rankings.tabela_ranking('segmento', 'receita_liquida', seg)
+data['por_segmento'] = by_s[['nome_segmento','receita_liquida']].to_dict('records')
 
 # Por Produto
-m3 = fato.merge(prod, on='produto_sk')
-by_p = m3.groupby('nome_produto').agg({
-    'receita_liquida':'sum',
-    'lucro':'sum',
-    'unidades_vendidas':'sum'
-}).sort_values('receita_liquida', ascending=False).reset_index()
+by_p = rankings.tabela_ranking('produto', 'receita_liquida', prod)[['nome_produto','receita_liquida','lucro','unidades_vendidas']]
 by_p['nome_produto'] = by_p['nome_produto'].str.strip()
 by_p['margem'] = by_p['lucro'] / by_p['receita_liquida'] * 100
 data['por_produto'] = by_p.to_dict('records')
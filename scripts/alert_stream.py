@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLUXO DE ALERTAS NDJSON - SEGMENTOS ROTATIVOS COM ÍNDICE
+Data Reliability Engineer (SRE) - Financial Data Fortress 2026
+
+Autor: Data Reliability Engineer (SRE)
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Cada execução do monitor gravava um JSON avulso em outputs/alerts; quem
+consumia alertas precisava listar o diretório e reler arquivos inteiros.
+Este módulo mantém um fluxo append-only por pipeline:
+- Um alerta por linha (NDJSON) com número de sequência (seq) crescente
+- Segmentos rotativos (alertas_000001.ndjson, ...) limitados em bytes;
+  os mais antigos saem após MAX_SEGMENTOS_ALERTAS
+- Índice pequeno (indice.json): por segmento, faixa de seq, linhas,
+  bytes confirmados e contagem por severidade
+- Leitura incremental: ler(apos_seq) abre só os segmentos com seq novos
+
+CONSISTÊNCIA:
+- O índice é o ponto de commit: bytes além do tamanho indexado (append
+  interrompido) são truncados antes do próximo append e ignorados na leitura
+- Lotes de uma execução chegam como arquivo NDJSON em _lotes/ (publicado
+  pelo commit da execução) e são aplicados depois do commit
+  (aplicar_pendentes); o id da última execução aplicada torna a aplicação
+  idempotente
+- Um escritor por fluxo: anexar/aplicar_pendentes são chamados com a
+  trava do pipeline (metadata_store) adquirida; leitores não travam
+
+GROUNDING SOURCE:
+- data_reliability_monitor.py (gerar_relatorio_alertas, ExecucaoTransacional)
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+DIR_ALERTAS = "outputs/alerts/stream"
+
+# Rotação: novo segmento ao passar deste tamanho; retenção em segmentos
+TAMANHO_SEGMENTO_ALERTAS = 8 * 1024 * 1024
+MAX_SEGMENTOS_ALERTAS = 32
+
+INTERVALO_SEGUIR_S = 2.0
+
+# ========================================
+# MÓDULO 1: FLUXO DE ALERTAS
+# ========================================
+
+class FluxoAlertas:
+    """
+    Fluxo append-only de alertas em segmentos NDJSON rotativos.
+
+    Parameters
+    ----------
+    diretorio : str
+        Diretório do fluxo (um por pipeline)
+
+    Examples
+    --------
+    >>> fluxo = FluxoAlertas("outputs/alerts/stream/silver_to_gold")
+    >>> fluxo.anexar([{'tipo': 'ANOMALIA_LUCRO', 'severidade': 'ALTA'}])
+    (1, 1)
+    >>> alertas, ultimo_seq = fluxo.ler(apos_seq=0)
+    """
+
+    def __init__(self, diretorio, tamanho_segmento=TAMANHO_SEGMENTO_ALERTAS,
+                 max_segmentos=MAX_SEGMENTOS_ALERTAS):
+        self.diretorio = Path(diretorio)
+        self.tamanho_segmento = tamanho_segmento
+        self.max_segmentos = max_segmentos
+        self.caminho_indice = self.diretorio / "indice.json"
+        self.indice = self._carregar_indice()
+
+    def _carregar_indice(self):
+        """Índice do fluxo (vazio se ainda não existe)."""
+        if self.caminho_indice.exists():
+            with open(self.caminho_indice, encoding='utf-8') as f:
+                return json.load(f)
+        return {'proximo_seq': 1, 'ultima_execucao': None, 'segmentos': []}
+
+    def _salvar_indice(self):
+        """Grava o índice de forma atômica (arquivo temporário + rename)."""
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        # Nome único: um temporário nunca é renomeado por outro processo
+        temporario = self.caminho_indice.with_name(f"indice.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.indice, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho_indice)
+
+    def _segmento_para_escrita(self, bytes_novos):
+        """Segmento corrente (truncado ao tamanho indexado) ou um novo, se cheio."""
+        segmentos = self.indice['segmentos']
+        if segmentos:
+            # Bytes além do índice: append anterior não confirmado
+            caminho = self.diretorio / segmentos[-1]['arquivo']
+            if caminho.exists() and caminho.stat().st_size > segmentos[-1]['bytes']:
+                os.truncate(caminho, segmentos[-1]['bytes'])
+            if segmentos[-1]['bytes'] + bytes_novos <= self.tamanho_segmento:
+                return segmentos[-1]
+
+        numero = int(segmentos[-1]['arquivo'][8:14]) + 1 if segmentos else 1
+        segmento = {
+            'arquivo': f"alertas_{numero:06d}.ndjson",
+            'primeiro_seq': self.indice['proximo_seq'],
+            'ultimo_seq': self.indice['proximo_seq'] - 1,
+            'linhas': 0,
+            'bytes': 0,
+            'criticas': 0,
+            'altas': 0,
+            'inicio': datetime.now().isoformat(),
+            'fim': None
+        }
+        (self.diretorio / segmento['arquivo']).unlink(missing_ok=True)
+        segmentos.append(segmento)
+        return segmento
+
+    def _aplicar_retencao(self):
+        """Tira do índice os segmentos além de max_segmentos; retorna os removidos."""
+        segmentos = self.indice['segmentos']
+        excedentes = max(len(segmentos) - self.max_segmentos, 0)
+        removidos, self.indice['segmentos'] = segmentos[:excedentes], segmentos[excedentes:]
+        return removidos
+
+    def anexar_linhas(self, linhas, execucao_id=None):
+        """
+        Anexa alertas já serializados (uma linha JSON de objeto cada).
+
+        Parameters
+        ----------
+        linhas : list
+            Objetos JSON (str, sem quebra de linha)
+        execucao_id : str, optional
+            Execução de origem; reaplicar a última execução não duplica
+
+        Returns
+        -------
+        tuple or None
+            (primeiro_seq, ultimo_seq) ou None se nada foi anexado
+        """
+        # Índice relido: outro processo pode ter anexado desde a última leitura
+        self.indice = self._carregar_indice()
+        if not linhas or (execucao_id is not None and execucao_id == self.indice['ultima_execucao']):
+            return None
+
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        primeiro_seq = self.indice['proximo_seq']
+        origem = json.dumps(execucao_id)
+
+        # seq/execucao_id entram no início do objeto sem reserializar o alerta
+        blocos = [
+            f'{{"seq": {primeiro_seq + i}, "execucao_id": {origem}, {linha.strip()[1:]}\n'.encode('utf-8')
+            for i, linha in enumerate(linhas)
+        ]
+        dados = b''.join(blocos)
+        criticas = sum(1 for linha in linhas if '"severidade": "CRÍTICA"' in linha)
+        altas = sum(1 for linha in linhas if '"severidade": "ALTA"' in linha)
+
+        segmento = self._segmento_para_escrita(len(dados))
+        with open(self.diretorio / segmento['arquivo'], 'ab') as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+
+        ultimo_seq = primeiro_seq + len(linhas) - 1
+        segmento.update(
+            ultimo_seq=ultimo_seq,
+            linhas=segmento['linhas'] + len(linhas),
+            bytes=segmento['bytes'] + len(dados),
+            criticas=segmento['criticas'] + criticas,
+            altas=segmento['altas'] + altas,
+            fim=datetime.now().isoformat()
+        )
+        self.indice['proximo_seq'] = ultimo_seq + 1
+        self.indice['ultima_execucao'] = execucao_id
+        removidos = self._aplicar_retencao()
+        self._salvar_indice()
+        # Arquivos apagados só depois que o índice deixa de apontar para eles
+        for antigo in removidos:
+            (self.diretorio / antigo['arquivo']).unlink(missing_ok=True)
+
+        return primeiro_seq, ultimo_seq
+
+    def anexar(self, alertas, execucao_id=None):
+        """Anexa alertas (dicts) ao fluxo; ver anexar_linhas."""
+        return self.anexar_linhas([json.dumps(alerta, ensure_ascii=False) for alerta in alertas], execucao_id)
+
+    def caminho_lote(self, execucao_id):
+        """Destino do lote NDJSON de uma execução (aplicado por aplicar_pendentes)."""
+        return str(self.diretorio / "_lotes" / f"{execucao_id}.ndjson")
+
+    def aplicar_pendentes(self):
+        """
+        Anexa ao fluxo os lotes publicados em _lotes/ e os remove.
+
+        Deve ser chamado com a trava do pipeline adquirida. Um lote que
+        some entre a listagem e a leitura (já consumido) é ignorado.
+
+        Returns
+        -------
+        list
+            [(execucao_id, primeiro_seq, ultimo_seq)] dos lotes anexados
+        """
+        lotes = []
+        for lote in (self.diretorio / "_lotes").glob("*.ndjson"):
+            try:
+                lotes.append((lote.stat().st_mtime_ns, lote))
+            except FileNotFoundError:
+                continue
+
+        aplicados = []
+        for _, lote in sorted(lotes):
+            try:
+                with open(lote, encoding='utf-8') as f:
+                    linhas = [linha for linha in f if linha.strip()]
+            except FileNotFoundError:
+                continue
+            faixa = self.anexar_linhas(linhas, execucao_id=lote.stem)
+            if faixa is not None:
+                aplicados.append((lote.stem, *faixa))
+            lote.unlink(missing_ok=True)
+        return aplicados
+
+    def ler(self, apos_seq=0, limite=None):
+        """
+        Alertas com seq > apos_seq (leitura incremental).
+
+        Só os segmentos cuja faixa de seq alcança apos_seq são abertos, e
+        cada um apenas até o tamanho confirmado no índice.
+
+        Returns
+        -------
+        tuple
+            (alertas: list de dicts, último seq lido)
+        """
+        self.indice = self._carregar_indice()
+        alertas = []
+        ultimo_seq = apos_seq
+
+        for segmento in self.indice['segmentos']:
+            if segmento['ultimo_seq'] <= apos_seq:
+                continue
+            try:
+                with open(self.diretorio / segmento['arquivo'], 'rb') as f:
+                    dados = f.read(segmento['bytes'])
+            except FileNotFoundError:
+                continue  # removido pela retenção depois da leitura do índice
+            for linha in dados.splitlines():
+                alerta = json.loads(linha)
+                if alerta['seq'] <= apos_seq:
+                    continue
+                alertas.append(alerta)
+                ultimo_seq = alerta['seq']
+                if limite is not None and len(alertas) >= limite:
+                    return alertas, ultimo_seq
+
+        return alertas, ultimo_seq
+
+    def seguir(self, apos_seq=0, intervalo_s=INTERVALO_SEGUIR_S):
+        """Gerador de alertas novos (como tail -f), consultando o índice a cada intervalo."""
+        while True:
+            alertas, apos_seq = self.ler(apos_seq)
+            yield from alertas
+            if not alertas:
+                time.sleep(intervalo_s)
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Lê (ou acompanha) o fluxo de alertas de um pipeline.
+
+    USO:
+        python alert_stream.py [pipeline] [--desde SEQ] [--seguir]
+
+    OUTPUT:
+        - Console (um alerta por linha)
+    """
+
+    pipeline = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith('--') else "silver_to_gold"
+    desde = int(sys.argv[sys.argv.index('--desde') + 1]) if '--desde' in sys.argv else 0
+
+    fluxo = FluxoAlertas(str(Path(DIR_ALERTAS) / pipeline))
+
+    print("=" * 80)
+    print(f"ALERT STREAM - {pipeline}")
+    print("=" * 80)
+    for segmento in fluxo.indice['segmentos']:
+        print(f"📁 {segmento['arquivo']}: seq {segmento['primeiro_seq']}-{segmento['ultimo_seq']} "
+              f"({segmento['linhas']:,} alertas, {segmento['criticas']:,} críticas, {segmento['bytes']:,} bytes)")
+    print()
+
+    def imprimir(alerta):
+        valores = alerta.get('valores', {})
+        print(f"#{alerta['seq']:<8} {alerta.get('severidade', '-'):<8} {alerta.get('pais', '-')} / "
+              f"{str(alerta.get('produto', '-')).strip()} {alerta.get('data_transacao', '')} "
+              f"lucro {valores.get('lucro_atual', 0):,.2f} ({valores.get('variacao_percentual', 0):+.1f}%)")
+
+    try:
+        if '--seguir' in sys.argv:
+            for alerta in fluxo.seguir(desde):
+                imprimir(alerta)
+        else:
+            alertas, ultimo_seq = fluxo.ler(desde)
+            for alerta in alertas:
+                imprimir(alerta)
+            print(f"\n✅ {len(alertas)} alertas após seq {desde} (último seq: {ultimo_seq})")
+    except KeyboardInterrupt:
+        pass
+
+    sys.exit(0)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK DE VALIDAÇÃO DO DATA CONTRACT
+Data Reliability Engineer (SRE) - Financial Data Fortress 2026
+
+Autor: Data Reliability Engineer (SRE)
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Medir a vazão (registros/s) de cada backend de
+DataContractValidator.validar_lote sobre lotes sintéticos de 10K, 1M e 10M
+registros, gerados pela repetição da Camada Silver:
+- vetorizado: máscaras colunares + Pydantic só nas linhas reprovadas
+- pydantic_linha: FinancialRecordContract(**row.to_dict()) por linha
+- pydantic_lote: TypeAdapter(list[FinancialRecordContract]) em lotes
+
+Backends cuja duração estimada (pela vazão no tamanho anterior) excede
+TEMPO_MAXIMO_EXECUCAO são medidos sobre um prefixo do lote; o relatório
+indica quantos registros foram efetivamente avaliados.
+
+GROUNDING SOURCE:
+- data_reliability_monitor.py (DataContractValidator, BACKENDS_CONTRATO)
+- data/02_silver/Financials_Silver.csv
+"""
+
+import pandas as pd
+import numpy as np
+import contextlib
+import io
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from data_reliability_monitor import DataContractValidator, BACKENDS_CONTRATO, CAMINHO_DADOS
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+TAMANHOS_PADRAO = [10_000, 1_000_000, 10_000_000]
+
+TEMPO_MAXIMO_EXECUCAO = 300  # segundos por (backend, tamanho)
+
+CAMINHO_RELATORIO = "outputs/benchmarks/contract_validation_{timestamp}.json"
+
+# ========================================
+# MÓDULO 1: GERAÇÃO DE LOTES
+# ========================================
+
+def gerar_lote(base, tamanho):
+    """
+    Lote sintético com `tamanho` registros (repetição cíclica da base).
+
+    A coluna date é convertida para datetime, como na carga incremental do
+    monitor (IncrementalLoader.carregar_incremental).
+    """
+    base = base.copy()
+    base['date'] = pd.to_datetime(base['date'])
+    posicoes = np.resize(np.arange(len(base)), tamanho)
+    return base.iloc[posicoes].reset_index(drop=True)
+
+# ========================================
+# MÓDULO 2: MEDIÇÃO
+# ========================================
+
+def medir_backend(df, backend):
+    """
+    Executa validar_lote silenciosamente e mede a vazão.
+
+    Returns
+    -------
+    dict
+        registros, validos, invalidos, segundos, registros_por_segundo
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        df_valido, df_invalido, _ = DataContractValidator.validar_lote(df, backend=backend)
+        duracao = time.perf_counter() - inicio
+
+    return {
+        'registros': len(df),
+        'validos': len(df_valido),
+        'invalidos': len(df_invalido),
+        'segundos': round(duracao, 4),
+        'registros_por_segundo': round(len(df) / duracao, 1) if duracao > 0 else None
+    }
+
+
+def executar_benchmark(tamanhos, caminho_base=CAMINHO_DADOS):
+    """
+    Mede todos os backends em todos os tamanhos.
+
+    Returns
+    -------
+    list
+        Uma entrada por (tamanho, backend)
+    """
+
+    base = pd.read_csv(caminho_base)
+    lote_maximo = gerar_lote(base, max(tamanhos))
+    vazao_anterior = {}
+    resultados = []
+
+    for tamanho in sorted(tamanhos):
+        for backend in BACKENDS_CONTRATO:
+            avaliar = tamanho
+            vazao = vazao_anterior.get(backend)
+            if vazao and tamanho / vazao > TEMPO_MAXIMO_EXECUCAO:
+                avaliar = max(int(vazao * TEMPO_MAXIMO_EXECUCAO), 1)
+
+            medicao = medir_backend(lote_maximo.iloc[:avaliar], backend)
+            medicao.update({'tamanho': tamanho, 'backend': backend, 'amostra': avaliar < tamanho})
+            resultados.append(medicao)
+            vazao_anterior[backend] = medicao['registros_por_segundo']
+
+            sufixo = f" (amostra de {avaliar:,})" if avaliar < tamanho else ""
+            print(f"   {tamanho:>12,} | {backend:<15} | {medicao['registros_por_segundo']:>14,.0f} reg/s | "
+                  f"{medicao['segundos']:>9.2f}s{sufixo}")
+
+    return resultados
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Benchmark dos backends de validação do contrato.
+
+    USO:
+        python benchmark_contract_validation.py [tamanho ...]
+
+    OUTPUT:
+        - outputs/benchmarks/contract_validation_*.json
+    """
+
+    tamanhos = [int(a) for a in sys.argv[1:]] or TAMANHOS_PADRAO
+
+    print("=" * 80)
+    print("BENCHMARK - Validação do Data Contract (registros/s)")
+    print("=" * 80)
+    print(f"Tamanhos: {', '.join(f'{t:,}' for t in tamanhos)}")
+    print(f"Backends: {', '.join(BACKENDS_CONTRATO)}\n")
+
+    resultados = executar_benchmark(tamanhos)
+
+    Path("outputs/benchmarks").mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    caminho = CAMINHO_RELATORIO.format(timestamp=timestamp)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'tempo_maximo_execucao': TEMPO_MAXIMO_EXECUCAO,
+            'resultados': resultados
+        }, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✅ Relatório salvo: {caminho}")
+
+    sys.exit(0)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRÉ-VARREDURA DE BYTES - CAMADA BRONZE
+Senior Data Quality Engineer - Financial Data Fortress 2026
+
+Autor: Senior Data Quality Engineer
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING | RULE_SECURITY_FIRST
+
+OBJETIVO:
+Varrer o CSV Bronze byte a byte (mmap + numpy, em blocos) ANTES do parse do
+pandas, para provar que a família "caracteres invisíveis" não pode falhar
+ou, se puder, restringir a verificação por coluna às linhas afetadas.
+
+BYTES SUSPEITOS:
+- nao_ascii: bytes >= 0x80 (inclui NBSP U+00A0 e zero-width space U+200B)
+- tab / carriage_return / controle: bytes < 0x20 (exceto \\n) e 0x7F
+- espacos_multiplos: dois espaços consecutivos
+- espaco_borda: espaço no início/fim de campo (adjacente a ',', '"',
+  quebra de linha ou início/fim do arquivo)
+
+ANOMALIAS DE ENCODING:
+- BOM UTF-8 no início do arquivo
+- Sequências UTF-8 inválidas (offset do primeiro erro)
+
+O cabeçalho (linha 1) é reportado à parte ('cabecalho_suspeito'): as
+expectations avaliam valores, e o schema exige nomes como " Sales".
+'limpo' considera apenas as linhas de dados e o encoding.
+
+MAPEAMENTO LINHA → REGISTRO:
+Linha física N corresponde ao registro N-2 do DataFrame (linha 1 = cabeçalho).
+Se houver campos multilinha (aspas abertas atravessando \\n), linhas em
+branco (vazias ou só com espaços/tabs, que o pandas pula) ou CR, o
+mapeamento não é garantido e a verificação completa por coluna é exigida.
+
+GROUNDING SOURCE:
+- validate_bronze_quality.py (EXPECTATION CUSTOMIZADA 4)
+- RELATORIO_AUDITORIA_BRONZE.md (caracteres invisíveis)
+"""
+
+import numpy as np
+import codecs
+import mmap
+import json
+import sys
+from pathlib import Path
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+CAMINHO_CSV = "data/01_bronze/Financials.csv"
+
+TAMANHO_BLOCO = 64 * 1024 * 1024  # 64 MB por bloco
+
+LIMITE_AMOSTRAS = 20
+
+BYTE_NOVA_LINHA = 0x0A
+BYTE_CR = 0x0D
+BYTE_TAB = 0x09
+BYTE_ESPACO = 0x20
+BYTE_ASPAS = 0x22
+BYTE_VIRGULA = 0x2C
+
+BOM_UTF8 = b'\xef\xbb\xbf'
+
+# Bytes de uma linha "em branco" para o pandas (skip_blank_lines)
+BYTES_BRANCOS = np.array([BYTE_ESPACO, BYTE_TAB, BYTE_CR, BYTE_NOVA_LINHA], dtype=np.uint8)
+
+# ========================================
+# MÓDULO 1: PRÉ-VARREDURA
+# ========================================
+
+class BronzeBytePrescan:
+    """
+    Pré-varredura de bytes suspeitos com offsets e números de linha.
+
+    Examples
+    --------
+    >>> prescan = BronzeBytePrescan(CAMINHO_CSV)
+    >>> relatorio = prescan.executar()
+    >>> prescan.linhas_dataframe()   # None = verificação completa
+    """
+
+    def __init__(self, caminho_csv, tamanho_bloco=TAMANHO_BLOCO):
+        self.caminho_csv = caminho_csv
+        self.tamanho_bloco = tamanho_bloco
+        self.linhas_afetadas = np.array([], dtype=np.int64)
+        self.relatorio = None
+
+    @staticmethod
+    def _classificar_bloco(janela, inicio_rel, fim_rel, inicio_arquivo, fim_arquivo):
+        """
+        Máscaras de bytes suspeitos em janela[inicio_rel:fim_rel].
+
+        A janela inclui 1 byte de contexto de cada lado (quando existe) para
+        avaliar espaços de borda entre blocos.
+        """
+
+        bloco = janela[inicio_rel:fim_rel]
+
+        anterior = np.empty_like(bloco)
+        posterior = np.empty_like(bloco)
+        anterior[1:] = bloco[:-1]
+        posterior[:-1] = bloco[1:]
+        # Bordas: contexto da janela ou início/fim do arquivo (tratado como \n)
+        anterior[0] = janela[inicio_rel - 1] if inicio_rel > 0 else BYTE_NOVA_LINHA
+        posterior[-1] = janela[fim_rel] if fim_rel < len(janela) else BYTE_NOVA_LINHA
+        if inicio_arquivo:
+            anterior[0] = BYTE_NOVA_LINHA
+        if fim_arquivo:
+            posterior[-1] = BYTE_NOVA_LINHA
+
+        espaco = bloco == BYTE_ESPACO
+        delimitador_anterior = ((anterior == BYTE_VIRGULA) | (anterior == BYTE_ASPAS)
+                                | (anterior == BYTE_NOVA_LINHA) | (anterior == BYTE_CR))
+        delimitador_posterior = ((posterior == BYTE_VIRGULA) | (posterior == BYTE_ASPAS)
+                                 | (posterior == BYTE_NOVA_LINHA) | (posterior == BYTE_CR))
+
+        controle = ((bloco < BYTE_ESPACO) | (bloco == 0x7F)) & (bloco != BYTE_NOVA_LINHA)
+
+        return {
+            'nao_ascii': bloco >= 0x80,
+            'tab': bloco == BYTE_TAB,
+            'carriage_return': bloco == BYTE_CR,
+            'controle': controle & (bloco != BYTE_TAB) & (bloco != BYTE_CR),
+            'espacos_multiplos': espaco & (posterior == BYTE_ESPACO),
+            'espaco_borda': espaco & (delimitador_anterior | delimitador_posterior)
+        }
+
+    def _validar_utf8(self, buffer):
+        """Offset do primeiro byte UTF-8 inválido (ou None)."""
+        decodificador = codecs.getincrementaldecoder('utf-8')(errors='strict')
+        for inicio in range(0, len(buffer), self.tamanho_bloco):
+            fim = min(inicio + self.tamanho_bloco, len(buffer))
+            # Bytes de sequência incompleta herdados do bloco anterior
+            pendentes = len(decodificador.getstate()[0])
+            try:
+                decodificador.decode(buffer[inicio:fim], final=(fim == len(buffer)))
+            except UnicodeDecodeError as e:
+                return inicio - pendentes + e.start
+        return None
+
+    def executar(self):
+        """
+        Executa a pré-varredura.
+
+        Returns
+        -------
+        dict
+            Relatório com ocorrências por tipo, amostras (offset, linha),
+            linhas afetadas e anomalias de encoding
+        """
+
+        tamanho = Path(self.caminho_csv).stat().st_size
+        ocorrencias = {}
+        offsets_amostra = []
+        linhas_afetadas = []
+        total_linhas = 0
+        aspas_acumuladas = 0
+        multilinha = False
+        linha_em_branco = False
+        # Offsets globais do último \n e do último byte fora de espaço/tab/\r/\n
+        ultima_quebra = -1
+        ultimo_conteudo = -1
+        possui_nao_ascii = False
+
+        with open(self.caminho_csv, 'rb') as f:
+            if tamanho == 0:
+                buffer = np.zeros(0, dtype=np.uint8)
+                mapa = None
+            else:
+                mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                buffer = np.frombuffer(mapa, dtype=np.uint8)
+
+            for inicio in range(0, tamanho, self.tamanho_bloco):
+                fim = min(inicio + self.tamanho_bloco, tamanho)
+                janela_ini = max(inicio - 1, 0)
+                janela = buffer[janela_ini:min(fim + 1, tamanho)]
+                inicio_rel = inicio - janela_ini
+                fim_rel = inicio_rel + (fim - inicio)
+
+                bloco = janela[inicio_rel:fim_rel]
+                quebras = np.flatnonzero(bloco == BYTE_NOVA_LINHA)
+
+                # Campos multilinha: \n com número ímpar de aspas antes dele
+                aspas = np.flatnonzero(bloco == BYTE_ASPAS)
+                if len(aspas) or aspas_acumuladas % 2:
+                    paridade = (aspas_acumuladas + np.searchsorted(aspas, quebras)) % 2
+                    multilinha = multilinha or bool(paridade.any())
+                aspas_acumuladas += len(aspas)
+
+                # Linhas em branco (vazias ou só espaços/tabs/\r, que o pandas
+                # pula): nenhum byte de conteúdo desde o \n anterior
+                conteudo = np.flatnonzero(~np.isin(bloco, BYTES_BRANCOS))
+                if len(quebras):
+                    conteudos_globais = np.concatenate(([ultimo_conteudo], inicio + conteudo))
+                    conteudo_anterior = conteudos_globais[np.searchsorted(conteudo, quebras)]
+                    quebra_anterior = np.concatenate(([ultima_quebra], inicio + quebras[:-1]))
+                    linha_em_branco = linha_em_branco or bool((conteudo_anterior <= quebra_anterior).any())
+                    ultima_quebra = inicio + int(quebras[-1])
+                if len(conteudo):
+                    ultimo_conteudo = inicio + int(conteudo[-1])
+
+                mascaras = self._classificar_bloco(janela, inicio_rel, fim_rel, inicio == 0, fim == tamanho)
+
+                # Blocos em ordem de offset: amostras completas não mudam mais
+                coletar_amostras = len(offsets_amostra) < LIMITE_AMOSTRAS
+
+                suspeitos = np.zeros(len(bloco), dtype=bool)
+                for tipo, mascara in mascaras.items():
+                    contagem = int(mascara.sum())
+                    if contagem:
+                        ocorrencias[tipo] = ocorrencias.get(tipo, 0) + contagem
+                        suspeitos |= mascara
+                        if coletar_amostras:
+                            posicoes_tipo = np.flatnonzero(mascara)[:LIMITE_AMOSTRAS]
+                            linhas_tipo = total_linhas + 1 + np.searchsorted(quebras, posicoes_tipo)
+                            for posicao, linha in zip(posicoes_tipo, linhas_tipo):
+                                offsets_amostra.append((inicio + int(posicao), int(linha), tipo))
+
+                offsets_amostra = sorted(offsets_amostra)[:LIMITE_AMOSTRAS]
+
+                possui_nao_ascii = possui_nao_ascii or 'nao_ascii' in ocorrencias
+
+                posicoes = np.flatnonzero(suspeitos)
+                if len(posicoes):
+                    # Linha (1-based) = 1 + número de \n antes do offset
+                    linhas_afetadas.append(np.unique(total_linhas + 1 + np.searchsorted(quebras, posicoes)))
+
+                total_linhas += len(quebras)
+
+            bom = tamanho >= 3 and bytes(buffer[:3]) == BOM_UTF8
+            utf8_invalido = self._validar_utf8(mapa) if (possui_nao_ascii and mapa is not None) else None
+
+            # Liberar views numpy antes de fechar o mmap
+            buffer = janela = bloco = None
+            if mapa is not None:
+                mapa.close()
+
+        # Última linha sem \n final também conta
+        if tamanho and not self._termina_com_quebra():
+            total_linhas += 1
+            linha_em_branco = linha_em_branco or ultimo_conteudo <= ultima_quebra
+
+        self.linhas_afetadas = (np.unique(np.concatenate(linhas_afetadas))
+                                if linhas_afetadas else np.array([], dtype=np.int64))
+        linhas_dados = self.linhas_afetadas[self.linhas_afetadas >= 2]
+
+        # Amostras ordenadas por offset
+        amostras = [
+            {'offset': offset, 'linha': linha, 'tipo': tipo}
+            for offset, linha, tipo in offsets_amostra
+        ]
+
+        self.relatorio = {
+            'arquivo': self.caminho_csv,
+            'total_bytes': tamanho,
+            'total_linhas': total_linhas,
+            'limpo': len(linhas_dados) == 0 and not bom and utf8_invalido is None,
+            'ocorrencias': ocorrencias,
+            'linhas_afetadas': int(len(linhas_dados)),
+            'cabecalho_suspeito': bool((self.linhas_afetadas == 1).any()),
+            'amostras': amostras,
+            'bom_utf8': bool(bom),
+            'offset_utf8_invalido': utf8_invalido,
+            'campos_multilinha': multilinha,
+            'linhas_em_branco': bool(linha_em_branco),
+            'requer_verificacao_completa': bool(multilinha or linha_em_branco or 'carriage_return' in ocorrencias)
+        }
+        return self.relatorio
+
+    def _termina_com_quebra(self):
+        with open(self.caminho_csv, 'rb') as f:
+            f.seek(-1, 2)
+            return f.read(1) == b'\n'
+
+    def linhas_dataframe(self):
+        """
+        Posições (0-based) dos registros do DataFrame com bytes suspeitos.
+
+        Returns
+        -------
+        np.ndarray or None
+            None quando o mapeamento linha → registro não é garantido
+            (verificação completa necessária)
+        """
+        if self.relatorio is None:
+            self.executar()
+        if self.relatorio['requer_verificacao_completa']:
+            return None
+        linhas = self.linhas_afetadas[self.linhas_afetadas >= 2] - 2
+        return linhas.astype(np.int64)
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Pré-varredura de bytes do CSV Bronze.
+
+    USO:
+        python bronze_byte_prescan.py [caminho_csv]
+
+    RETORNO:
+        0: Arquivo limpo (família "caracteres invisíveis" pode ser pulada)
+        1: Bytes suspeitos encontrados
+    """
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else CAMINHO_CSV
+
+    print("=" * 80)
+    print("BRONZE BYTE PRESCAN - Caracteres Invisíveis e Encoding")
+    print("=" * 80)
+    print(f"Arquivo: {caminho}\n")
+
+    prescan = BronzeBytePrescan(caminho)
+    relatorio = prescan.executar()
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+    if relatorio['limpo']:
+        print("\n✅ Nenhum byte suspeito - validação de caracteres invisíveis dispensada\n")
+    else:
+        print(f"\n⚠️ {relatorio['linhas_afetadas']} linhas com bytes suspeitos\n")
+
+    sys.exit(0 if relatorio['limpo'] else 1)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTOR FUNDIDO DE EXPECTATIONS - CAMADA BRONZE
+Senior Data Quality Engineer - Financial Data Fortress 2026
+
+Autor: Senior Data Quality Engineer
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING | RULE_INDIAN_NUM_SYSTEM
+
+OBJETIVO:
+Substituir as dezenas de passadas completas de CustomFinancialExpectations
+(astype(str) + str.contains por regra e por coluna; 7 regexes de caracteres
+invisíveis em cada uma das 16 colunas) por uma única varredura por coluna:
+1. Fatoração da coluna (uma passada) → códigos + valores únicos
+2. Regex combinado (união das regras da coluna) avaliado só nos únicos
+3. Regras individuais apenas nos únicos que casaram com o combinado
+4. Bitmask por único → bitmask por linha via códigos (gather numpy)
+Todos os contadores e amostras de todas as regras saem da mesma varredura.
+
+Os acumuladores são mergeáveis: o motor pode processar o arquivo em lotes
+(chunks) e o resultado final é idêntico ao processamento em bloco único.
+
+SEMÂNTICA:
+Os padrões são as regras regex_proibido declaradas em rules.json
+(rule_compiler.padroes_regex), compartilhadas com
+validate_bronze_quality.CustomFinancialExpectations; o formato de retorno é
+o mesmo (mesmo str.contains, mesmas amostras na ordem das linhas).
+Contagens são sempre int nativo. O tempo de execução é medido por regra
+(tempos_regras) e para a varredura compartilhada (tempo_varredura).
+
+GROUNDING SOURCE:
+- rules.json (data_validation_rules)
+- validate_bronze_quality.py (CustomFinancialExpectations)
+- RELATORIO_AUDITORIA_BRONZE.md (Seção 3.1 - Anomalias Críticas)
+"""
+
+import pandas as pd
+import numpy as np
+import time
+
+from rule_compiler import padroes_regex
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+# Regra → padrões (nome, regex), declarados em rules.json (regex_proibido)
+REGRAS_EXPECTATIVA = padroes_regex()
+
+# Regras que reportam contagem por sub-padrão ('invisible_chars_found')
+REGRAS_COM_DETALHE = {'invisible_characters'}
+
+# Bitfield de motivos por linha (quarentena por linha)
+CODIGOS_MOTIVO = {regra: 1 << indice for indice, regra in enumerate(REGRAS_EXPECTATIVA)}
+
+LIMITE_AMOSTRAS = 10
+
+def decodificar_motivos(codigos):
+    """
+    Converte códigos de motivo (bitfield) em texto 'regra_a|regra_b'.
+
+    Parameters
+    ----------
+    codigos : np.ndarray
+        Bitfield por linha (CODIGOS_MOTIVO)
+
+    Returns
+    -------
+    np.ndarray
+        Motivos por linha (string vazia para linhas limpas)
+    """
+    unicos, inversos = np.unique(codigos, return_inverse=True)
+    textos = np.array([
+        '|'.join(regra for regra, bit in CODIGOS_MOTIVO.items() if codigo & bit)
+        for codigo in unicos
+    ], dtype=object)
+    return textos[inversos]
+
+# ========================================
+# MÓDULO 1: ACUMULADOR MERGEÁVEL
+# ========================================
+
+class AcumuladorExpectativa:
+    """
+    Contadores e amostras de uma regra em uma coluna.
+
+    Mergeável: acumular lotes em ordem produz o mesmo resultado que o
+    processamento do arquivo inteiro.
+    """
+
+    def __init__(self, regra):
+        self.regra = regra
+        self.total_linhas = 0
+        self.unexpected_count = 0
+        self.amostras = []
+        self.contagem_padroes = {nome: 0 for nome, _ in REGRAS_EXPECTATIVA[regra]}
+
+    def merge(self, outro):
+        """Incorpora outro acumulador (lote posterior) neste."""
+        self.total_linhas += outro.total_linhas
+        self.unexpected_count += outro.unexpected_count
+        faltam = LIMITE_AMOSTRAS - len(self.amostras)
+        if faltam > 0:
+            self.amostras.extend(outro.amostras[:faltam])
+        for nome, contagem in outro.contagem_padroes.items():
+            self.contagem_padroes[nome] += contagem
+        return self
+
+    def para_dict(self):
+        """Estado serializável (JSON) do acumulador."""
+        return {
+            'regra': self.regra,
+            'total_linhas': self.total_linhas,
+            'unexpected_count': self.unexpected_count,
+            'amostras': list(self.amostras),
+            'contagem_padroes': dict(self.contagem_padroes)
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói um acumulador a partir de para_dict()."""
+        acumulador = cls(dados['regra'])
+        acumulador.total_linhas = dados['total_linhas']
+        acumulador.unexpected_count = dados['unexpected_count']
+        acumulador.amostras = list(dados['amostras'])
+        acumulador.contagem_padroes.update(dados['contagem_padroes'])
+        return acumulador
+
+    def resultado(self):
+        """
+        Resultado no formato de CustomFinancialExpectations.
+
+        Returns
+        -------
+        dict
+            {'success': bool, 'result': {...}}
+        """
+        result = {
+            'unexpected_count': self.unexpected_count,
+            'unexpected_values': list(self.amostras),
+            'unexpected_percent': (self.unexpected_count / self.total_linhas) * 100 if self.total_linhas else 0.0
+        }
+        if self.regra in REGRAS_COM_DETALHE:
+            result['invisible_chars_found'] = {
+                nome: contagem for nome, contagem in self.contagem_padroes.items() if contagem > 0
+            }
+        return {
+            'success': self.unexpected_count == 0,
+            'result': result
+        }
+
+# ========================================
+# MÓDULO 2: MOTOR FUNDIDO
+# ========================================
+
+class MotorExpectativasFundido:
+    """
+    Avalia todas as regras de um plano com uma varredura por coluna.
+
+    Parameters
+    ----------
+    plano : dict
+        {coluna: [regra, ...]} com regras de REGRAS_EXPECTATIVA
+
+    Examples
+    --------
+    >>> motor = MotorExpectativasFundido({'Profit': ['parentheses_for_negative']})
+    >>> motor.processar(df)
+    >>> motor.resultado('Profit', 'parentheses_for_negative')['success']
+    """
+
+    def __init__(self, plano):
+        self.plano = {coluna: list(regras) for coluna, regras in plano.items()}
+        self.acumuladores = {
+            (coluna, regra): AcumuladorExpectativa(regra)
+            for coluna, regras in self.plano.items() for regra in regras
+        }
+        self.total_linhas = 0
+        self.linhas_com_falha = 0
+        self.ultimos_codigos = np.zeros(0, dtype=np.int64)
+        # Tempo (s) por regra e da varredura compartilhada (fatoração + regex combinado)
+        self.tempos_regras = {regra: 0.0 for regras in self.plano.values() for regra in regras}
+        self.tempo_varredura = 0.0
+
+    @staticmethod
+    def _compilar_coluna(regras):
+        """Lista plana de (regra, padrão, regex, bit) e regex combinado."""
+        padroes = []
+        for regra in regras:
+            for nome, regex in REGRAS_EXPECTATIVA[regra]:
+                padroes.append((regra, nome, regex, len(padroes)))
+        combinado = '|'.join(f'(?:{regex})' for _, _, regex, _ in padroes)
+        return padroes, combinado
+
+    @staticmethod
+    def fatorar(serie):
+        """
+        Única passada sobre a coluna: códigos por linha (NaN = -1) e únicos como texto.
+
+        Returns
+        -------
+        tuple
+            (codigos: np.ndarray, unicos_str: pd.Series de str)
+        """
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+        return codigos, pd.Series(unicos, dtype=object).astype(str)
+
+    @staticmethod
+    def avaliar_unicos(unicos_str, regras, tempos=None):
+        """
+        Bitmask por valor único com um bit por padrão das regras informadas.
+
+        Cada único é avaliado de forma independente: fatias dos únicos
+        podem ser avaliadas em processos separados (parallel_validation).
+
+        Parameters
+        ----------
+        unicos_str : pd.Series
+            Valores únicos da coluna como texto
+        regras : list
+            Regras aplicáveis à coluna
+        tempos : dict, optional
+            {regra: segundos} acumulado com o tempo dos padrões individuais
+
+        Returns
+        -------
+        tuple
+            (bits_unicos: np.ndarray[int64], padroes: list)
+        """
+        padroes, combinado = MotorExpectativasFundido._compilar_coluna(regras)
+        unicos_str = unicos_str.reset_index(drop=True)
+
+        bits_unicos = np.zeros(len(unicos_str), dtype=np.int64)
+        if len(unicos_str) and padroes:
+            candidatos = unicos_str[unicos_str.str.contains(combinado, regex=True, na=False).to_numpy()]
+            for regra, _, regex, bit in padroes:
+                inicio = time.perf_counter()
+                casou = candidatos.str.contains(regex, regex=True, na=False).to_numpy()
+                bits_unicos[candidatos.index[casou]] |= np.int64(1) << bit
+                if tempos is not None:
+                    tempos[regra] += time.perf_counter() - inicio
+
+        return bits_unicos, padroes
+
+    @staticmethod
+    def avaliar_coluna(serie, regras, tempos=None):
+        """
+        Bitmask por linha com um bit por padrão das regras informadas.
+
+        Parameters
+        ----------
+        serie : pd.Series
+            Coluna original (qualquer dtype)
+        regras : list
+            Regras aplicáveis à coluna
+        tempos : dict, optional
+            {regra: segundos} acumulado com o tempo dos padrões individuais
+
+        Returns
+        -------
+        tuple
+            (bits_linha: np.ndarray[int64], padroes: list)
+        """
+
+        codigos, unicos_str = MotorExpectativasFundido.fatorar(serie)
+        bits_unicos, padroes = MotorExpectativasFundido.avaliar_unicos(unicos_str, regras, tempos)
+        return MotorExpectativasFundido.bits_por_linha(bits_unicos, codigos), padroes
+
+    @staticmethod
+    def bits_por_linha(bits_unicos, codigos):
+        """Bitmask por linha a partir da bitmask por único (gather pelos códigos)."""
+        # Código -1 (NaN) aponta para o elemento extra no fim (0 bits)
+        return np.append(bits_unicos, np.int64(0))[codigos]
+
+    def processar(self, df, total_linhas=None, bits_colunas=None):
+        """
+        Processa um lote (DataFrame completo ou chunk) e acumula resultados.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Lote a avaliar
+        total_linhas : int, optional
+            Linhas representadas pelo lote quando `df` é um subconjunto já
+            filtrado (ex.: linhas apontadas pela pré-varredura de bytes); as
+            linhas não passadas são conhecidas como limpas para o plano
+        bits_colunas : dict, optional
+            {coluna: bitmask por linha} já avaliada (ex.: únicos avaliados
+            em paralelo); as demais colunas são avaliadas aqui
+
+        Returns
+        -------
+        MotorExpectativasFundido
+            self (encadeável)
+        """
+
+        codigos_lote = np.zeros(len(df), dtype=np.int64)
+
+        for coluna, regras in self.plano.items():
+            if coluna not in df.columns or not regras:
+                continue
+
+            serie = df[coluna]
+            inicio_coluna = time.perf_counter()
+            tempos_coluna = {regra: 0.0 for regra in regras}
+            if bits_colunas is not None and coluna in bits_colunas:
+                bits_linha, padroes = bits_colunas[coluna], self._compilar_coluna(regras)[0]
+            else:
+                bits_linha, padroes = self.avaliar_coluna(serie, regras, tempos_coluna)
+            self.tempo_varredura += time.perf_counter() - inicio_coluna - sum(tempos_coluna.values())
+
+            for regra in regras:
+                inicio = time.perf_counter()
+                bits_regra = [(nome, bit) for r, nome, _, bit in padroes if r == regra]
+                mascara_regra = np.int64(sum(1 << bit for _, bit in bits_regra))
+                mascara = (bits_linha & mascara_regra) != 0
+                codigos_lote[mascara] |= CODIGOS_MOTIVO[regra]
+
+                parcial = AcumuladorExpectativa(regra)
+                parcial.total_linhas = len(serie) if total_linhas is None else total_linhas
+                parcial.unexpected_count = int(mascara.sum())
+                if parcial.unexpected_count:
+                    linhas = np.flatnonzero(mascara)[:LIMITE_AMOSTRAS]
+                    parcial.amostras = serie.iloc[linhas].tolist()
+                    for nome, bit in bits_regra:
+                        parcial.contagem_padroes[nome] = int(((bits_linha >> bit) & 1).sum())
+
+                self.acumuladores[(coluna, regra)].merge(parcial)
+                self.tempos_regras[regra] += tempos_coluna[regra] + time.perf_counter() - inicio
+
+        # Linhas com ao menos uma expectation violada (orçamento de erros)
+        self.total_linhas += len(df) if total_linhas is None else total_linhas
+        self.linhas_com_falha += int((codigos_lote != 0).sum())
+        # Bitfield de motivos do último lote (posicional em df)
+        self.ultimos_codigos = codigos_lote
+
+        return self
+
+    def merge(self, outro):
+        """
+        Incorpora outro motor com o mesmo plano (lote posterior).
+
+        Returns
+        -------
+        MotorExpectativasFundido
+            self (encadeável)
+        """
+        for chave, acumulador in outro.acumuladores.items():
+            self.acumuladores[chave].merge(acumulador)
+        self.total_linhas += outro.total_linhas
+        self.linhas_com_falha += outro.linhas_com_falha
+        for regra, segundos in outro.tempos_regras.items():
+            self.tempos_regras[regra] = self.tempos_regras.get(regra, 0.0) + segundos
+        self.tempo_varredura += outro.tempo_varredura
+        return self
+
+    def para_dict(self):
+        """Estado serializável (JSON) do motor."""
+        return {
+            'total_linhas': self.total_linhas,
+            'linhas_com_falha': self.linhas_com_falha,
+            'acumuladores': [
+                [coluna, regra, acumulador.para_dict()]
+                for (coluna, regra), acumulador in self.acumuladores.items()
+            ]
+        }
+
+    @classmethod
+    def de_dict(cls, plano, dados):
+        """Reconstrói um motor (plano + acumuladores) a partir de para_dict()."""
+        motor = cls(plano)
+        motor.total_linhas = dados['total_linhas']
+        motor.linhas_com_falha = dados['linhas_com_falha']
+        for coluna, regra, acumulador in dados['acumuladores']:
+            motor.acumuladores[(coluna, regra)] = AcumuladorExpectativa.de_dict(acumulador)
+        return motor
+
+    def resultado(self, coluna, regra):
+        """Resultado acumulado de uma regra em uma coluna."""
+        return self.acumuladores[(coluna, regra)].resultado()
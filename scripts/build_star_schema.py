@@ -23,6 +23,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 
+from gold_bitmap_index import GoldBitmapIndex
+
 # ========================================
 # CONFIGURAÇÕES GLOBAIS
 # ========================================
@@ -587,6 +589,20 @@ class StarSchemaBuilder:
         
         print()
     
+    def exportar_indices_bitmap(self):
+        """Constrói e persiste os índices bitmap das FKs do fato."""
+        print("=" * 80)
+        print("EXPORTANDO ÍNDICES BITMAP")
+        print("=" * 80 + "\n")
+        
+        # Reconstrução completa: o fato acabou de ser reescrito
+        indice = GoldBitmapIndex.construir(self.fato_financeiro, self.dim_tempo)
+        diretorio_indices = f"{self.diretorio_gold}/_bitmap_index"
+        tamanho = indice.salvar(diretorio_indices)
+        
+        print(f"   ✅ {indice.n_linhas} linhas indexadas em {diretorio_indices}/ ({tamanho / 1024:.1f} KB)")
+        print(f"   Bitmaps: { {c: len(b) for c, b in indice.bitmaps.items()} }\n")
+    
     def gerar_resumo(self):
         """Gera resumo final da construção."""
         print("=" * 80)
@@ -625,6 +641,7 @@ class StarSchemaBuilder:
         self.construir_dimensoes()
         self.construir_fato()
         self.exportar_csvs()
+        self.exportar_indices_bitmap()
         self.gerar_resumo()
 
 # ========================================
@@ -648,6 +665,7 @@ if __name__ == "__main__":
         - gold_layer/dim_desconto.csv
         - gold_layer/dim_tempo.csv
         - gold_layer/fato_financeiro.csv
+        - gold_layer/_bitmap_index/ (índices bitmap das FKs)
     """
     
     builder = StarSchemaBuilder(
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MATRIZ DE SNAPSHOTS DO DASHBOARD (TODAS AS COMBINAÇÕES DE SLICERS)
+Analytics Architect - Financial Data Fortress 2026
+
+Autor: Analytics Architect
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Os slicers do relatório (país, segmento, produto, ano, faixa de desconto)
+formam um conjunto finito de estados de filtro. Em vez de calcular cada
+cartão de KPI e cada tendência sob demanda, este módulo materializa o
+payload completo de todos os estados uma única vez por versão da Gold:
+1. Agregado base no grão mais fino (país × segmento × produto × ano ×
+   desconto × mês)
+2. 32 grouping sets (subconjuntos dos 5 slicers) calculados em pool de
+   processos (o cálculo é pandas/Python, preso ao GIL em threads); serial
+   com um único núcleo disponível
+3. Store indexado por chave canônica do estado → consulta por lookup
+
+VERSIONAMENTO:
+- Versão = SHA-256 de fato_financeiro.csv, das dimensões dos slicers e da
+  lista de slicers (snapshot reaproveitado se nada disso mudou)
+
+PERSISTÊNCIA:
+- data/03_gold/_snapshots/snapshot_<versao>.json (mantidos os
+  SNAPSHOTS_MANTIDOS mais recentes)
+- data/03_gold/_snapshots/atual.json (ponteiro para a versão corrente)
+
+GROUNDING SOURCE:
+- Financeiro.Report (slicers dim_geografia[pais], dim_segmento, dim_tempo[ano],
+  dim_desconto[faixa_desconto])
+- _extract_data.py (KPIs: receita, lucro, margem, unidades, CPV, ticket médio)
+"""
+
+import pandas as pd
+import numpy as np
+import hashlib
+import itertools
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from parallel_validation import nucleos_disponiveis
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+DIRETORIO_GOLD = "data/03_gold"
+DIRETORIO_SNAPSHOTS = "data/03_gold/_snapshots"
+
+# Slicer → (tabela da dimensão, FK no fato, coluna exibida)
+SLICERS = {
+    'pais': ('dim_geografia', 'geografia_sk', 'pais'),
+    'segmento': ('dim_segmento', 'segmento_sk', 'nome_segmento'),
+    'produto': ('dim_produto', 'produto_sk', 'nome_produto'),
+    'ano': ('dim_tempo', 'tempo_sk', 'ano'),
+    'desconto': ('dim_desconto', 'desconto_sk', 'faixa_desconto')
+}
+
+METRICAS_BASE = ['receita_liquida', 'lucro', 'unidades_vendidas', 'custo_produtos_vendidos']
+
+TODOS = '*'
+
+MAX_WORKERS = 4
+
+# Snapshots no diretório: o atual e o anterior (leitor que leu o ponteiro
+# antigo ainda encontra o arquivo)
+SNAPSHOTS_MANTIDOS = 2
+
+# ========================================
+# MÓDULO 1: CHAVES E PAYLOADS
+# ========================================
+
+def chave_estado(pais=None, segmento=None, produto=None, ano=None, desconto=None):
+    """
+    Chave canônica de um estado de slicers (None = todos).
+
+    Examples
+    --------
+    >>> chave_estado(pais='Canada', ano=2014)
+    'pais=Canada|segmento=*|produto=*|ano=2014|desconto=*'
+    """
+    valores = {'pais': pais, 'segmento': segmento, 'produto': produto, 'ano': ano, 'desconto': desconto}
+    partes = []
+    for slicer in SLICERS:
+        valor = valores[slicer]
+        partes.append(f"{slicer}={TODOS if valor is None else str(valor).strip()}")
+    return '|'.join(partes)
+
+
+def calcular_grouping_set(base, slicers_ativos):
+    """
+    Calcula os payloads de todos os estados de um grouping set.
+
+    Parameters
+    ----------
+    base : pd.DataFrame
+        Agregado no grão (pais, segmento, produto, ano, desconto, mes)
+    slicers_ativos : tuple
+        Slicers filtrados neste grouping set (os demais = todos)
+
+    Returns
+    -------
+    dict
+        {chave_estado: payload}
+    """
+
+    chaves = list(slicers_ativos)
+    agrupar = chaves if chaves else (lambda _: TODOS)
+
+    kpis = base.groupby(agrupar, sort=False)[METRICAS_BASE].sum()
+    tendencia = (base.groupby(chaves + ['ano', 'mes'] if 'ano' not in chaves else chaves + ['mes'])
+                 [['receita_liquida', 'lucro']].sum()
+                 .sort_index())
+
+    # Receita do ano anterior sob os mesmos filtros (YoY)
+    receita_anterior = None
+    if 'ano' in chaves:
+        anterior = kpis['receita_liquida'].rename('receita_anterior').reset_index()
+        anterior['ano'] = anterior['ano'] + 1
+        receita_anterior = anterior.set_index(chaves)['receita_anterior']
+
+    if chaves:
+        grupos_tendencia = {(k if isinstance(k, tuple) else (k,)): serie
+                            for k, serie in tendencia.groupby(level=list(range(len(chaves))), sort=False)}
+    else:
+        grupos_tendencia = {(TODOS,): tendencia}
+
+    payloads = {}
+    for membro, linha in kpis.iterrows():
+        membro_tupla = membro if isinstance(membro, tuple) else (membro,)
+        filtros = dict(zip(chaves, membro_tupla)) if chaves else {}
+
+        receita = float(linha['receita_liquida'])
+        unidades = float(linha['unidades_vendidas'])
+
+        yoy = None
+        if receita_anterior is not None and membro in receita_anterior.index:
+            base_yoy = float(receita_anterior.loc[membro])
+            yoy = (receita / base_yoy - 1) * 100 if base_yoy else None
+
+        serie = grupos_tendencia[membro_tupla]
+        indice_serie = serie.index.droplevel(list(range(len(chaves)))) if chaves else serie.index
+        if 'ano' in chaves:
+            periodos = [f"{int(filtros['ano'])}-{int(m):02d}" for m in indice_serie]
+        else:
+            periodos = [f"{int(a)}-{int(m):02d}" for a, m in indice_serie]
+
+        payloads[chave_estado(**filtros)] = {
+            'receita_total': receita,
+            'lucro_total': float(linha['lucro']),
+            'margem_bruta': float(linha['lucro'] / receita * 100) if receita else None,
+            'unidades_vendidas': unidades,
+            'cpv': float(linha['custo_produtos_vendidos']),
+            'ticket_medio': receita / unidades if unidades else None,
+            'crescimento_yoy': yoy,
+            'tendencia': {
+                'periodo': periodos,
+                'receita_liquida': serie['receita_liquida'].round(2).tolist(),
+                'lucro': serie['lucro'].round(2).tolist()
+            }
+        }
+
+    return payloads
+
+# ========================================
+# MÓDULO 2: MATERIALIZADOR
+# ========================================
+
+class DashboardSnapshotStore:
+    """
+    Materializa e consulta payloads de KPI para todos os estados de slicers.
+
+    Examples
+    --------
+    >>> store = DashboardSnapshotStore()
+    >>> store.materializar()
+    >>> store.consultar(pais='Canada', ano=2014)['receita_total']
+    """
+
+    def __init__(self, diretorio_gold=DIRETORIO_GOLD, diretorio=DIRETORIO_SNAPSHOTS):
+        self.diretorio_gold = diretorio_gold
+        self.diretorio = Path(diretorio)
+        self.versao = None
+        self.estados = {}
+
+    def calcular_versao(self):
+        """
+        SHA-256 (16 hex) do fato Gold, das dimensões dos slicers e dos slicers.
+
+        Os rótulos dos estados (país, produto, ...) vêm das dimensões: uma
+        dimensão alterada com o fato intacto também gera nova versão.
+        """
+        sha = hashlib.sha256('|'.join(SLICERS).encode('utf-8'))
+        tabelas = ['fato_financeiro'] + sorted({tabela for tabela, _, _ in SLICERS.values()})
+        for tabela in tabelas:
+            sha.update(f"|{tabela}|".encode('utf-8'))
+            with open(f"{self.diretorio_gold}/{tabela}.csv", 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(bloco)
+        return sha.hexdigest()[:16]
+
+    def construir_base(self):
+        """Agregado base no grão mais fino dos slicers + mês."""
+        fato = pd.read_csv(f"{self.diretorio_gold}/fato_financeiro.csv")
+
+        base = fato[METRICAS_BASE].copy()
+        for slicer, (tabela, fk, coluna) in SLICERS.items():
+            dim = pd.read_csv(f"{self.diretorio_gold}/{tabela}.csv")
+            mapa = dim.set_index(fk)[coluna]
+            valores = fato[fk].map(mapa)
+            base[slicer] = valores if pd.api.types.is_numeric_dtype(valores) else valores.str.strip()
+            if slicer == 'ano':
+                base['mes'] = fato[fk].map(dim.set_index(fk)['mes'])
+
+        return (base.dropna(subset=list(SLICERS) + ['mes'])
+                .astype({'ano': np.int64, 'mes': np.int64})
+                .groupby(list(SLICERS) + ['mes'], sort=False)[METRICAS_BASE]
+                .sum()
+                .reset_index())
+
+    def materializar(self, forcar=False):
+        """
+        Calcula todos os estados (se a versão da Gold mudou) e persiste.
+
+        Returns
+        -------
+        bool
+            True se um novo snapshot foi gerado
+        """
+
+        versao = self.calcular_versao()
+        caminho = self.diretorio / f"snapshot_{versao}.json"
+
+        if caminho.exists() and not forcar:
+            print(f"✅ Snapshot {versao} já materializado - reutilizando")
+            self.carregar(versao)
+            return False
+
+        inicio = datetime.now()
+        base = self.construir_base()
+
+        grouping_sets = [combo for n in range(len(SLICERS) + 1)
+                         for combo in itertools.combinations(SLICERS, n)]
+
+        estados = {}
+        workers = min(MAX_WORKERS, nucleos_disponiveis())
+        if workers <= 1:
+            for grouping_set in grouping_sets:
+                estados.update(calcular_grouping_set(base, grouping_set))
+        else:
+            # Agregado base é pequeno (grão dos slicers): enviado a cada tarefa
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for payloads in executor.map(calcular_grouping_set, itertools.repeat(base), grouping_sets):
+                    estados.update(payloads)
+
+        self.versao = versao
+        self.estados = estados
+
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump({
+                'versao': versao,
+                'data_geracao': datetime.now().isoformat(),
+                'slicers': list(SLICERS),
+                'grouping_sets': len(grouping_sets),
+                'estados': estados
+            }, f, ensure_ascii=False, separators=(',', ':'))
+
+        with open(self.diretorio / 'atual.json', 'w', encoding='utf-8') as f:
+            json.dump({'versao': versao, 'arquivo': caminho.name}, f, indent=2)
+
+        removidos = self.podar_snapshots(manter=caminho.name)
+
+        duracao = (datetime.now() - inicio).total_seconds()
+        print(f"✅ Snapshot {versao}: {len(estados)} estados em {len(grouping_sets)} grouping sets "
+              f"({duracao:.2f}s, {workers} workers, {removidos} snapshots antigos removidos)")
+        return True
+
+    def podar_snapshots(self, manter=None):
+        """
+        Remove snapshots além dos SNAPSHOTS_MANTIDOS mais recentes.
+
+        Parameters
+        ----------
+        manter : str, optional
+            Arquivo que nunca é removido (o snapshot atual)
+
+        Returns
+        -------
+        int
+            Arquivos removidos
+        """
+        snapshots = sorted(self.diretorio.glob('snapshot_*.json'),
+                           key=lambda caminho: caminho.stat().st_mtime_ns, reverse=True)
+        antigos = [caminho for caminho in snapshots[SNAPSHOTS_MANTIDOS:] if caminho.name != manter]
+        for caminho in antigos:
+            caminho.unlink(missing_ok=True)
+        return len(antigos)
+
+    def carregar(self, versao=None):
+        """Carrega o snapshot da versão informada (ou o atual)."""
+        if versao is None:
+            with open(self.diretorio / 'atual.json', 'r', encoding='utf-8') as f:
+                versao = json.load(f)['versao']
+
+        with open(self.diretorio / f"snapshot_{versao}.json", 'r', encoding='utf-8') as f:
+            self.estados = json.load(f)['estados']
+        self.versao = versao
+
+    def consultar(self, pais=None, segmento=None, produto=None, ano=None, desconto=None):
+        """
+        Payload de KPIs para um estado de slicers (None = todos).
+
+        Returns
+        -------
+        dict or None
+            None se a combinação não possui linhas no fato
+        """
+        return self.estados.get(chave_estado(pais, segmento, produto, ano, desconto))
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Materializa a matriz de snapshots para a versão atual da Gold.
+
+    USO:
+        python dashboard_snapshots.py [--forcar]
+
+    OUTPUT:
+        - data/03_gold/_snapshots/snapshot_<versao>.json
+    """
+
+    print("=" * 80)
+    print("DASHBOARD SNAPSHOTS - Matriz de Estados de Slicers")
+    print("=" * 80 + "\n")
+
+    store = DashboardSnapshotStore()
+    store.materializar(forcar='--forcar' in sys.argv)
+
+    geral = store.consultar()
+    print(f"\n📊 Estado sem filtros:")
+    print(f"   Receita: {geral['receita_total']:,.2f}")
+    print(f"   Lucro:   {geral['lucro_total']:,.2f}")
+    print(f"   Margem:  {geral['margem_bruta']:.2f}%")
+
+    sys.exit(0)
@@ -13,28 +13,104 @@ Implementar camada de confiabilidade sobre o pipeline de dados financeiros,
 garantindo qualidade através de contratos Pydantic, carga incremental otimizada
 e monitoramento inteligente de anomalias com Root Cause Analysis.
 
+REGRAS:
+Faixas, comprimentos, domínios, identidades, formato de data e coerência do
+desconto vêm de rules.json (data_validation_rules, camada silver; ver
+rule_compiler.py) - tanto para o modelo Pydantic quanto para as máscaras.
+
 GROUNDING SOURCE:
 - BLUEPRINT_DATAOPS_2026.md (Seção: Contratos de Dados, CDC, Vigilância com IA)
 """
 
 import pandas as pd
 import numpy as np
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator, model_validator
 from decimal import Decimal
 from datetime import datetime, date, timedelta
 from typing import Optional, Literal, Union
-import sqlite3
+import hashlib
+import io
 import json
+import os
+import shutil
 import sys
+import time
+import uuid
 from pathlib import Path
 
+from rule_compiler import (
+    ConjuntoRegrasCompilado, regras_da_camada, regra_por_id,
+    restricoes_campo, valor_esperado_identidade, imprimir_tempos
+)
+from alert_stream import FluxoAlertas, DIR_ALERTAS
+from metadata_store import MetadataStore, CAMINHO_METADATA_DB
+from validation_history import HistoricoValidacao, CAMINHO_HISTORICO_DB, imprimir_alertas
+
 # ========================================
 # CONFIGURAÇÕES GLOBAIS
 # ========================================
 
 CAMINHO_DADOS = "data/02_silver/Financials_Silver.csv"
-CAMINHO_METADATA_DB = "metadata/incremental_load.db"
-CAMINHO_ALERTAS = "outputs/alerts/anomalies_{timestamp}.json"
+CAMINHO_ALERTAS = "outputs/alerts/anomalies_{timestamp}.ndjson"
+CAMINHO_QUARENTENA = "outputs/quarantine/contract_violations_{timestamp}.csv"
+DIR_STAGING = "outputs/_staging"
+PIPELINE_MONITOR = "silver_to_gold"
+
+# Checkpoint de leitura por offset: bytes finais antes do offset conferidos
+# (hash) para distinguir append de reescrita do arquivo
+TAMANHO_ANCORA_BYTES = 64 * 1024
+
+# Chave natural de um registro da Silver (sem id de transação: chaves
+# repetidas no lote são desambiguadas pela ordem de ocorrência)
+CHAVE_NATURAL = ['segment', 'country', 'product', 'discount_band', 'date']
+
+# Métrica guardada no índice junto ao hash: numa atualização, o valor antigo
+# é retirado do baseline sazonal antes de o novo entrar
+COLUNA_VALOR_INDICE = 'profit'
+
+# Janela retroativa (dados atrasados): meses a partir de watermark - janela
+# são reclassificados contra o índice; None = sem limite
+JANELA_RETROATIVA_DIAS = 90
+
+# Classificação de linhas pelo índice de hashes
+CLASSE_INSERCAO = 0
+CLASSE_ATUALIZACAO = 1
+CLASSE_DUPLICATA = 2
+
+# Modo streaming (micro-lotes): diretório monitorado e meta de latência
+DIR_STREAMING = "data/02_silver/streaming"
+PIPELINE_STREAMING = "silver_to_gold_streaming"
+INTERVALO_POLL_S = 2.0
+LATENCIA_ALVO_S = 5.0
+
+# Backpressure: bytes lidos por micro-lote, ajustados pela latência
+BYTES_LOTE_INICIAL = 1024 * 1024
+BYTES_LOTE_MIN = 64 * 1024
+BYTES_LOTE_MAX = 64 * 1024 * 1024
+
+# Detecção robusta (detectar_anomalias_robustas): dimensões de agrupamento,
+# métodos de score e limiares |score| (ALTA, CRÍTICA) por método
+DIMENSOES_ANOMALIA = (('country', 'trimestre'), ('product',), ('segment',), ('discount_band',))
+METODOS_ANOMALIA = ('zscore', 'mad')
+LIMIARES_ANOMALIA = {
+    'zscore': (3.0, 5.0),         # (x - média) / desvio
+    'mad': (3.5, 6.0),            # 0,6745 (x - mediana) / MAD (Iglewicz-Hoaglin)
+    'percentual': (100.0, 200.0)  # (x - média) / |média| × 100
+}
+MIN_TAMANHO_GRUPO = 5
+
+# Detecção usada pelo orquestrador: 'sazonal' (±100% vs baseline persistido)
+# ou 'robusta' (scores por dimensão, pares do próprio lote)
+DETECCOES = ('sazonal', 'robusta')
+DETECCAO_PADRAO = 'sazonal'
+
+# Backends de validação do contrato (DataContractValidator.validar_lote)
+# - vetorizado: máscaras colunares + Pydantic só nas linhas reprovadas
+# - pydantic_linha: um FinancialRecordContract por linha (semântica completa)
+# - pydantic_lote: TypeAdapter(list[FinancialRecordContract]) em lotes
+BACKENDS_CONTRATO = ('vetorizado', 'pydantic_linha', 'pydantic_lote')
+BACKEND_CONTRATO_PADRAO = 'vetorizado'
+TAMANHO_LOTE_PYDANTIC = 50_000
 
 # ========================================
 # MÓDULO 1: DATA CONTRACT (Pydantic)
@@ -74,15 +150,13 @@ class FinancialRecordContract(BaseModel):
     
     country: str = Field(
         ...,
-        min_length=3,
-        max_length=100,
+        **restricoes_campo('country'),
         description="Nome do país"
     )
     
     product: str = Field(
         ...,
-        min_length=3,
-        max_length=50,
+        **restricoes_campo('product'),
         description="Nome do produto"
     )
     
@@ -93,45 +167,43 @@ class FinancialRecordContract(BaseModel):
     
     units_sold: float = Field(
         ...,
-        ge=0,  # greater than or equal
+        **restricoes_campo('units_sold'),
         description="Unidades vendidas (não negativo)"
     )
     
     manufacturing_price: float = Field(
         ...,
-        ge=0,
-        le=10000,
+        **restricoes_campo('manufacturing_price'),
         description="Preço de fabricação unitário"
     )
     
     sale_price: float = Field(
         ...,
-        ge=0,
-        le=50000,
+        **restricoes_campo('sale_price'),
         description="Preço de venda unitário"
     )
     
     gross_sales: float = Field(
         ...,
-        ge=0,
+        **restricoes_campo('gross_sales'),
         description="Faturamento bruto"
     )
     
     discounts: float = Field(
         ...,
-        ge=0,
+        **restricoes_campo('discounts'),
         description="Valor total de descontos"
     )
     
     sales: float = Field(
         ...,
-        ge=0,
+        **restricoes_campo('sales'),
         description="Venda líquida"
     )
     
     cogs: float = Field(
         ...,
-        ge=0,
+        **restricoes_campo('cogs'),
         description="Custo dos produtos vendidos"
     )
     
@@ -147,8 +219,7 @@ class FinancialRecordContract(BaseModel):
     
     month_number: int = Field(
         ...,
-        ge=1,
-        le=12,
+        **restricoes_campo('month_number'),
         description="Número do mês"
     )
     
@@ -159,8 +230,7 @@ class FinancialRecordContract(BaseModel):
     
     year: int = Field(
         ...,
-        ge=2013,
-        le=2030,
+        **restricoes_campo('year'),
         description="Ano fiscal"
     )
     
@@ -175,9 +245,10 @@ class FinancialRecordContract(BaseModel):
         REGRA 1: Sales = Gross Sales - Discounts
         """
         values = info.data
-        if 'gross_sales' in values and 'discounts' in values:
-            esperado = values['gross_sales'] - values['discounts']
-            if abs(v - esperado) > 0.01:  # Tolerância de 1 centavo
+        regra = regra_por_id('sales_identity')
+        esperado = valor_esperado_identidade(regra, values)
+        if esperado is not None:
+            if abs(v - esperado) > regra['tolerancia']:  # Tolerância de 1 centavo
                 raise ValueError(
                     f"Sales inconsistente: {v} != {esperado} "
                     f"(Gross: {values['gross_sales']}, Desc: {values['discounts']})"
@@ -191,9 +262,10 @@ class FinancialRecordContract(BaseModel):
         REGRA 2: Profit = Sales - COGS
         """
         values = info.data
-        if 'sales' in values and 'cogs' in values:
-            esperado = values['sales'] - values['cogs']
-            if abs(v - esperado) > 0.01:
+        regra = regra_por_id('profit_identity')
+        esperado = valor_esperado_identidade(regra, values)
+        if esperado is not None:
+            if abs(v - esperado) > regra['tolerancia']:
                 raise ValueError(
                     f"Profit inconsistente: {v} != {esperado} "
                     f"(Sales: {values['sales']}, COGS: {values['cogs']})"
@@ -207,22 +279,38 @@ class FinancialRecordContract(BaseModel):
         REGRA 3: Data deve estar em formato ISO-8601 (YYYY-MM-DD)
         Aceita datetime/Timestamp e converte para string.
         """
+        formato = regra_por_id('date_format')['formato']
         if isinstance(v, (datetime, pd.Timestamp)):
-            return v.strftime('%Y-%m-%d')
+            return v.strftime(formato)
             
         try:
-            datetime.strptime(v, '%Y-%m-%d')
+            datetime.strptime(v, formato)
         except ValueError:
             raise ValueError(f"Data inválida '{v}'. Formato esperado: YYYY-MM-DD")
         return v
     
+    @model_validator(mode='after')
+    def validar_dominios(self):
+        """
+        REGRA 5: Segmento, faixa de desconto e mês dentro dos domínios declarados
+        """
+        for regra in regras_da_camada('silver'):
+            if regra['tipo'] != 'dominio':
+                continue
+            valor = getattr(self, regra['coluna'])
+            normalizado = valor.strip() if regra.get('normalizar') == 'strip' else valor
+            if normalizado not in regra['valores']:
+                raise ValueError(f"{regra['coluna']} fora do domínio: '{valor}'")
+        return self
+    
     @model_validator(mode='after')
     def validar_desconto_coerente(self):
         """
         REGRA 4: Se discount_band = 'None', desconto deve ser 0
         """
-        if self.discount_band == 'None':
-            if self.discounts > 0.01:
+        regra = regra_por_id('discount_band_none_coherence')
+        if getattr(self, regra['se']['coluna']) == regra['se']['igual']:
+            if getattr(self, regra['entao']['coluna']) > regra['entao']['le']:
                 raise ValueError(
                     f"Inconsistência: discount_band='None' mas discounts={self.discounts}"
                 )
@@ -233,13 +321,64 @@ class FinancialRecordContract(BaseModel):
         validate_assignment = True
         frozen = False
 
+class ContratoVetorizado:
+    """
+    Avaliação colunar do contrato com as regras compiladas de rules.json.
+    
+    Cada regra da camada silver (faixas, comprimentos, domínios, Sales =
+    Gross - Discounts, Profit = Sales - COGS, formato de data e coerência do
+    discount_band) é um predicado vetorizado sobre a coluna inteira. A
+    máscara é conservadora: só marca como válida a linha que o Pydantic
+    certamente aceitaria (valores finitos, tipos nativos da coluna); qualquer
+    caso duvidoso (NaN, strings numéricas, colunas object mistas) fica para a
+    validação linha a linha.
+    """
+    
+    _conjunto = None
+    ultimos_tempos = {}
+    ultimas_falhas = {}
+    
+    @classmethod
+    def mascara_validos(cls, df):
+        """
+        Máscara posicional das linhas comprovadamente válidas.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Lote a validar
+        
+        Returns
+        -------
+        np.ndarray
+            bool por linha (False = reavaliar com Pydantic); tempo e
+            violações por regra ficam em ultimos_tempos / ultimas_falhas
+        """
+        if cls._conjunto is None:
+            cls._conjunto = ConjuntoRegrasCompilado(regras_da_camada('silver'))
+        
+        violacoes, cls.ultimos_tempos = cls._conjunto.avaliar(df)
+        cls.ultimas_falhas = {regra: int(mascara.sum()) for regra, mascara in violacoes.items()}
+        
+        mascara = np.ones(len(df), dtype=bool)
+        for violacao in violacoes.values():
+            mascara &= ~violacao
+        return mascara
+
 class DataContractValidator:
     """
     Validador de lote completo usando Data Contracts.
+    
+    Backend padrão: restrições avaliadas por coluna (ContratoVetorizado); o
+    modelo Pydantic é instanciado apenas para os registros reprovados pelas
+    máscaras. Os backends 'pydantic_linha' e 'pydantic_lote' aplicam o
+    contrato Pydantic a todos os registros (ver BACKENDS_CONTRATO).
     """
     
+    _adaptador_lote = None
+    
     @staticmethod
-    def validar_lote(df):
+    def validar_lote(df, backend=BACKEND_CONTRATO_PADRAO):
         """
         Valida lote de registros contra o contrato.
         
@@ -247,6 +386,8 @@ class DataContractValidator:
         ----------
         df : pd.DataFrame
             Lote a validar
+        backend : str
+            Um de BACKENDS_CONTRATO
         
         Returns
         -------
@@ -254,79 +395,481 @@ class DataContractValidator:
             (df_valido, df_invalido, relatorio_erros)
         """
         
+        if backend not in BACKENDS_CONTRATO:
+            raise ValueError(f"Backend inválido '{backend}'. Opções: {', '.join(BACKENDS_CONTRATO)}")
+        
         print("🔍 Validando Data Contract (Pydantic)...")
         
-        registros_validos = []
-        registros_invalidos = []
+        if backend == 'vetorizado':
+            # Máscaras colunares decidem as linhas comprovadamente válidas;
+            # Pydantic só reavalia as demais (mensagens detalhadas)
+            validos = ContratoVetorizado.mascara_validos(df)
+            erros_detalhados = DataContractValidator._validar_linhas(df, validos)
+            
+            print(f"   ⏱️ Regras (rules.json): {sum(ContratoVetorizado.ultimos_tempos.values()) * 1000:.2f} ms")
+            imprimir_tempos(ContratoVetorizado.ultimos_tempos, limite=5)
+        elif backend == 'pydantic_linha':
+            validos = np.zeros(len(df), dtype=bool)
+            erros_detalhados = DataContractValidator._validar_linhas(df, validos)
+        else:
+            validos = np.zeros(len(df), dtype=bool)
+            erros_detalhados = DataContractValidator._validar_em_lotes(df, validos)
+        
+        df_valido = df[validos].reset_index(drop=True)
+        df_invalido = df[~validos].reset_index(drop=True)
+        
+        taxa_aprovacao = (len(df_valido) / len(df)) * 100 if len(df) > 0 else 0
+        
+        print(f"   ✅ Válidos: {len(df_valido)} ({taxa_aprovacao:.1f}%)")
+        print(f"   ❌ Inválidos: {len(df_invalido)}")
+        
+        if len(df_invalido) > 0:
+            print(f"\n   ⚠️ VIOLAÇÕES DE CONTRATO:")
+            for erro in erros_detalhados[:5]:  # Primeiros 5
+                print(f"      Linha {erro['linha']}: {erro['erro']}")
+        
+        print()
+        
+        return df_valido, df_invalido, erros_detalhados
+    
+    @staticmethod
+    def _validar_linhas(df, validos):
+        """
+        Valida com Pydantic, linha a linha, os registros não aprovados pelas máscaras.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Lote completo
+        validos : np.ndarray
+            Máscara booleana posicional; atualizada in-place para as
+            linhas que o Pydantic aprovar
+        
+        Returns
+        -------
+        list
+            Erros detalhados [{'linha', 'erro'}] na ordem das linhas
+        """
+        
         erros_detalhados = []
+        suspeitos = np.flatnonzero(~validos)
         
-        for idx, row in df.iterrows():
+        for posicao, (idx, row) in zip(suspeitos, df.iloc[suspeitos].iterrows()):
             try:
                 # Validar registro contra contrato
-                registro_validado = FinancialRecordContract(**row.to_dict())
-                registros_validos.append(row.to_dict())
+                FinancialRecordContract(**row.to_dict())
+                validos[posicao] = True
                 
             except Exception as e:
                 # Capturar violação de contrato
-                registros_invalidos.append(row.to_dict())
                 erros_detalhados.append({
                     'linha': idx + 2,  # +2 porque: +1 para 1-indexed, +1 para header
                     'erro': str(e)
                 })
         
-        df_valido = pd.DataFrame(registros_validos)
-        df_invalido = pd.DataFrame(registros_invalidos)
+        return erros_detalhados
+    
+    @staticmethod
+    def _validar_em_lotes(df, validos, tamanho_lote=TAMANHO_LOTE_PYDANTIC):
+        """
+        Valida com TypeAdapter(list[FinancialRecordContract]) em lotes de registros.
         
-        taxa_aprovacao = (len(df_valido) / len(df)) * 100 if len(df) > 0 else 0
+        Uma chamada ao validador (pydantic-core) por lote; os índices das linhas
+        reprovadas vêm do primeiro elemento de `loc` de cada erro. As mensagens
+        detalhadas são geradas pelo modelo, linha a linha, apenas para as
+        reprovadas (mesmo texto do backend 'pydantic_linha').
         
-        print(f"   ✅ Válidos: {len(df_valido)} ({taxa_aprovacao:.1f}%)")
-        print(f"   ❌ Inválidos: {len(df_invalido)}")
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Lote completo
+        validos : np.ndarray
+            Máscara booleana posicional; atualizada in-place
+        tamanho_lote : int
+            Registros por chamada ao TypeAdapter
         
-        if len(df_invalido) > 0:
-            print(f"\n   ⚠️ VIOLAÇÕES DE CONTRATO:")
-            for erro in erros_detalhados[:5]:  # Primeiros 5
-                print(f"      Linha {erro['linha']}: {erro['erro']}")
+        Returns
+        -------
+        list
+            Erros detalhados [{'linha', 'erro'}] na ordem das linhas
+        """
         
-        print()
+        if DataContractValidator._adaptador_lote is None:
+            DataContractValidator._adaptador_lote = TypeAdapter(list[FinancialRecordContract])
+        adaptador = DataContractValidator._adaptador_lote
         
-        return df_valido, df_invalido, erros_detalhados
+        for inicio in range(0, len(df), tamanho_lote):
+            fim = min(inicio + tamanho_lote, len(df))
+            registros = df.iloc[inicio:fim].to_dict('records')
+            
+            try:
+                adaptador.validate_python(registros)
+                reprovados = set()
+            except ValidationError as e:
+                reprovados = {erro['loc'][0] for erro in e.errors()}
+            
+            aprovados = np.ones(fim - inicio, dtype=bool)
+            aprovados[list(reprovados)] = False
+            validos[inicio:fim] = aprovados
+        
+        # Reprovados: mensagem detalhada do modelo (validos já é False)
+        return DataContractValidator._validar_linhas(df, validos)
 
 # ========================================
 # MÓDULO 2: INCREMENTAL LOAD (CDC)
 # ========================================
 
+def _combinar_hashes(*hashes):
+    """Combina arrays uint64 de hash coluna a coluna (aritmética módulo 2^64)."""
+    combinado = np.zeros(len(hashes[0]), dtype=np.uint64)
+    for h in hashes:
+        combinado = (combinado * np.uint64(1_000_003)) ^ h
+    return combinado
+
+
+def _hashes_por_coluna(df):
+    """
+    Hash uint64 por linha de cada coluna, estável entre leituras completas e de cauda.
+    
+    Numéricos viram float64 (1618 == 1618.0), datas viram inteiros em ns e
+    o restante vira objeto Python com nulos como None - o mesmo valor gera
+    o mesmo hash mesmo que o parser infira dtypes diferentes para a cauda e
+    para o arquivo inteiro.
+    """
+    hashes = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            valores = serie.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        elif pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            valores = serie.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            valores = serie.to_numpy(dtype=object, na_value=None)
+        hashes[coluna] = pd.util.hash_array(valores)
+    return hashes
+
+
+class IndiceHashLinhas:
+    """
+    Índice compacto de hashes de linha por chave natural.
+    
+    Três arrays alinhados e ordenados por `chaves` (24 bytes/linha):
+    - chaves: hash(chave natural, ocorrência da chave no arquivo)
+    - conteudos: hash do registro inteiro
+    - valores: COLUNA_VALOR_INDICE do registro gravado (NaN se desconhecido)
+    
+    A consulta é uma busca binária vetorizada (np.searchsorted) sobre o lote.
+    """
+    
+    def __init__(self, chaves=None, conteudos=None, valores=None):
+        self.chaves = np.zeros(0, dtype=np.uint64) if chaves is None else chaves
+        self.conteudos = np.zeros(0, dtype=np.uint64) if conteudos is None else conteudos
+        self.valores = np.full(len(self.chaves), np.nan) if valores is None else valores
+    
+    def __len__(self):
+        return len(self.chaves)
+    
+    @staticmethod
+    def hashes(df, colunas_chave):
+        """
+        Hashes das linhas de um lote.
+        
+        A ocorrência (0, 1, ...) é a ordem de aparição dos conteúdos
+        distintos de uma mesma chave natural; linhas idênticas repetidas
+        compartilham a ocorrência da primeira aparição. Assim a releitura
+        do arquivo reproduz as mesmas chaves.
+        
+        Returns
+        -------
+        tuple
+            (chaves, conteudos, repetidas: bool - cópia exata de linha anterior do lote)
+        """
+        bases, conteudos = IndiceHashLinhas._bases_conteudos(df, colunas_chave)
+        pares = pd.DataFrame({'base': bases, 'conteudo': conteudos})
+        
+        # ngroup(sort=False) numera na ordem de aparição → rank denso dentro da chave
+        grupo = pares.groupby(['base', 'conteudo'], sort=False).ngroup()
+        ocorrencias = grupo.groupby(bases).rank(method='dense').to_numpy(dtype=np.int64) - 1
+        
+        return IndiceHashLinhas._chaves(bases, ocorrencias), conteudos, pares.duplicated().to_numpy()
+    
+    def hashes_cauda(self, df, colunas_chave):
+        """
+        Hashes das linhas anexadas ao arquivo (leitura da cauda).
+        
+        A cauda vem depois de todas as linhas gravadas: um conteúdo igual
+        ao de uma ocorrência gravada da chave reutiliza essa ocorrência
+        (duplicata); um conteúdo novo recebe as ocorrências seguintes às
+        gravadas, e não 0, 1, ... - que sobrescreveriam registros gravados
+        como atualização. A releitura completa reproduz as mesmas chaves.
+        
+        Returns
+        -------
+        tuple
+            (chaves, conteudos, repetidas), como hashes()
+        """
+        bases, conteudos = self._bases_conteudos(df, colunas_chave)
+        pares = pd.DataFrame({'base': bases, 'conteudo': conteudos})
+        
+        # Ocorrências gravadas de cada chave: sondagem k = 0, 1, ... até faltar
+        ocorrencias = np.full(len(bases), -1, dtype=np.int64)
+        gravadas = np.zeros(len(bases), dtype=np.int64)
+        sondar = np.arange(len(bases)) if len(self) else np.zeros(0, dtype=np.int64)
+        k = 0
+        while len(sondar):
+            chaves_k = self._chaves(bases[sondar], np.full(len(sondar), k, dtype=np.int64))
+            encontradas = np.minimum(np.searchsorted(self.chaves, chaves_k), len(self) - 1)
+            existe = self.chaves[encontradas] == chaves_k
+            mesmo_conteudo = existe & (self.conteudos[encontradas] == conteudos[sondar]) & (ocorrencias[sondar] < 0)
+            ocorrencias[sondar[mesmo_conteudo]] = k
+            gravadas[sondar[existe]] = k + 1
+            sondar = sondar[existe]
+            k += 1
+        
+        novas = ocorrencias < 0
+        if novas.any():
+            grupo = pares[novas].groupby(['base', 'conteudo'], sort=False).ngroup()
+            ordem = grupo.groupby(bases[novas]).rank(method='dense').to_numpy(dtype=np.int64) - 1
+            ocorrencias[novas] = gravadas[novas] + ordem
+        
+        return self._chaves(bases, ocorrencias), conteudos, pares.duplicated().to_numpy()
+    
+    @staticmethod
+    def _bases_conteudos(df, colunas_chave):
+        """Hash da chave natural e hash do registro inteiro de cada linha."""
+        por_coluna = _hashes_por_coluna(df)
+        bases = _combinar_hashes(*(por_coluna[coluna] for coluna in colunas_chave))
+        return bases, _combinar_hashes(*por_coluna.values())
+    
+    @staticmethod
+    def _chaves(bases, ocorrencias):
+        """Chave do índice: hash(chave natural, ocorrência)."""
+        return _combinar_hashes(bases, pd.util.hash_array(ocorrencias))
+    
+    def classificar(self, chaves, conteudos, repetidas):
+        """
+        Classe de cada linha: inserção, atualização ou duplicata.
+        
+        Returns
+        -------
+        tuple
+            (classes: np.ndarray[int8], posicoes no índice)
+        """
+        posicoes = np.searchsorted(self.chaves, chaves)
+        if len(self) == 0:
+            classes = np.full(len(chaves), CLASSE_INSERCAO, dtype=np.int8)
+        else:
+            encontradas = np.minimum(posicoes, len(self) - 1)
+            existe = self.chaves[encontradas] == chaves
+            mesmo_conteudo = existe & (self.conteudos[encontradas] == conteudos)
+            classes = np.where(
+                ~existe, CLASSE_INSERCAO,
+                np.where(mesmo_conteudo, CLASSE_DUPLICATA, CLASSE_ATUALIZACAO)
+            ).astype(np.int8)
+        
+        classes[repetidas] = CLASSE_DUPLICATA
+        return classes, posicoes
+    
+    def aplicar(self, chaves, conteudos, classes, posicoes, valores):
+        """Grava atualizações no lugar e intercala inserções mantendo a ordem."""
+        atualizar = classes == CLASSE_ATUALIZACAO
+        self.conteudos[posicoes[atualizar]] = conteudos[atualizar]
+        self.valores[posicoes[atualizar]] = valores[atualizar]
+        
+        inserir = classes == CLASSE_INSERCAO
+        if inserir.any():
+            ordem = np.argsort(chaves[inserir], kind='stable')
+            novas_chaves = chaves[inserir][ordem]
+            destino = np.searchsorted(self.chaves, novas_chaves)
+            self.chaves = np.insert(self.chaves, destino, novas_chaves)
+            self.conteudos = np.insert(self.conteudos, destino, conteudos[inserir][ordem])
+            self.valores = np.insert(self.valores, destino, valores[inserir][ordem])
+
+
 class IncrementalLoader:
     """
     Gerenciador de carga incremental baseada em timestamp.
     
     Evita 'Full Reload' processando apenas registros novos/modificados.
+    
+    Leitura por offset (ler_incremental): o checkpoint do arquivo guarda
+    offset em bytes/linhas e a impressão digital (inode, tamanho, mtime,
+    hash do cabeçalho, hash dos bytes imediatamente antes do offset). Se o
+    arquivo apenas cresceu, só a cauda anexada é lida e parseada; se foi
+    reescrito ou truncado, a leitura volta a ser completa (e o índice de
+    hashes descarta o que já foi carregado).
+    
+    Dados atrasados: registros com data anterior ao watermark são aceitos
+    e deduplicados pelo índice. Na releitura completa (arquivo reescrito),
+    a janela retroativa (partições mensais desde watermark -
+    janela_retroativa_dias) limita a reclassificação e os registros
+    anteriores a ela são contados e ignorados; linhas da cauda anexada são
+    novas por construção e nunca passam pela janela.
     """
     
-    def __init__(self, db_path):
+    def __init__(self, db_path, janela_retroativa_dias=JANELA_RETROATIVA_DIAS):
         self.db_path = db_path
+        self.janela_retroativa_dias = janela_retroativa_dias
         self.conn = None
         self._inicializar_db()
     
     def _inicializar_db(self):
-        """Cria banco de metadados se não existir."""
+        """Abre o banco de metadados (WAL, busy timeout; tabelas em MetadataStore)."""
+        
+        self.store = MetadataStore(self.db_path)
+        self.conn = self.store.conn
+        
+        # Estado calculado na execução e gravado só no commit (gravar_pendente)
+        self.checkpoint_pendente = None
+        self.indice_pendente = None
+        self.watermark_pendente = None
+        self.bytes_pendentes = 0
+        # Bytes de dados lidos pela última ler_incremental (cauda anexada ou arquivo inteiro)
+        self.bytes_lidos = 0
+        # Última ler_incremental leu só a cauda anexada (consumido por carregar_incremental)
+        self.leitura_anexada = False
+        self.ultima_classificacao = {}
+        # Versões antigas das linhas atualizadas (com o valor gravado no índice)
+        self.substituidos = None
+    
+    @staticmethod
+    def _hash_ancora(f, offset):
+        """SHA-256 dos TAMANHO_ANCORA_BYTES bytes que terminam em `offset`."""
+        inicio = max(0, offset - TAMANHO_ANCORA_BYTES)
+        f.seek(inicio)
+        return hashlib.sha256(f.read(offset - inicio)).hexdigest()
+    
+    @staticmethod
+    def _fim_ultima_linha(f, inicio, tamanho):
+        """
+        Posição logo após o último '\\n' em [inicio, tamanho).
         
-        # Criar diretório
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        Uma linha final sem quebra (escrita em andamento) fica para a
+        próxima leitura.
+        """
+        fim = tamanho
+        while fim > inicio:
+            bloco_inicio = max(inicio, fim - TAMANHO_ANCORA_BYTES)
+            f.seek(bloco_inicio)
+            posicao = f.read(fim - bloco_inicio).rfind(b'\n')
+            if posicao >= 0:
+                return bloco_inicio + posicao + 1
+            fim = bloco_inicio
+        return inicio
+    
+    def obter_checkpoint(self, pipeline_nome):
+        """Checkpoint de leitura do pipeline (dict) ou None."""
+        cursor = self.conn.execute("""
+            SELECT caminho, inode, mtime_ns, tamanho_bytes, offset_bytes, linhas,
+                   hash_cabecalho, hash_ancora
+            FROM checkpoint_arquivo WHERE pipeline_nome = ?
+        """, (pipeline_nome,))
+        resultado = cursor.fetchone()
+        if resultado is None:
+            return None
+        chaves = ('caminho', 'inode', 'mtime_ns', 'tamanho_bytes', 'offset_bytes', 'linhas',
+                  'hash_cabecalho', 'hash_ancora')
+        return dict(zip(chaves, resultado))
+    
+    def ler_incremental(self, caminho_csv, pipeline_nome, max_bytes=None):
+        """
+        Lê apenas as linhas anexadas ao CSV desde o último checkpoint.
         
-        # Conectar
-        self.conn = sqlite3.connect(self.db_path)
+        O novo checkpoint fica pendente até gravar_pendente().
         
-        # Criar tabela de watermark
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS watermark (
-                pipeline_nome TEXT PRIMARY KEY,
-                ultimo_timestamp_processado TEXT,
-                ultimo_hash TEXT,
-                registros_processados INTEGER,
-                data_atualizacao TEXT
+        Parameters
+        ----------
+        caminho_csv : str
+            Arquivo de origem
+        pipeline_nome : str
+            Nome do pipeline
+        max_bytes : int, optional
+            Limite de bytes lidos (linhas completas); as linhas completas
+            restantes (self.bytes_pendentes) ficam para a próxima leitura
+        
+        Returns
+        -------
+        pd.DataFrame
+            Linhas anexadas (ou o arquivo inteiro, se reescrito/sem checkpoint)
+        """
+        
+        checkpoint = self.obter_checkpoint(pipeline_nome)
+        estado = os.stat(caminho_csv)
+        tamanho = estado.st_size
+        
+        with open(caminho_csv, 'rb') as f:
+            cabecalho = f.readline()
+            hash_cabecalho = hashlib.sha256(cabecalho).hexdigest()
+            
+            anexado = (
+                checkpoint is not None
+                and checkpoint['caminho'] == str(caminho_csv)
+                and checkpoint['inode'] == estado.st_ino
+                and tamanho >= checkpoint['offset_bytes']
+                # Mesmo tamanho com mtime novo: edição no lugar, não append
+                and (tamanho > checkpoint['tamanho_bytes'] or estado.st_mtime_ns == checkpoint['mtime_ns'])
+                and checkpoint['hash_cabecalho'] == hash_cabecalho
+                and self._hash_ancora(f, checkpoint['offset_bytes']) == checkpoint['hash_ancora']
             )
-        """)
-        self.conn.commit()
+            
+            if anexado:
+                inicio = checkpoint['offset_bytes']
+                linhas_anteriores = checkpoint['linhas']
+                print(f"   ⚡ Arquivo anexado: lendo a partir do byte {inicio:,} ({linhas_anteriores} linhas já lidas)")
+            else:
+                inicio = len(cabecalho)
+                linhas_anteriores = 0
+                motivo = "sem checkpoint" if checkpoint is None else "arquivo reescrito ou truncado"
+                print(f"   🔁 Leitura completa ({motivo})")
+            
+            limite = tamanho if max_bytes is None else min(tamanho, inicio + max_bytes)
+            fim = self._fim_ultima_linha(f, inicio, limite)
+            if fim == inicio and limite < tamanho:
+                # Linha maior que max_bytes: lida inteira
+                fim = self._fim_ultima_linha(f, inicio, tamanho)
+            # Linhas completas que ficaram para a próxima leitura (backlog)
+            self.bytes_pendentes = self._fim_ultima_linha(f, fim, tamanho) - fim if limite < tamanho else 0
+            f.seek(inicio)
+            dados = f.read(fim - inicio)
+            hash_ancora = self._hash_ancora(f, fim)
+        
+        df = pd.read_csv(io.BytesIO(cabecalho + dados))
+        self.leitura_anexada = anexado
+        self.bytes_lidos = fim - inicio
+        
+        self.checkpoint_pendente = {
+            'pipeline_nome': pipeline_nome,
+            'caminho': str(caminho_csv),
+            'inode': estado.st_ino,
+            'mtime_ns': estado.st_mtime_ns,
+            'tamanho_bytes': tamanho,
+            'offset_bytes': fim,
+            'linhas': linhas_anteriores + len(df),
+            'hash_cabecalho': hash_cabecalho,
+            'hash_ancora': hash_ancora
+        }
+        
+        if anexado and tamanho > 0:
+            print(f"   💰 {fim - inicio:,} de {tamanho:,} bytes lidos ({(1 - (fim - inicio) / tamanho) * 100:.1f}% do arquivo NÃO relido)")
+        
+        return df
+    
+    def salvar_checkpoint(self):
+        """Grava o checkpoint pendente da última ler_incremental() (sem commit)."""
+        
+        if self.checkpoint_pendente is None:
+            return
+        
+        c = self.checkpoint_pendente
+        self.conn.execute("""
+            INSERT OR REPLACE INTO checkpoint_arquivo
+            (pipeline_nome, caminho, inode, mtime_ns, tamanho_bytes, offset_bytes, linhas,
+             hash_cabecalho, hash_ancora, data_atualizacao)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            c['pipeline_nome'], c['caminho'], c['inode'], c['mtime_ns'], c['tamanho_bytes'], c['offset_bytes'],
+            c['linhas'], c['hash_cabecalho'], c['hash_ancora'], datetime.now().isoformat()
+        ))
     
     def obter_ultimo_watermark(self, pipeline_nome):
         """
@@ -352,7 +895,8 @@ class IncrementalLoader:
     
     def atualizar_watermark(self, pipeline_nome, timestamp, hash_dados, num_registros):
         """
-        Atualiza watermark após processamento bem-sucedido.
+        Atualiza watermark após processamento bem-sucedido (sem commit:
+        faz parte da transação de gravar_pendente/confirmar_pendente).
         
         Parameters
         ----------
@@ -378,11 +922,79 @@ class IncrementalLoader:
             num_registros,
             datetime.now().isoformat()
         ))
-        self.conn.commit()
     
-    def carregar_incremental(self, df, coluna_timestamp, pipeline_nome):
+    def carregar_indice(self, pipeline_nome):
+        """Índice de hashes de linha persistido (vazio se não existir)."""
+        cursor = self.conn.execute(
+            "SELECT chaves, conteudos, valores FROM indice_hash_linhas WHERE pipeline_nome = ?",
+            (pipeline_nome,)
+        )
+        resultado = cursor.fetchone()
+        if resultado is None:
+            return IndiceHashLinhas()
+        chaves, conteudos, valores = resultado
+        return IndiceHashLinhas(
+            np.frombuffer(chaves, dtype=np.uint64).copy(),
+            np.frombuffer(conteudos, dtype=np.uint64).copy(),
+            # Índices gravados antes da coluna valores: valores desconhecidos
+            None if valores is None else np.frombuffer(valores, dtype=np.float64).copy()
+        )
+    
+    def salvar_indice(self, pipeline_nome, indice):
+        """Grava o índice de hashes de linha (sem commit)."""
+        self.conn.execute("""
+            INSERT OR REPLACE INTO indice_hash_linhas
+            (pipeline_nome, linhas, chaves, conteudos, valores, data_atualizacao)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            pipeline_nome,
+            len(indice),
+            indice.chaves.tobytes(),
+            indice.conteudos.tobytes(),
+            indice.valores.astype(np.float64).tobytes(),
+            datetime.now().isoformat()
+        ))
+    
+    def gravar_pendente(self):
         """
-        Carrega apenas registros após último watermark.
+        Grava checkpoint, índice e watermark pendentes na transação corrente.
+        
+        Sem commit: o chamador decide a fronteira da transação
+        (confirmar_pendente ou ExecucaoTransacional.confirmar).
+        """
+        self.salvar_checkpoint()
+        if self.indice_pendente is not None:
+            self.salvar_indice(*self.indice_pendente)
+        if self.watermark_pendente is not None:
+            self.atualizar_watermark(*self.watermark_pendente)
+        self.checkpoint_pendente = self.indice_pendente = self.watermark_pendente = None
+    
+    def confirmar_pendente(self):
+        """Grava o estado pendente em uma única transação."""
+        with self.store.transacao():
+            self.gravar_pendente()
+    
+    def descartar_pendente(self):
+        """Descarta o estado pendente de uma execução abortada."""
+        self.checkpoint_pendente = self.indice_pendente = self.watermark_pendente = None
+    
+    def carregar_incremental(self, df, coluna_timestamp, pipeline_nome, confirmar=True,
+                             janela_retroativa=True):
+        """
+        Carrega apenas registros novos ou alterados.
+        
+        Cada linha é classificada contra o índice de hashes por chave
+        natural (CHAVE_NATURAL): inserção, atualização (mesma chave,
+        conteúdo diferente) ou duplicata (já carregada). Só inserções e
+        atualizações seguem adiante - correções em datas antigas são
+        capturadas e arquivos reprocessados não contam em dobro.
+        
+        A janela retroativa só filtra releituras completas; a cauda
+        anexada lida por ler_incremental é classificada inteira, com as
+        chaves repetidas numeradas depois das ocorrências já gravadas
+        (IndiceHashLinhas.hashes_cauda). As versões substituídas pelas
+        atualizações, com o valor antigo de COLUNA_VALOR_INDICE, ficam em
+        self.substituidos para o baseline retirá-las.
         
         Parameters
         ----------
@@ -392,11 +1004,18 @@ class IncrementalLoader:
             Coluna que contém timestamp
         pipeline_nome : str
             Nome do pipeline
+        confirmar : bool
+            True: grava watermark/índice/checkpoint imediatamente. False:
+            ficam pendentes até o commit da execução (ExecucaoTransacional)
+        janela_retroativa : bool
+            False desliga a janela (streaming: arquivos fora de ordem de data
+            compartilham o watermark do pipeline)
         
         Returns
         -------
         pd.DataFrame
-            Apenas registros novos/modificados
+            Apenas registros novos/modificados (contagens por classe em
+            self.ultima_classificacao)
         """
         
         print(f"⚡ Carga Incremental (Pipeline: {pipeline_nome})...")
@@ -407,47 +1026,459 @@ class IncrementalLoader:
         # Obter último watermark
         ultimo_watermark = self.obter_ultimo_watermark(pipeline_nome)
         
+        # Janela retroativa: na releitura completa, apenas partições (meses)
+        # desde watermark - janela; a cauda anexada só contém linhas novas
+        leitura_anexada, self.leitura_anexada = self.leitura_anexada, False
+        df_janela = df
+        if (ultimo_watermark is not None and self.janela_retroativa_dias is not None
+                and janela_retroativa and not leitura_anexada):
+            limite = (
+                pd.to_datetime(ultimo_watermark) - pd.Timedelta(days=self.janela_retroativa_dias)
+            ).to_period('M').start_time
+            df_janela = df[~(df[coluna_timestamp] < limite)]
+            
+            print(f"   ⏳ Janela retroativa: {self.janela_retroativa_dias} dias (partições desde {limite.date()})")
+            if len(df_janela) < len(df):
+                print(f"   ⚠️ {len(df) - len(df_janela)} registros anteriores à janela ignorados")
+        
+        # Classificar linhas contra o índice de hashes (vetorizado)
+        indice = self.carregar_indice(pipeline_nome)
+        if leitura_anexada:
+            chaves, conteudos, repetidas = indice.hashes_cauda(df_janela, CHAVE_NATURAL)
+        else:
+            chaves, conteudos, repetidas = indice.hashes(df_janela, CHAVE_NATURAL)
+        classes, posicoes = indice.classificar(chaves, conteudos, repetidas)
+        alterada = classes != CLASSE_DUPLICATA
+        df_delta = df_janela[alterada]
+        
+        valores = (
+            pd.to_numeric(df_janela[COLUNA_VALOR_INDICE], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            if COLUNA_VALOR_INDICE in df_janela.columns else np.full(len(df_janela), np.nan)
+        )
+        atualizada = classes == CLASSE_ATUALIZACAO
+        self.substituidos = df_janela[atualizada].assign(**{COLUNA_VALOR_INDICE: indice.valores[posicoes[atualizada]]})
+        self.ultima_classificacao = {
+            'insercoes': int((classes == CLASSE_INSERCAO).sum()),
+            'atualizacoes': int((classes == CLASSE_ATUALIZACAO).sum()),
+            'duplicados': len(df_janela) - len(df_delta),
+            'fora_da_janela': len(df) - len(df_janela)
+        }
+        
         if ultimo_watermark is None:
             # Primeira execução: carga completa
             print(f"   🆕 Primeira execução: processando {len(df)} registros (FULL LOAD)")
-            df_delta = df
         else:
-            # Carga incremental: apenas após watermark
-            ultimo_watermark_dt = pd.to_datetime(ultimo_watermark)
-            df_delta = df[df[coluna_timestamp] > ultimo_watermark_dt]
-            
-            print(f"   ⚡ Incremental: {len(df_delta)} novos registros desde {ultimo_watermark}")
-            print(f"   💰 Economia: {((len(df) - len(df_delta)) / len(df) * 100):.1f}% de registros NÃO processados")
+            print(f"   ⚡ Incremental: {self.ultima_classificacao['insercoes']} novos, "
+                  f"{self.ultima_classificacao['atualizacoes']} alterados, "
+                  f"{self.ultima_classificacao['duplicados']} duplicados ignorados (watermark {ultimo_watermark})")
+            if len(df) > 0:
+                print(f"   💰 Economia: {((len(df) - len(df_delta)) / len(df) * 100):.1f}% de registros NÃO processados")
         
-        # Atualizar watermark se houver novos dados
+        # Atualizar watermark e índice se houver novos dados
         if len(df_delta) > 0:
-            novo_watermark = df_delta[coluna_timestamp].max().isoformat()
+            novo_watermark = df_delta[coluna_timestamp].max()
+            if ultimo_watermark is not None:
+                # Correções em datas antigas não recuam o watermark
+                novo_watermark = max(novo_watermark, pd.to_datetime(ultimo_watermark))
+            novo_watermark = novo_watermark.isoformat()
             hash_dados = pd.util.hash_pandas_object(df_delta).sum()
             
-            self.atualizar_watermark(
+            indice.aplicar(chaves, conteudos, classes, posicoes, valores)
+            self.indice_pendente = (pipeline_nome, indice)
+            self.watermark_pendente = (
                 pipeline_nome,
                 novo_watermark,
                 str(hash_dados),
                 len(df_delta)
             )
         
+        if confirmar:
+            self.confirmar_pendente()
+        
         print()
         return df_delta
 
+
+class ExecucaoTransacional:
+    """
+    Protocolo de commit exactly-once de uma execução do monitor.
+    
+    1. iniciar(): adquire a trava do pipeline (lease em travas_pipeline),
+       reverte execuções interrompidas (remove os arquivos que chegaram a
+       ser publicados e o staging) e registra a nova execução como
+       'em_andamento'
+    2. Saídas são escritas em staging (arquivo_staging)
+    3. confirmar(): registra os destinos, publica com os.replace (rename
+       atômico) e, em UMA transação SQLite, grava watermark, índice,
+       checkpoint, baseline, o status 'concluida' e libera a trava
+       (manter_trava=True: a trava segue até liberar(), para etapas
+       pós-commit como o append de alertas ao fluxo)
+    
+    Uma falha em qualquer ponto antes do passo 3 deixa o estado no banco
+    intacto: a nova tentativa reprocessa apenas o mesmo delta e nenhuma
+    saída fica duplicada.
+    
+    O lease é renovado entre etapas (renovar) e a posse é conferida dentro
+    das transações de confirmar(): se o lease expirou e outra execução
+    assumiu o pipeline, a transação é desfeita e as saídas publicadas por
+    esta execução são removidas.
+    
+    Parameters
+    ----------
+    loader : IncrementalLoader
+        Dono da conexão com o banco de metadados
+    pipeline_nome : str
+        Nome do pipeline
+    """
+    
+    def __init__(self, loader, pipeline_nome, dir_staging=DIR_STAGING):
+        self.loader = loader
+        self.store = loader.store
+        self.conn = loader.conn
+        self.pipeline_nome = pipeline_nome
+        self.dir_staging = Path(dir_staging)
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.sufixo = uuid.uuid4().hex[:8]
+        self.execucao_id = f"{pipeline_nome}_{self.timestamp}_{self.sufixo}"
+        self.arquivos = {}
+    
+    def iniciar(self):
+        """
+        Adquire a trava, reverte execuções interrompidas e registra a nova execução.
+        
+        Returns
+        -------
+        bool
+            False se outra execução ativa detém a trava do pipeline
+        """
+        
+        if not self.store.adquirir_trava(self.pipeline_nome, self.execucao_id):
+            return False
+        
+        # Com a trava, 'em_andamento' só pode ser execução que não terminou
+        interrompidas = self.conn.execute("""
+            SELECT execucao_id, arquivos FROM execucoes_pipeline
+            WHERE pipeline_nome = ? AND status = 'em_andamento'
+        """, (self.pipeline_nome,)).fetchall()
+        
+        for execucao_id, arquivos in interrompidas:
+            publicados = json.loads(arquivos) if arquivos else []
+            for caminho in publicados:
+                Path(caminho).unlink(missing_ok=True)
+            print(f"   ♻️ Execução interrompida revertida: {execucao_id} ({len(publicados)} arquivos removidos)")
+        
+        for diretorio in self.dir_staging.glob(f"{self.pipeline_nome}_*"):
+            shutil.rmtree(diretorio, ignore_errors=True)
+        
+        with self.store.transacao():
+            self.conn.execute("""
+                UPDATE execucoes_pipeline SET status = 'revertida', data_fim = ?
+                WHERE pipeline_nome = ? AND status = 'em_andamento'
+            """, (datetime.now().isoformat(), self.pipeline_nome))
+            self.conn.execute("""
+                INSERT INTO execucoes_pipeline
+                (execucao_id, pipeline_nome, status, timestamp, data_inicio)
+                VALUES (?, ?, 'em_andamento', ?, ?)
+            """, (self.execucao_id, self.pipeline_nome, self.timestamp, datetime.now().isoformat()))
+        
+        return True
+    
+    def renovar(self):
+        """Renova o lease do pipeline (entre etapas e dentro das transações de confirmar)."""
+        if not self.store.renovar_trava(self.pipeline_nome, self.execucao_id):
+            raise RuntimeError(
+                f"Execução {self.execucao_id} perdeu a trava de {self.pipeline_nome} "
+                f"(lease expirado e assumido por outra execução)"
+            )
+    
+    def abortar(self):
+        """Libera a trava após falha (a execução segue 'em_andamento' e é revertida na próxima)."""
+        self.loader.descartar_pendente()
+        self.store.liberar_trava(self.pipeline_nome, self.execucao_id)
+    
+    def liberar(self):
+        """Libera a trava mantida por confirmar(manter_trava=True)."""
+        self.store.liberar_trava(self.pipeline_nome, self.execucao_id)
+    
+    def arquivo_staging(self, caminho_final):
+        """Caminho em staging para uma saída com destino `caminho_final`."""
+        # Nunca sobrescrever saída já publicada (execuções no mesmo segundo)
+        if Path(caminho_final).exists():
+            caminho_final = Path(caminho_final)
+            caminho_final = caminho_final.with_name(f"{caminho_final.stem}_{self.sufixo}{caminho_final.suffix}")
+        caminho_staging = self.dir_staging / self.execucao_id / Path(caminho_final).name
+        caminho_staging.parent.mkdir(parents=True, exist_ok=True)
+        self.arquivos[str(caminho_staging)] = str(caminho_final)
+        return str(caminho_staging)
+    
+    def confirmar(self, gravacoes=(), registros=0, manter_trava=False):
+        """
+        Publica as saídas e grava o estado da execução em uma transação.
+        
+        Parameters
+        ----------
+        gravacoes : iterable
+            Funções gravar(conn) executadas na mesma transação (ex.: baseline)
+        registros : int
+            Registros processados na execução
+        manter_trava : bool
+            Não liberar a trava no commit (o chamador libera com liberar())
+        
+        Returns
+        -------
+        list
+            Caminhos publicados
+        """
+        
+        publicados = list(self.arquivos.values())
+        
+        # Destinos registrados antes de publicar: a recuperação sabe o que remover
+        with self.store.transacao():
+            self.renovar()
+            self.conn.execute(
+                "UPDATE execucoes_pipeline SET arquivos = ? WHERE execucao_id = ?",
+                (json.dumps(publicados), self.execucao_id)
+            )
+        
+        for caminho_staging, caminho_final in self.arquivos.items():
+            Path(caminho_final).parent.mkdir(parents=True, exist_ok=True)
+            os.replace(caminho_staging, caminho_final)
+        
+        try:
+            with self.store.transacao():
+                # Posse conferida sob o lock de escrita: vale até o commit
+                self.renovar()
+                self.loader.gravar_pendente()
+                for gravar in gravacoes:
+                    gravar(self.conn)
+                self.conn.execute("""
+                    UPDATE execucoes_pipeline SET status = 'concluida', registros = ?, data_fim = ?
+                    WHERE execucao_id = ?
+                """, (registros, datetime.now().isoformat(), self.execucao_id))
+                if not manter_trava:
+                    self.store.liberar_trava(self.pipeline_nome, self.execucao_id)
+        except BaseException:
+            # Estado não gravado: as saídas desta execução não ficam publicadas
+            for caminho_final in publicados:
+                Path(caminho_final).unlink(missing_ok=True)
+            raise
+        
+        shutil.rmtree(self.dir_staging / self.execucao_id, ignore_errors=True)
+        
+        return publicados
+
 # ========================================
 # MÓDULO 3: ROOT CAUSE ANALYSIS (RCA)
 # ========================================
 
+def combinar_estatisticas(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    """
+    Combina estatísticas acumuladas (contagem, média, M2) de dois conjuntos.
+    
+    Fórmula de Chan et al. (generalização pareada de Welford), vetorizada:
+    delta = media_b - media_a
+    media = media_a + delta * n_b / n
+    M2 = M2_a + M2_b + delta² * n_a * n_b / n
+    
+    Parameters
+    ----------
+    n_a, media_a, m2_a : np.ndarray
+        Estatísticas acumuladas (média/M2 ignorados onde n_a = 0)
+    n_b, media_b, m2_b : np.ndarray
+        Estatísticas do delta (média/M2 ignorados onde n_b = 0)
+    
+    Returns
+    -------
+    tuple
+        (n, media, m2) - média NaN onde n = 0
+    """
+    n_a = np.asarray(n_a, dtype=float)
+    n_b = np.asarray(n_b, dtype=float)
+    media_a = np.where(n_a > 0, media_a, 0.0)
+    media_b = np.where(n_b > 0, media_b, 0.0)
+    m2_a = np.where(n_a > 0, m2_a, 0.0)
+    m2_b = np.where(n_b > 0, m2_b, 0.0)
+    
+    n = n_a + n_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = media_b - media_a
+        media = np.where(n > 0, media_a + delta * n_b / n, np.nan)
+        m2 = np.where(n > 0, m2_a + m2_b + delta ** 2 * n_a * n_b / n, 0.0)
+    
+    return n.astype(np.int64), media, m2
+
+
+def retirar_estatisticas(n, media, m2, n_b, media_b, m2_b):
+    """
+    Retira um subconjunto (n_b, media_b, m2_b) das estatísticas acumuladas.
+    
+    Inverso de combinar_estatisticas (Chan et al. resolvida para o conjunto A):
+    n_a = n - n_b
+    media_a = (n * media - n_b * media_b) / n_a
+    M2_a = M2 - M2_b - (media_b - media_a)² * n_a * n_b / n
+    
+    Parameters
+    ----------
+    n, media, m2 : np.ndarray
+        Estatísticas acumuladas (média/M2 ignorados onde n = 0)
+    n_b, media_b, m2_b : np.ndarray
+        Estatísticas a retirar (média/M2 ignorados onde n_b = 0)
+    
+    Returns
+    -------
+    tuple
+        (n_a, media_a, m2_a) - média NaN onde n_a = 0
+    """
+    n = np.asarray(n, dtype=float)
+    n_b = np.asarray(n_b, dtype=float)
+    media = np.where(n > 0, media, 0.0)
+    media_b = np.where(n_b > 0, media_b, 0.0)
+    m2 = np.where(n > 0, m2, 0.0)
+    m2_b = np.where(n_b > 0, m2_b, 0.0)
+    
+    n_a = np.maximum(n - n_b, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_a = np.where(n_a > 0, (n * media - n_b * media_b) / n_a, np.nan)
+        delta = media_b - media_a
+        # Cancelamento numérico pode deixar M2 levemente negativo
+        m2_a = np.where(n_a > 0, np.maximum(m2 - m2_b - delta ** 2 * n_a * n_b / n, 0.0), 0.0)
+    
+    return n_a.astype(np.int64), media_a, m2_a
+
+
+def _kesimo_desvio(valores, inicios, abaixo, acima, mediana, k):
+    """
+    k-ésimo menor |x - mediana| de cada grupo (k por grupo).
+    
+    Com os valores do grupo ordenados, os desvios à esquerda da mediana
+    (lidos da direita para a esquerda) e à direita já são duas sequências
+    crescentes: o k-ésimo da união sai de uma busca binária vetorizada
+    sobre todos os grupos, sem ordenar os desvios.
+    """
+    def desvio_abaixo(i):
+        return mediana - valores[np.clip(inicios + abaixo - 1 - i, 0, len(valores) - 1)]
+    
+    def desvio_acima(j):
+        return valores[np.clip(inicios + abaixo + j, 0, len(valores) - 1)] - mediana
+    
+    # i = quantos dos k + 1 menores desvios vêm da esquerda
+    baixo = np.maximum(0, k + 1 - acima)
+    alto = np.minimum(k + 1, abaixo)
+    while np.any(baixo < alto):
+        meio = (baixo + alto) // 2
+        avancar = (baixo < alto) & (desvio_abaixo(meio) < desvio_acima(k - meio))
+        baixo = np.where(avancar, meio + 1, baixo)
+        alto = np.where(avancar | (baixo >= alto), alto, meio)
+    
+    return np.maximum(
+        np.where(baixo > 0, desvio_abaixo(baixo - 1), -np.inf),
+        np.where(k - baixo >= 0, desvio_acima(k - baixo), -np.inf)
+    )
+
+
+def estatisticas_por_grupo(valores, codigos, n_grupos):
+    """
+    Contagem, média, desvio, mediana, MAD e desvio absoluto médio por grupo.
+    
+    Uma passada para todas as dimensões: `codigos` traz uma linha de
+    códigos de grupo por dimensão (com deslocamento, grupos disjuntos).
+    Os valores são ordenados uma única vez; cada dimensão só faz uma
+    ordenação estável (radix) pelos códigos, em O(n). Mediana e MAD saem
+    das posições dentro de cada grupo, sem ordenar por dimensão.
+    
+    Parameters
+    ----------
+    valores : np.ndarray
+        Valores (float; NaN ignorado)
+    codigos : np.ndarray
+        Códigos de grupo [dimensões, linhas] (int64; -1 ignorado)
+    n_grupos : int
+        Total de grupos (todas as dimensões)
+    
+    Returns
+    -------
+    dict
+        {'contagem', 'media', 'desvio', 'mediana', 'mad', 'desvio_medio'} → arrays por grupo
+    """
+    ordem_valores = np.argsort(valores, kind='stable')
+    ordem_valores = ordem_valores[~np.isnan(valores[ordem_valores])]
+    
+    # (grupo, valor) crescentes: ordenação estável pelos códigos sobre a ordem dos valores
+    linhas, grupos = [], []
+    for codigos_dimensao in codigos:
+        linhas_dimensao = ordem_valores[codigos_dimensao[ordem_valores] >= 0]
+        grupos_dimensao = codigos_dimensao[linhas_dimensao]
+        chave = grupos_dimensao
+        if len(chave) and chave.max() - chave.min() < np.iinfo(np.uint16).max:
+            chave = (chave - chave.min()).astype(np.uint16)  # radix sort
+        ordem = np.argsort(chave, kind='stable')
+        linhas.append(linhas_dimensao[ordem])
+        grupos.append(grupos_dimensao[ordem])
+    
+    valores = valores[np.concatenate(linhas)]
+    grupos = np.concatenate(grupos)
+    
+    contagem = np.bincount(grupos, minlength=n_grupos)
+    inicios = np.concatenate(([0], np.cumsum(contagem)[:-1]))
+    vazio = contagem == 0
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = np.bincount(grupos, weights=valores, minlength=n_grupos) / contagem
+        m2 = np.bincount(grupos, weights=(valores - media[grupos]) ** 2, minlength=n_grupos)
+        desvio = np.sqrt(m2 / (contagem - 1))
+        
+        mediana = np.full(n_grupos, np.nan)
+        mad = np.full(n_grupos, np.nan)
+        if len(valores):
+            ultimo = len(valores) - 1
+            mediana = (valores[np.minimum(inicios + (contagem - 1) // 2, ultimo)]
+                       + valores[np.minimum(inicios + contagem // 2, ultimo)]) / 2
+            mediana = np.where(vazio, np.nan, mediana)
+            
+            abaixo = np.bincount(grupos, weights=valores < mediana[grupos], minlength=n_grupos).astype(np.int64)
+            acima = contagem - abaixo
+            mad = (_kesimo_desvio(valores, inicios, abaixo, acima, mediana, (contagem - 1) // 2)
+                   + _kesimo_desvio(valores, inicios, abaixo, acima, mediana, contagem // 2)) / 2
+            mad = np.where(vazio, np.nan, mad)
+        
+        desvio_medio = np.bincount(grupos, weights=np.abs(valores - mediana[grupos]), minlength=n_grupos) / contagem
+    
+    return {
+        'contagem': contagem,
+        'media': media,
+        'desvio': desvio,
+        'mediana': mediana,
+        'mad': mad,
+        'desvio_medio': desvio_medio
+    }
+
+
 class AnomalyDetector:
     """
     Detector de anomalias em lucro com análise de causa raiz.
     
     Dispara alertas se lucro oscilar > 100% da média histórica sazonal.
+    detectar_anomalias_robustas compara cada transação com seus pares no
+    lote em várias dimensões (z-score, mediana/MAD, desvio percentual).
+    
+    Com db_path, o baseline sazonal é mantido como estatísticas acumuladas
+    (contagem, média, M2) por (país, trimestre) no banco de metadados do
+    monitor e atualizado apenas com o delta de cada execução.
     """
     
-    def __init__(self):
+    def __init__(self, db_path=None):
         self.baseline_sazonal = None
         self.alertas = []
+        self.db_path = db_path
+        self.conn = None
+        self.baseline_pendente = []
+        if db_path is not None:
+            self._inicializar_db()
+    
+    def _inicializar_db(self):
+        """Abre o banco de metadados (tabela baseline_sazonal em MetadataStore)."""
+        self.store = MetadataStore(self.db_path)
+        self.conn = self.store.conn
     
     def calcular_baseline_sazonal(self, df):
         """
@@ -490,10 +1521,180 @@ class AnomalyDetector:
         
         return baseline
     
+    def carregar_baseline_sazonal(self, pipeline_nome):
+        """
+        Monta o baseline a partir das estatísticas persistidas.
+        
+        Returns
+        -------
+        dict
+            {(pais, trimestre): {'media': float, 'desvio': float, 'num_transacoes': int}}
+        """
+        
+        linhas = self.conn.execute("""
+            SELECT pais, trimestre, num_transacoes, contagem, media, m2
+            FROM baseline_sazonal WHERE pipeline_nome = ?
+        """, (pipeline_nome,)).fetchall()
+        
+        self.baseline_sazonal = self._baseline_de_estatisticas(linhas)
+        return self.baseline_sazonal
+    
+    @staticmethod
+    def _baseline_de_estatisticas(linhas):
+        """Baseline a partir de linhas (pais, trimestre, num_transacoes, contagem, media, m2)."""
+        baseline = {}
+        for pais, trimestre, num_transacoes, contagem, media, m2 in linhas:
+            baseline[(pais, trimestre)] = {
+                'media': media if contagem > 0 and media is not None else np.nan,
+                # Desvio amostral (ddof=1), como pandas .std()
+                'desvio': float(np.sqrt(m2 / (contagem - 1))) if contagem > 1 else np.nan,
+                'num_transacoes': num_transacoes
+            }
+        return baseline
+    
+    @staticmethod
+    def _estatisticas_por_grupo(df):
+        """Contagem, média e M2 de profit por (país, trimestre) de um lote."""
+        dados = pd.DataFrame({
+            'pais': df['country'],
+            'trimestre': pd.to_datetime(df['date']).dt.quarter,
+            'profit': df['profit']
+        })
+        grupos = dados.groupby(['pais', 'trimestre'])['profit']
+        contagem = grupos.count()
+        return pd.DataFrame({
+            'num_transacoes': grupos.size(),
+            'contagem': contagem,
+            'media': grupos.mean(),
+            'm2': grupos.var(ddof=0) * contagem
+        })
+    
+    def atualizar_baseline_sazonal(self, df_delta, pipeline_nome, confirmar=True, df_substituidos=None):
+        """
+        Atualiza o baseline persistido apenas com os registros novos.
+        
+        Estatísticas do delta por (país, trimestre) são combinadas às
+        acumuladas (combinar_estatisticas) e gravadas em uma transação; o
+        custo é proporcional ao delta e ao número de grupos, não ao histórico.
+        As versões antigas das linhas atualizadas são retiradas antes
+        (retirar_estatisticas), para a correção substituir a observação em
+        vez de somar uma nova.
+        
+        Parameters
+        ----------
+        df_delta : pd.DataFrame
+            Registros da carga incremental
+        pipeline_nome : str
+            Nome do pipeline (mesmo do watermark)
+        confirmar : bool
+            True: grava as estatísticas imediatamente. False: ficam
+            pendentes para gravar_baseline(conn) na transação da execução
+        df_substituidos : pd.DataFrame, optional
+            Versões antigas das linhas atualizadas, com o profit gravado
+            (IncrementalLoader.substituidos)
+        
+        Returns
+        -------
+        dict
+            {(pais, trimestre): {'media': float, 'desvio': float, 'num_transacoes': int}}
+        """
+        
+        if self.conn is None:
+            raise ValueError("Baseline incremental requer db_path (AnomalyDetector(db_path=...))")
+        
+        print("📊 Atualizando Baseline Sazonal (incremental)...")
+        
+        estatisticas = self._estatisticas_por_grupo(df_delta)
+        substituidos = 0 if df_substituidos is None else len(df_substituidos)
+        if substituidos == 0:
+            retiradas = estatisticas.iloc[:0]
+        else:
+            retiradas = self._estatisticas_por_grupo(df_substituidos)
+        grupos_alterados = estatisticas.index.union(retiradas.index)
+        
+        armazenadas = pd.read_sql_query("""
+            SELECT pais, trimestre, num_transacoes, contagem, media, m2
+            FROM baseline_sazonal WHERE pipeline_nome = ?
+        """, self.conn, params=(pipeline_nome,))
+        linhas = {
+            (pais, trimestre): (pais, trimestre, num_transacoes, contagem, media, m2)
+            for pais, trimestre, num_transacoes, contagem, media, m2
+            in armazenadas.itertuples(index=False)
+        }
+        
+        self.baseline_pendente = []
+        if len(grupos_alterados) > 0:
+            chaves = pd.MultiIndex.from_arrays([
+                grupos_alterados.get_level_values('pais').astype(str),
+                grupos_alterados.get_level_values('trimestre').astype(np.int64)
+            ])
+            atuais = armazenadas.set_index(['pais', 'trimestre']).reindex(chaves)
+            novas = estatisticas.reindex(grupos_alterados)
+            antigas = retiradas.reindex(grupos_alterados)
+            
+            n, media, m2 = retirar_estatisticas(
+                atuais['contagem'].fillna(0).to_numpy(),
+                atuais['media'].to_numpy(dtype=float),
+                atuais['m2'].to_numpy(dtype=float),
+                antigas['contagem'].fillna(0).to_numpy(),
+                antigas['media'].to_numpy(dtype=float),
+                antigas['m2'].to_numpy(dtype=float)
+            )
+            n, media, m2 = combinar_estatisticas(
+                n, media, m2,
+                novas['contagem'].fillna(0).to_numpy(),
+                novas['media'].to_numpy(dtype=float),
+                novas['m2'].to_numpy(dtype=float)
+            )
+            num_transacoes = (
+                atuais['num_transacoes'].fillna(0).to_numpy(dtype=np.int64)
+                - antigas['num_transacoes'].fillna(0).to_numpy(dtype=np.int64)
+                + novas['num_transacoes'].fillna(0).to_numpy(dtype=np.int64)
+            )
+            
+            data_atualizacao = datetime.now().isoformat()
+            for (pais, trimestre), total, contagem_grupo, media_grupo, m2_grupo in zip(chaves, num_transacoes, n, media, m2):
+                media_grupo = None if np.isnan(media_grupo) else float(media_grupo)
+                self.baseline_pendente.append((
+                    pipeline_nome, pais, int(trimestre), int(total), int(contagem_grupo),
+                    media_grupo, float(m2_grupo), data_atualizacao
+                ))
+                linhas[(pais, int(trimestre))] = (pais, int(trimestre), int(total), int(contagem_grupo), media_grupo, float(m2_grupo))
+        
+        if confirmar:
+            with self.store.transacao():
+                self.gravar_baseline(self.conn)
+        
+        baseline = self._baseline_de_estatisticas(linhas.values())
+        self.baseline_sazonal = baseline
+        
+        print(f"   ✅ {len(grupos_alterados)} combinações atualizadas com {len(df_delta)} registros novos"
+              f" ({substituidos} versões antigas retiradas)")
+        print(f"   Baseline: {len(baseline)} combinações (país, trimestre)\n")
+        
+        return baseline
+    
+    def gravar_baseline(self, conn):
+        """Grava as estatísticas pendentes na transação de `conn` (sem commit)."""
+        conn.executemany("""
+            INSERT OR REPLACE INTO baseline_sazonal
+            (pipeline_nome, pais, trimestre, num_transacoes, contagem, media, m2, data_atualizacao)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, self.baseline_pendente)
+        self.baseline_pendente = []
+    
+    def fechar(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
     def detectar_anomalias(self, df):
         """
         Detecta transações com lucro anômalo (> 100% da média sazonal).
         
+        Vetorizado: o baseline (país, trimestre) é consultado como tabela
+        densa e variação/severidade são expressões sobre arrays.
+        
         Parameters
         ----------
         df : pd.DataFrame
@@ -518,46 +1719,185 @@ class AnomalyDetector:
             print(f"   Amostra: {df.head(1).to_dict(orient='records')}")
             return pd.DataFrame()
 
-        # Preparar dados
-        df = df.copy()  # Garantir cópia para evitar warnings
-        df['date'] = pd.to_datetime(df['date'])
-        df['trimestre'] = df['date'].dt.quarter
+        # Preparar dados (sem copiar o lote: apenas colunas derivadas)
+        datas = pd.to_datetime(df['date'])
+        
+        # Join vetorizado com o baseline: tabela densa [país, trimestre] de médias.
+        # A linha extra ao final (NaN) recebe países sem baseline (get_indexer = -1)
+        # e a coluna 0 recebe datas nulas; média NaN nunca gera alerta.
+        paises = pd.Index(list(dict.fromkeys(pais for pais, _ in self.baseline_sazonal)))
+        tabela_medias = np.full((len(paises) + 1, 5), np.nan)
+        for (pais, trimestre), valores in self.baseline_sazonal.items():
+            tabela_medias[paises.get_loc(pais), int(trimestre)] = valores['media']
+        
+        codigo_pais = paises.get_indexer(df['country'])
+        trimestres = datas.dt.quarter.to_numpy(dtype=float, na_value=np.nan)
+        codigo_trimestre = np.nan_to_num(trimestres, nan=0).astype(np.int64)
+        
+        lucro_esperado = tabela_medias[codigo_pais, codigo_trimestre]
+        lucro_atual = df['profit'].to_numpy(dtype=float, na_value=np.nan)
+        
+        # Detectar oscilação > 100% (dobro ou metade da média); média zero → variação 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variacao_percentual = np.where(
+                lucro_esperado != 0,
+                (lucro_atual - lucro_esperado) / lucro_esperado * 100,
+                0.0
+            )
+        
+        # ALERTA se variação > 100% OU < -50%
+        posicoes = np.flatnonzero(np.abs(variacao_percentual) > 100)
+        
+        if len(posicoes) > 0:
+            variacao_anomala = variacao_percentual[posicoes]
+            df_anomalias = pd.DataFrame({
+                'index': df.index[posicoes],
+                'pais': df['country'].array[posicoes],
+                'produto': df['product'].array[posicoes],
+                'data': datas.iloc[posicoes].dt.strftime('%Y-%m-%d').array,
+                'trimestre': trimestres[posicoes].astype(np.int64),
+                'lucro_atual': lucro_atual[posicoes],
+                'lucro_esperado': lucro_esperado[posicoes],
+                'variacao_percentual': variacao_anomala,
+                'severidade': np.where(np.abs(variacao_anomala) > 200, 'CRÍTICA', 'ALTA')
+            })
+        else:
+            df_anomalias = pd.DataFrame()
+        
+        if len(df_anomalias) > 0:
+            print(f"   🚨 {len(df_anomalias)} ANOMALIAS DETECTADAS")
+            print(f"   Critério: Variação > 100% vs média sazonal\n")
+        else:
+            print(f"   ✅ Nenhuma anomalia detectada\n")
+        
+        return df_anomalias
+    
+    def detectar_anomalias_robustas(self, df, dimensoes=DIMENSOES_ANOMALIA, metodos=METODOS_ANOMALIA,
+                                    limiares=None, coluna='profit'):
+        """
+        Detecta lucros anômalos com scores robustos em várias dimensões.
+        
+        Cada transação é comparada com seus pares no lote em cada dimensão
+        (ex.: mesmo país e trimestre, mesmo produto). Todas as dimensões são
+        empilhadas em um único array de códigos de grupo e as estatísticas
+        saem de uma passada (estatisticas_por_grupo); scores e severidades
+        são uma matriz [linhas, dimensões × métodos] comparada com os
+        limiares de uma vez.
+        
+        Métodos:
+        - zscore: (x - média) / desvio
+        - mad: 0,6745 (x - mediana) / MAD; MAD = 0 usa 1,2533 × desvio
+          absoluto médio (robusto a médias próximas de zero e a outliers)
+        - percentual: (x - média) / |média| × 100 (regra legada)
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Lote a monitorar
+        dimensoes : tuple
+            Colunas de agrupamento por dimensão ('trimestre' é derivado de date)
+        metodos : tuple
+            Subconjunto de LIMIARES_ANOMALIA
+        limiares : dict, optional
+            {metodo: (alta, critica)} sobrepondo LIMIARES_ANOMALIA
+        coluna : str
+            Métrica avaliada
         
-        anomalias = []
+        Returns
+        -------
+        pd.DataFrame
+            Uma linha por transação anômala (colunas de detectar_anomalias +
+            dimensao, metodo, score do pior score e dimensoes_alertadas)
+        """
         
-        for idx, row in df.iterrows():
-            pais = row['country']
-            trimestre = row['trimestre']
-            lucro_atual = row['profit']
+        print("🚨 Detectando Anomalias de Lucro (scores robustos)...")
+        
+        limiares = {**LIMIARES_ANOMALIA, **(limiares or {})}
+        datas = pd.to_datetime(df['date'])
+        trimestres = datas.dt.quarter.to_numpy(dtype=float, na_value=np.nan)
+        chaves = pd.DataFrame({'trimestre': trimestres}, index=df.index)
+        for colunas in dimensoes:
+            for c in colunas:
+                if c != 'trimestre':
+                    chaves[c] = df[c]
+        
+        # Códigos de grupo empilhados: dimensão d ocupa [deslocamento_d, deslocamento_d + grupos_d)
+        n = len(df)
+        codigos = np.empty((len(dimensoes), n), dtype=np.int64)
+        deslocamento = 0
+        for d, colunas in enumerate(dimensoes):
+            codigo = chaves.groupby(list(colunas), sort=False, dropna=True).ngroup().to_numpy()
+            codigos[d] = np.where(codigo >= 0, codigo + deslocamento, -1)
+            deslocamento += int(codigo.max()) + 1 if n else 0
+        
+        valores = df[coluna].to_numpy(dtype=float, na_value=np.nan)
+        estatisticas = estatisticas_por_grupo(valores, codigos, deslocamento)
+        
+        # Estatísticas do grupo de cada (dimensão, linha); grupos pequenos não pontuam
+        grupo = np.where(codigos >= 0, codigos, 0)
+        pequeno = (codigos < 0) | (estatisticas['contagem'][grupo] < MIN_TAMANHO_GRUPO)
+        media = np.where(pequeno, np.nan, estatisticas['media'][grupo])
+        mediana = np.where(pequeno, np.nan, estatisticas['mediana'][grupo])
+        mad = estatisticas['mad'][grupo]
+        escala_mad = np.where(mad > 0, mad / 0.6745, 1.2533 * estatisticas['desvio_medio'][grupo])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            calculos = {
+                'zscore': lambda: ((valores - media) / estatisticas['desvio'][grupo], media),
+                'mad': lambda: ((valores - mediana) / escala_mad, mediana),
+                'percentual': lambda: ((valores - media) / np.abs(media) * 100, media)
+            }
+            resultados = [calculos[metodo]() for metodo in metodos]
+        
+        # Matriz [dimensão × método, linha]; score infinito/NaN (escala 0) não pontua
+        scores = np.concatenate([score for score, _ in resultados])
+        scores = np.where(np.isfinite(scores), scores, np.nan)
+        centros = np.concatenate([centro for _, centro in resultados])
+        alta = np.repeat([limiares[metodo][0] for metodo in metodos], len(dimensoes))[:, None]
+        critica = np.repeat([limiares[metodo][1] for metodo in metodos], len(dimensoes))[:, None]
+        
+        absolutos = np.abs(scores)
+        niveis = (absolutos >= alta).astype(np.int8) + (absolutos >= critica)
+        posicoes = np.flatnonzero(niveis.max(axis=0, initial=0) > 0)
+        
+        if len(posicoes) > 0:
+            # Pior score de cada linha: maior |score| relativo ao limiar ALTA
+            relativos = np.nan_to_num(absolutos[:, posicoes] / alta, nan=0.0)
+            pior = relativos.argmax(axis=0)
+            score = scores[pior, posicoes]
+            lucro_esperado = centros[pior, posicoes]
+            lucro_atual = valores[posicoes]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                variacao_percentual = np.where(
+                    lucro_esperado != 0,
+                    (lucro_atual - lucro_esperado) / np.abs(lucro_esperado) * 100,
+                    0.0
+                )
+            nomes_dimensoes = np.array(['+'.join(colunas) for colunas in dimensoes] * len(metodos))
+            nomes_metodos = np.repeat(np.array(metodos), len(dimensoes))
             
-            # Buscar baseline
-            if (pais, trimestre) in self.baseline_sazonal:
-                baseline = self.baseline_sazonal[(pais, trimestre)]
-                lucro_esperado = baseline['media']
-                desvio = baseline['desvio']
-                
-                # Detectar oscilação > 100% (dobro ou metade da média)
-                variacao_percentual = ((lucro_atual - lucro_esperado) / lucro_esperado * 100) if lucro_esperado != 0 else 0
-                
-                # ALERTA se variação > 100% OU < -50%
-                if abs(variacao_percentual) > 100:
-                    anomalias.append({
-                        'index': idx,
-                        'pais': pais,
-                        'produto': row['product'],
-                        'data': row['date'].strftime('%Y-%m-%d'),
-                        'trimestre': trimestre,
-                        'lucro_atual': lucro_atual,
-                        'lucro_esperado': lucro_esperado,
-                        'variacao_percentual': variacao_percentual,
-                        'severidade': 'CRÍTICA' if abs(variacao_percentual) > 200 else 'ALTA'
-                    })
-        
-        df_anomalias = pd.DataFrame(anomalias)
+            df_anomalias = pd.DataFrame({
+                'index': df.index[posicoes],
+                'pais': df['country'].array[posicoes],
+                'produto': df['product'].array[posicoes],
+                'data': datas.iloc[posicoes].dt.strftime('%Y-%m-%d').array,
+                'trimestre': trimestres[posicoes].astype(np.int64),
+                'lucro_atual': lucro_atual,
+                'lucro_esperado': lucro_esperado,
+                'variacao_percentual': variacao_percentual,
+                'severidade': np.where(niveis[:, posicoes].max(axis=0) == 2, 'CRÍTICA', 'ALTA'),
+                'dimensao': nomes_dimensoes[pior],
+                'metodo': nomes_metodos[pior],
+                'score': score,
+                'dimensoes_alertadas': (niveis[:, posicoes] > 0).sum(axis=0)
+            })
+        else:
+            df_anomalias = pd.DataFrame()
         
         if len(df_anomalias) > 0:
             print(f"   🚨 {len(df_anomalias)} ANOMALIAS DETECTADAS")
-            print(f"   Critério: Variação > 100% vs média sazonal\n")
+            print(f"   Critério: {', '.join(metodos)} em {len(dimensoes)} dimensões "
+                  f"({', '.join('+'.join(colunas) for colunas in dimensoes)})\n")
         else:
             print(f"   ✅ Nenhuma anomalia detectada\n")
         
@@ -578,36 +1918,71 @@ class AnomalyDetector:
             Lista de causas raiz identificadas
         """
         
-        causas = []
+        return self.analisar_causas_raiz(pd.DataFrame([anomalia]))[0]
+    
+    def analisar_causas_raiz(self, df_anomalias):
+        """
+        Causas raiz de todas as anomalias com operações de coluna.
         
-        # Causa 1: Lucro muito acima da média (estratégia de premium pricing?)
-        if anomalia['variacao_percentual'] > 100:
-            causas.append({
-                'causa': 'LUCRO_ACIMA_MEDIA',
-                'severidade': anomalia['severidade'],
-                'detalhes': f"Lucro {anomalia['variacao_percentual']:.1f}% acima do esperado",
-                'recomendacao': f"Investigar estratégia de precificação em {anomalia['pais']} (Q{anomalia['trimestre']})"
-            })
+        Máscaras e textos (detalhes, recomendação) são calculados uma vez
+        por causa para o lote inteiro; só a montagem dos dicts é por linha.
         
-        # Causa 2: Lucro muito abaixo da média (prejuízo ou desconto excessivo?)
-        if anomalia['variacao_percentual'] < -50:
-            causas.append({
-                'causa': 'LUCRO_ABAIXO_MEDIA',
-                'severidade': anomalia['severidade'],
-                'detalhes': f"Lucro {abs(anomalia['variacao_percentual']):.1f}% abaixo do esperado",
-                'recomendacao': f"Revisar política de descontos para {anomalia['produto']} em {anomalia['pais']}"
-            })
+        Parameters
+        ----------
+        df_anomalias : pd.DataFrame
+            Anomalias detectadas
+        
+        Returns
+        -------
+        list
+            Uma lista de causas raiz por anomalia (na ordem do DataFrame)
+        """
+        
+        variacao = df_anomalias['variacao_percentual'].to_numpy(dtype=float)
+        severidade = df_anomalias['severidade'].to_numpy(dtype=object)
+        pais = df_anomalias['pais'].astype(str).to_numpy(dtype=object)
+        produto = df_anomalias['produto'].astype(str).to_numpy(dtype=object)
+        trimestre = df_anomalias['trimestre'].astype(np.int64).astype(str).to_numpy(dtype=object)
+        texto_variacao = np.char.mod('%.1f', np.abs(variacao)).astype(object)
+        
+        regras = (
+            # Causa 1: Lucro muito acima da média (estratégia de premium pricing?)
+            ('LUCRO_ACIMA_MEDIA', variacao > 100,
+             lambda i: 'Lucro ' + texto_variacao[i] + '% acima do esperado',
+             lambda i: 'Investigar estratégia de precificação em ' + pais[i] + ' (Q' + trimestre[i] + ')'),
+            # Causa 2: Lucro muito abaixo da média (prejuízo ou desconto excessivo?)
+            ('LUCRO_ABAIXO_MEDIA', variacao < -50,
+             lambda i: 'Lucro ' + texto_variacao[i] + '% abaixo do esperado',
+             lambda i: 'Revisar política de descontos para ' + produto[i] + ' em ' + pais[i])
+        )
+        
+        causas = [[] for _ in range(len(df_anomalias))]
+        for causa, mascara, detalhes, recomendacao in regras:
+            posicoes = np.flatnonzero(mascara)
+            for i, sev, det, rec in zip(posicoes, severidade[posicoes], detalhes(posicoes), recomendacao(posicoes)):
+                causas[i].append({
+                    'causa': causa,
+                    'severidade': sev,
+                    'detalhes': det,
+                    'recomendacao': rec
+                })
         
         return causas
     
-    def gerar_relatorio_alertas(self, df_anomalias):
+    def gerar_relatorio_alertas(self, df_anomalias, caminho_relatorio=None):
         """
-        Gera relatório JSON de alertas para integração com sistemas de monitoramento.
+        Gera lote NDJSON de alertas (um alerta por linha) para monitoramento.
+        
+        Causas raiz e contagens de severidade saem de operações de coluna
+        (sem iterrows). No monitor, o lote é publicado em _lotes/ do fluxo
+        de alertas e anexado a ele no commit (ver alert_stream.py).
         
         Parameters
         ----------
         df_anomalias : pd.DataFrame
             Anomalias detectadas
+        caminho_relatorio : str, optional
+            Destino do NDJSON (padrão: CAMINHO_ALERTAS com timestamp atual)
         
         Returns
         -------
@@ -621,50 +1996,65 @@ class AnomalyDetector:
         
         print("📝 Gerando Relatório de Alertas...")
         
-        # Preparar alertas
-        alertas = []
-        
-        for _, anomalia in df_anomalias.iterrows():
-            # Analisar causa raiz
-            causas = self.analisar_causa_raiz(anomalia.to_dict())
-            
-            alerta = {
-                'timestamp': datetime.now().isoformat(),
+        timestamp_alertas = datetime.now().isoformat()
+        causas = self.analisar_causas_raiz(df_anomalias)
+        colunas = [
+            df_anomalias[c].tolist()
+            for c in ('severidade', 'pais', 'produto', 'data', 'trimestre',
+                      'lucro_atual', 'lucro_esperado', 'variacao_percentual')
+        ]
+        
+        alertas = [
+            {
+                'timestamp': timestamp_alertas,
                 'tipo': 'ANOMALIA_LUCRO',
-                'severidade': anomalia['severidade'],
+                'severidade': severidade,
                 'metrica': 'profit',
-                'pais': anomalia['pais'],
-                'produto': anomalia['produto'],
-                'data_transacao': anomalia['data'],
-                'trimestre': int(anomalia['trimestre']),
+                'pais': pais,
+                'produto': produto,
+                'data_transacao': data,
+                'trimestre': int(trimestre),
                 'valores': {
-                    'lucro_atual': float(anomalia['lucro_atual']),
-                    'lucro_esperado': float(anomalia['lucro_esperado']),
-                    'variacao_percentual': float(anomalia['variacao_percentual'])
+                    'lucro_atual': float(atual),
+                    'lucro_esperado': float(esperado),
+                    'variacao_percentual': float(variacao)
                 },
-                'causas_raiz': causas
+                'causas_raiz': causas_anomalia
             }
-            
-            alertas.append(alerta)
-        
-        # Salvar JSON
-        Path("outputs/alerts").mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        caminho_relatorio = f"outputs/alerts/anomalies_{timestamp}.json"
+            for severidade, pais, produto, data, trimestre, atual, esperado, variacao, causas_anomalia
+            in zip(*colunas, causas)
+        ]
+        
+        # Detecção robusta: grupo/método que disparou o alerta
+        if 'score' in df_anomalias.columns:
+            for alerta, dimensao, metodo, score, dimensoes in zip(
+                alertas,
+                df_anomalias['dimensao'].tolist(),
+                df_anomalias['metodo'].tolist(),
+                df_anomalias['score'].tolist(),
+                df_anomalias['dimensoes_alertadas'].tolist()
+            ):
+                alerta['deteccao'] = {
+                    'dimensao': dimensao,
+                    'metodo': metodo,
+                    'score': float(score),
+                    'dimensoes_alertadas': int(dimensoes)
+                }
+        
+        # Salvar NDJSON
+        if caminho_relatorio is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            caminho_relatorio = CAMINHO_ALERTAS.format(timestamp=timestamp)
+        Path(caminho_relatorio).parent.mkdir(parents=True, exist_ok=True)
         
         with open(caminho_relatorio, 'w', encoding='utf-8') as f:
-            json.dump({
-                'total_alertas': len(alertas),
-                'criticas': sum(1 for a in alertas if a['severidade'] == 'CRÍTICA'),
-                'altas': sum(1 for a in alertas if a['severidade'] == 'ALTA'),
-                'timestamp_relatorio': datetime.now().isoformat(),
-                'alertas': alertas
-            }, f, indent=2, ensure_ascii=False)
+            f.write('\n'.join(json.dumps(alerta, ensure_ascii=False) for alerta in alertas) + '\n')
         
+        contagens = df_anomalias['severidade'].value_counts()
         print(f"   ✅ Relatório salvo: {caminho_relatorio}")
         print(f"   Total de alertas: {len(alertas)}")
-        print(f"   Críticas: {sum(1 for a in alertas if a['severidade'] == 'CRÍTICA')}")
-        print(f"   Altas: {sum(1 for a in alertas if a['severidade'] == 'ALTA')}\n")
+        print(f"   Críticas: {int(contagens.get('CRÍTICA', 0))}")
+        print(f"   Altas: {int(contagens.get('ALTA', 0))}\n")
         
         return caminho_relatorio
 
@@ -677,11 +2067,75 @@ class DataReliabilityMonitor:
     Orquestrador que integra validação, carga incremental e monitoramento.
     """
     
-    def __init__(self, caminho_dados, db_metadata):
+    def __init__(self, caminho_dados, db_metadata, backend_contrato=BACKEND_CONTRATO_PADRAO,
+                 db_historico=CAMINHO_HISTORICO_DB, janela_retroativa_dias=JANELA_RETROATIVA_DIAS,
+                 deteccao=DETECCAO_PADRAO, dir_alertas=DIR_ALERTAS):
+        if deteccao not in DETECCOES:
+            raise ValueError(f"Detecção inválida '{deteccao}'. Opções: {', '.join(DETECCOES)}")
+        
         self.caminho_dados = caminho_dados
+        self.backend_contrato = backend_contrato
+        self.deteccao = deteccao
+        self.db_historico = db_historico
+        self.dir_alertas = dir_alertas
         self.validator = DataContractValidator()
-        self.loader = IncrementalLoader(db_metadata)
-        self.detector = AnomalyDetector()
+        self.loader = IncrementalLoader(db_metadata, janela_retroativa_dias=janela_retroativa_dias)
+        self.detector = AnomalyDetector(db_metadata)
+    
+    def registrar_historico_contrato(self, df_lote, df_invalido, duracao_s, bytes_lidos):
+        """
+        Grava a validação do contrato no histórico e alerta regressões.
+        
+        Chamado após o commit da execução: execuções abortadas não entram
+        na baseline. `bytes_lidos` é o volume lido do arquivo pela
+        ler_incremental (cauda anexada). Duração e violações por regra só
+        existem no backend vetorizado (regras compiladas de rules.json).
+        """
+        regras = {}
+        if self.backend_contrato == 'vetorizado':
+            regras = {
+                regra: {
+                    'duracao_ms': segundos * 1000,
+                    'falhas': ContratoVetorizado.ultimas_falhas.get(regra, 0)
+                }
+                for regra, segundos in ContratoVetorizado.ultimos_tempos.items()
+            }
+        
+        historico = HistoricoValidacao(self.db_historico)
+        execucao_id, alertas = historico.registrar(
+            'contrato', self.backend_contrato, self.caminho_dados,
+            linhas=len(df_lote),
+            bytes_lidos=bytes_lidos,
+            duracao_s=duracao_s,
+            linhas_com_falha=len(df_invalido),
+            sucesso=len(df_invalido) == 0,
+            regras=regras
+        )
+        historico.fechar()
+        
+        print(f"📈 Histórico: execução #{execucao_id} ({self.backend_contrato}, {duracao_s:.3f}s)")
+        imprimir_alertas(alertas)
+        print()
+        
+        return alertas
+    
+    def fluxo_alertas(self, pipeline_nome):
+        """
+        Fluxo NDJSON de alertas do pipeline, com lotes pendentes já aplicados.
+        
+        Chamado com a trava do pipeline adquirida: lotes publicados por uma
+        execução confirmada que parou antes do append são anexados aqui.
+        """
+        fluxo = FluxoAlertas(os.path.join(self.dir_alertas, pipeline_nome))
+        for execucao_id, primeiro_seq, ultimo_seq in fluxo.aplicar_pendentes():
+            print(f"♻️ Alertas da execução {execucao_id} anexados ao fluxo (seq {primeiro_seq}-{ultimo_seq})")
+        return fluxo
+    
+    def detectar_anomalias(self, df_valido):
+        """Anomalias pelo método configurado (sazonal ou robusta)."""
+        if self.deteccao == 'robusta':
+            return self.detector.detectar_anomalias_robustas(df_valido)
+        return self.detector.detectar_anomalias(df_valido)
     
     def executar_pipeline(self):
         """Executa pipeline completo de confiabilidade."""
@@ -691,12 +2145,28 @@ class DataReliabilityMonitor:
         print("=" * 80)
         print(f"Timestamp: {datetime.now().isoformat()}\n")
         
+        # Saídas em staging; watermark/índice/baseline só no commit final
+        execucao = ExecucaoTransacional(self.loader, PIPELINE_MONITOR)
+        if not execucao.iniciar():
+            print(f"⏸️ Pipeline {PIPELINE_MONITOR} em execução por outro processo. Nada a fazer.")
+            return
+        
+        try:
+            self._executar_etapas(execucao, self.fluxo_alertas(PIPELINE_MONITOR))
+        except BaseException:
+            execucao.abortar()
+            raise
+    
+    def _executar_etapas(self, execucao, fluxo):
+        """Etapas 1-6 e commit da execução (trava do pipeline já adquirida)."""
+        
         # ========================================
         # ETAPA 1: Carregar dados
         # ========================================
         print("📥 ETAPA 1: Carregando dados...")
-        df = pd.read_csv(self.caminho_dados)
+        df = self.loader.ler_incremental(self.caminho_dados, PIPELINE_MONITOR)
         print(f"   ✅ {len(df)} registros carregados\n")
+        execucao.renovar()
         
         # ========================================
         # ETAPA 2: Carga incremental
@@ -708,13 +2178,16 @@ class DataReliabilityMonitor:
         df_incremental = self.loader.carregar_incremental(
             df,
             coluna_timestamp='date',
-            pipeline_nome='silver_to_gold'
+            pipeline_nome=PIPELINE_MONITOR,
+            confirmar=False
         )
         
-        # Se não há dados novos, encerrar
+        # Se não há dados novos, encerrar (checkpoint de leitura ainda é gravado)
         if len(df_incremental) == 0:
+            execucao.confirmar()
             print("✅ Nenhum dado novo para processar. Pipeline encerrado.")
             return
+        execucao.renovar()
         
         # ========================================
         # ETAPA 3: Validação de contrato
@@ -723,26 +2196,36 @@ class DataReliabilityMonitor:
         print("ETAPA 3: VALIDAÇÃO DE DATA CONTRACT (Pydantic)")
         print("=" * 80 + "\n")
         
-        df_valido, df_invalido, erros = self.validator.validar_lote(df_incremental)
+        inicio_validacao = time.perf_counter()
+        df_valido, df_invalido, erros = self.validator.validar_lote(
+            df_incremental,
+            backend=self.backend_contrato
+        )
+        duracao_validacao = time.perf_counter() - inicio_validacao
         
         # Se há registros inválidos, logar
         if len(df_invalido) > 0:
-            Path("outputs/quarantine").mkdir(parents=True, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            caminho_quarentena = f"outputs/quarantine/contract_violations_{timestamp}.csv"
-            df_invalido.to_csv(caminho_quarentena, index=False)
+            caminho_quarentena = CAMINHO_QUARENTENA.format(timestamp=execucao.timestamp)
+            df_invalido.to_csv(execucao.arquivo_staging(caminho_quarentena), index=False)
             
             print(f"   ⚠️ {len(df_invalido)} registros enviados para quarentena: {caminho_quarentena}\n")
+        execucao.renovar()
         
         # ========================================
-        # ETAPA 4: Calcular baseline sazonal
+        # ETAPA 4: Atualizar baseline sazonal
         # ========================================
         print("=" * 80)
         print("ETAPA 4: BASELINE SAZONAL (Histórico)")
         print("=" * 80 + "\n")
         
-        # Usar dataset completo para baseline (não apenas incremental)
-        self.detector.calcular_baseline_sazonal(df)
+        # Estatísticas acumuladas no banco de metadados + delta desta execução
+        self.detector.atualizar_baseline_sazonal(
+            df_incremental,
+            pipeline_nome=PIPELINE_MONITOR,
+            confirmar=False,
+            df_substituidos=self.loader.substituidos
+        )
+        execucao.renovar()
         
         # ========================================
         # ETAPA 5: Detectar anomalias
@@ -751,7 +2234,8 @@ class DataReliabilityMonitor:
         print("ETAPA 5: DETECÇÃO DE ANOMALIAS (Root Cause Analysis)")
         print("=" * 80 + "\n")
         
-        df_anomalias = self.detector.detectar_anomalias(df_valido)
+        df_anomalias = self.detectar_anomalias(df_valido)
+        execucao.renovar()
         
         # ========================================
         # ETAPA 6: Gerar alertas
@@ -761,7 +2245,32 @@ class DataReliabilityMonitor:
             print("ETAPA 6: GERAÇÃO DE ALERTAS")
             print("=" * 80 + "\n")
             
-            caminho_alertas = self.detector.gerar_relatorio_alertas(df_anomalias)
+            # Lote publicado em _lotes/ no commit e anexado ao fluxo em seguida
+            self.detector.gerar_relatorio_alertas(
+                df_anomalias,
+                caminho_relatorio=execucao.arquivo_staging(fluxo.caminho_lote(execucao.execucao_id))
+            )
+        
+        # ========================================
+        # COMMIT: publicação atômica + estado em uma transação
+        # ========================================
+        publicados = execucao.confirmar(
+            gravacoes=[self.detector.gravar_baseline],
+            registros=len(df_incremental),
+            manter_trava=True
+        )
+        print(f"🔒 Execução {execucao.execucao_id} confirmada "
+              f"(watermark, índice, checkpoint e baseline em uma transação)")
+        for caminho in publicados:
+            print(f"   📤 Publicado: {caminho}")
+        # Lote anexado ao fluxo ainda com a trava (um escritor por fluxo)
+        execucao.renovar()
+        for execucao_id, primeiro_seq, ultimo_seq in fluxo.aplicar_pendentes():
+            print(f"   📡 Alertas anexados ao fluxo {fluxo.diretorio} (seq {primeiro_seq}-{ultimo_seq})")
+        execucao.liberar()
+        print()
+        
+        self.registrar_historico_contrato(df_incremental, df_invalido, duracao_validacao, self.loader.bytes_lidos)
         
         # ========================================
         # RESUMO FINAL
@@ -774,6 +2283,235 @@ class DataReliabilityMonitor:
         print(f"Registros inválidos: {len(df_invalido)}")
         print(f"Anomalias detectadas: {len(df_anomalias)}")
         print()
+    
+    def processar_micro_lote(self, caminho, pipeline_nome, max_bytes):
+        """
+        Um micro-lote: cauda nova do arquivo → CDC → contrato → baseline → anomalias.
+        
+        O checkpoint de leitura é por arquivo ('{pipeline}:{arquivo}');
+        watermark, índice de hashes e baseline são do pipeline. Tudo é
+        confirmado em uma ExecucaoTransacional por micro-lote.
+        
+        Sem janela retroativa: os arquivos não chegam em ordem de data e o
+        watermark é do pipeline inteiro, então a janela descartaria linhas
+        nunca vistas. Toda linha lida precisa sair processada ou como
+        duplicata do índice; caso contrário o micro-lote é abortado.
+        
+        Parameters
+        ----------
+        caminho : str
+            Arquivo do diretório monitorado
+        pipeline_nome : str
+            Nome do pipeline de streaming
+        max_bytes : int
+            Limite de bytes lidos neste micro-lote (backpressure)
+        
+        Returns
+        -------
+        dict or None
+            Resumo do micro-lote; None se outra execução detém a trava
+        """
+        
+        execucao = ExecucaoTransacional(self.loader, pipeline_nome)
+        if not execucao.iniciar():
+            return None
+        
+        try:
+            fluxo = self.fluxo_alertas(pipeline_nome)
+            df = self.loader.ler_incremental(caminho, f"{pipeline_nome}:{Path(caminho).name}", max_bytes=max_bytes)
+            resumo = {
+                'arquivo': Path(caminho).name,
+                'lidos': len(df),
+                'processados': 0,
+                'invalidos': 0,
+                'anomalias': 0,
+                'duplicados': 0,
+                'bytes_pendentes': self.loader.bytes_pendentes
+            }
+            
+            gravacoes = []
+            if len(df) > 0:
+                df_incremental = self.loader.carregar_incremental(
+                    df,
+                    coluna_timestamp='date',
+                    pipeline_nome=pipeline_nome,
+                    confirmar=False,
+                    janela_retroativa=False
+                )
+                resumo['duplicados'] = self.loader.ultima_classificacao['duplicados']
+                if len(df_incremental) + resumo['duplicados'] != len(df):
+                    raise RuntimeError(
+                        f"Micro-lote de {resumo['arquivo']}: {len(df)} linhas lidas, "
+                        f"{len(df_incremental)} processadas + {resumo['duplicados']} duplicadas"
+                    )
+                
+                if len(df_incremental) > 0:
+                    execucao.renovar()
+                    df_valido, df_invalido, erros = self.validator.validar_lote(
+                        df_incremental,
+                        backend=self.backend_contrato
+                    )
+                    if len(df_invalido) > 0:
+                        caminho_quarentena = CAMINHO_QUARENTENA.format(timestamp=execucao.timestamp)
+                        df_invalido.to_csv(execucao.arquivo_staging(caminho_quarentena), index=False)
+                    
+                    # Baseline em memória atualizado com o micro-lote antes da detecção
+                    self.detector.atualizar_baseline_sazonal(
+                        df_incremental,
+                        pipeline_nome=pipeline_nome,
+                        confirmar=False,
+                        df_substituidos=self.loader.substituidos
+                    )
+                    gravacoes = [self.detector.gravar_baseline]
+                    
+                    df_anomalias = self.detectar_anomalias(df_valido)
+                    if len(df_anomalias) > 0:
+                        self.detector.gerar_relatorio_alertas(
+                            df_anomalias,
+                            caminho_relatorio=execucao.arquivo_staging(fluxo.caminho_lote(execucao.execucao_id))
+                        )
+                    
+                    resumo.update(
+                        processados=len(df_incremental),
+                        invalidos=len(df_invalido),
+                        anomalias=len(df_anomalias)
+                    )
+            
+            resumo['publicados'] = execucao.confirmar(
+                gravacoes=gravacoes, registros=resumo['processados'], manter_trava=True
+            )
+            execucao.renovar()
+            fluxo.aplicar_pendentes()
+            execucao.liberar()
+        except BaseException:
+            execucao.abortar()
+            raise
+        
+        return resumo
+    
+    def executar_streaming(self, diretorio=DIR_STREAMING, pipeline_nome=PIPELINE_STREAMING,
+                           latencia_alvo_s=LATENCIA_ALVO_S, intervalo_poll_s=INTERVALO_POLL_S,
+                           max_lotes=None, max_ocioso_s=None):
+        """
+        Modo streaming: consome arquivos novos ou anexados em micro-lotes.
+        
+        A cada ciclo, os CSVs do diretório com assinatura (inode, tamanho,
+        mtime) diferente da última consumida - ou com backlog - geram um
+        micro-lote cada. Backpressure: cada micro-lote lê no máximo
+        bytes_lote; acima da latência alvo bytes_lote cai à metade, abaixo
+        da metade da meta (com backlog) dobra. Havendo backlog, o próximo
+        ciclo começa sem esperar o intervalo de polling.
+        
+        Parameters
+        ----------
+        diretorio : str
+            Diretório monitorado (*.csv)
+        pipeline_nome : str
+            Pipeline do watermark/índice/baseline do streaming
+        latencia_alvo_s : float
+            Meta de latência por micro-lote (leitura até commit)
+        intervalo_poll_s : float
+            Espera entre ciclos sem dados novos
+        max_lotes : int, optional
+            Encerra após N micro-lotes com dados (padrão: sem limite)
+        max_ocioso_s : float, optional
+            Encerra após N segundos sem dados novos (padrão: sem limite)
+        
+        Returns
+        -------
+        dict
+            Totais e latências (p50, p95, máxima) dos micro-lotes
+        """
+        
+        print("=" * 80)
+        print("DATA RELIABILITY MONITOR - STREAMING (micro-lotes)")
+        print("=" * 80)
+        print(f"Diretório: {diretorio} | Pipeline: {pipeline_nome} | Latência alvo: {latencia_alvo_s}s\n")
+        
+        bytes_lote = BYTES_LOTE_INICIAL
+        assinaturas = {}
+        backlog = set()
+        latencias = []
+        totais = {'lotes': 0, 'lidos': 0, 'processados': 0, 'duplicados': 0, 'invalidos': 0, 'anomalias': 0,
+                  'acima_da_meta': 0}
+        ultimo_dado = time.monotonic()
+        
+        try:
+            while max_lotes is None or totais['lotes'] < max_lotes:
+                pendentes = []
+                for arquivo in sorted(Path(diretorio).glob('*.csv')):
+                    estado = arquivo.stat()
+                    assinatura = (estado.st_ino, estado.st_size, estado.st_mtime_ns)
+                    if arquivo.name in backlog or assinaturas.get(arquivo.name) != assinatura:
+                        pendentes.append((arquivo, assinatura))
+                
+                if not pendentes:
+                    if max_ocioso_s is not None and time.monotonic() - ultimo_dado >= max_ocioso_s:
+                        break
+                    time.sleep(intervalo_poll_s)
+                    continue
+                
+                for arquivo, assinatura in pendentes:
+                    inicio = time.perf_counter()
+                    resumo = self.processar_micro_lote(str(arquivo), pipeline_nome, bytes_lote)
+                    latencia = time.perf_counter() - inicio
+                    
+                    if resumo is None:
+                        print(f"⏸️ Pipeline {pipeline_nome} em execução por outro processo. Aguardando...")
+                        time.sleep(intervalo_poll_s)
+                        break
+                    
+                    assinaturas[arquivo.name] = assinatura
+                    if resumo['bytes_pendentes'] > 0:
+                        backlog.add(arquivo.name)
+                    else:
+                        backlog.discard(arquivo.name)
+                    
+                    if resumo['lidos'] == 0:
+                        continue
+                    
+                    ultimo_dado = time.monotonic()
+                    latencias.append(latencia)
+                    totais['lotes'] += 1
+                    for chave in ('lidos', 'processados', 'duplicados', 'invalidos', 'anomalias'):
+                        totais[chave] += resumo[chave]
+                    
+                    # Backpressure (AIMD sobre bytes por micro-lote)
+                    if latencia > latencia_alvo_s:
+                        totais['acima_da_meta'] += 1
+                        bytes_lote = max(BYTES_LOTE_MIN, bytes_lote // 2)
+                    elif latencia < latencia_alvo_s / 2 and resumo['bytes_pendentes'] > 0:
+                        bytes_lote = min(BYTES_LOTE_MAX, bytes_lote * 2)
+                    
+                    print(f"🌊 Micro-lote {totais['lotes']}: {resumo['arquivo']} | {resumo['lidos']} lidos, "
+                          f"{resumo['processados']} processados, {resumo['duplicados']} duplicados, "
+                          f"{resumo['invalidos']} inválidos, "
+                          f"{resumo['anomalias']} anomalias | {latencia:.2f}s "
+                          f"{'⚠️' if latencia > latencia_alvo_s else '✅'} | backlog {resumo['bytes_pendentes']:,} bytes | "
+                          f"próximo lote até {bytes_lote:,} bytes\n")
+                    
+                    if max_lotes is not None and totais['lotes'] >= max_lotes:
+                        break
+        except KeyboardInterrupt:
+            print("\n⏹️ Streaming interrompido (micro-lote em andamento revertido na próxima execução)")
+        
+        latencias_ms = np.array(latencias) * 1000
+        totais.update(
+            latencia_p50_ms=round(float(np.percentile(latencias_ms, 50)), 1) if len(latencias) else None,
+            latencia_p95_ms=round(float(np.percentile(latencias_ms, 95)), 1) if len(latencias) else None,
+            latencia_max_ms=round(float(latencias_ms.max()), 1) if len(latencias) else None
+        )
+        
+        print("=" * 80)
+        print("✅ STREAMING ENCERRADO")
+        print("=" * 80)
+        print(f"Micro-lotes: {totais['lotes']} ({totais['acima_da_meta']} acima da meta de {latencia_alvo_s}s)")
+        print(f"Registros lidos: {totais['lidos']} | Processados: {totais['processados']} | "
+              f"Duplicados: {totais['duplicados']} | Inválidos: {totais['invalidos']} | Anomalias: {totais['anomalias']}")
+        print(f"Latência p50: {totais['latencia_p50_ms']} ms | p95: {totais['latencia_p95_ms']} ms | máx: {totais['latencia_max_ms']} ms")
+        print()
+        
+        return totais
 
 # ========================================
 # EXECUÇÃO PRINCIPAL
@@ -784,19 +2522,54 @@ if __name__ == "__main__":
     Execução do monitor de confiabilidade.
     
     USO:
-        python data_reliability_monitor.py
+        python data_reliability_monitor.py [--backend vetorizado|pydantic_linha|pydantic_lote]
+                                           [--janela-dias N] [--deteccao sazonal|robusta]
+        python data_reliability_monitor.py --streaming [diretorio] [--latencia-alvo S]
+                                           [--max-ocioso S]
     
     OUTPUT:
-        - metadata/incremental_load.db (watermarks)
+        - metadata/incremental_load.db (watermarks, checkpoint de leitura, baseline sazonal,
+          execuções transacionais)
         - quarantine/contract_violations_*.csv (violações)
-        - alerts/anomalies_*.json (alertas)
+        - alerts/stream/<pipeline>/alertas_*.ndjson + indice.json (fluxo de alertas)
     """
     
+    backend = BACKEND_CONTRATO_PADRAO
+    if '--backend' in sys.argv:
+        backend = sys.argv[sys.argv.index('--backend') + 1]
+    
+    janela_dias = JANELA_RETROATIVA_DIAS
+    if '--janela-dias' in sys.argv:
+        janela_dias = int(sys.argv[sys.argv.index('--janela-dias') + 1])
+    
+    deteccao = DETECCAO_PADRAO
+    if '--deteccao' in sys.argv:
+        deteccao = sys.argv[sys.argv.index('--deteccao') + 1]
+    
     monitor = DataReliabilityMonitor(
         caminho_dados=CAMINHO_DADOS,
-        db_metadata=CAMINHO_METADATA_DB
+        db_metadata=CAMINHO_METADATA_DB,
+        backend_contrato=backend,
+        janela_retroativa_dias=janela_dias,
+        deteccao=deteccao
     )
     
-    monitor.executar_pipeline()
+    if '--streaming' in sys.argv:
+        posicao = sys.argv.index('--streaming') + 1
+        diretorio = DIR_STREAMING
+        if posicao < len(sys.argv) and not sys.argv[posicao].startswith('--'):
+            diretorio = sys.argv[posicao]
+        
+        latencia_alvo = LATENCIA_ALVO_S
+        if '--latencia-alvo' in sys.argv:
+            latencia_alvo = float(sys.argv[sys.argv.index('--latencia-alvo') + 1])
+        
+        max_ocioso = None
+        if '--max-ocioso' in sys.argv:
+            max_ocioso = float(sys.argv[sys.argv.index('--max-ocioso') + 1])
+        
+        monitor.executar_streaming(diretorio, latencia_alvo_s=latencia_alvo, max_ocioso_s=max_ocioso)
+    else:
+        monitor.executar_pipeline()
     
     sys.exit(0)
@@ -0,0 +1,1190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HARNESS DE MEDIDAS DAX - Avaliação Offline a partir do TMDL
+Analytics Engineer - Financial Data Fortress 2026
+
+Autor: Analytics Engineer
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Avaliar as medidas DAX definidas no modelo semântico (TMDL) diretamente sobre
+os CSVs da Camada Gold, sem depender de uma instância viva do Power BI
+(fluxo verify_measures.ps1 / check_measure_errors.ps1).
+Cada medida é reportada com valor e tempo de avaliação, permitindo detectar
+regressões de resultado e de custo offline.
+
+SUBCONJUNTO DAX SUPORTADO:
+- Agregações: SUM, COUNTROWS, DISTINCTCOUNT, MIN, MAX
+- Escalares: DIVIDE, IF, SWITCH, ABS, BLANK, ISBLANK, TRUE, FALSE, DATE, YEAR, MONTH, DAY
+- Contexto: CALCULATE, ALL, REMOVEFILTERS, FILTER, VALUES
+- Ranking e iteradores: RANKX, AVERAGEX, SUMX, MINX, MAXX
+- Inteligência temporal: TOTALYTD, DATESINPERIOD, DATEADD, PREVIOUSMONTH
+- VAR / RETURN e referências a outras medidas
+
+Medidas que usam funções fora do subconjunto (FORMAT, UNICHAR, TOPN,
+SELECTEDVALUE, ...) são reportadas como NAO_SUPORTADA.
+
+GROUNDING SOURCE:
+- Financeiro.SemanticModel/definition/tables/*.tmdl
+- Financeiro.SemanticModel/definition/relationships.tmdl
+- data/03_gold/*.csv
+"""
+
+import pandas as pd
+import numpy as np
+import re
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+DIRETORIO_MODELO = "Financeiro.SemanticModel/definition"
+DIRETORIO_GOLD = "data/03_gold"
+CAMINHO_RELATORIO = "outputs/reports/dax_harness_{timestamp}.json"
+CAMINHO_BASELINE = "outputs/reports/dax_harness_baseline.json"
+
+# Repetições por medida (o tempo reportado é a mediana)
+REPETICOES_TIMING = 5
+
+# Tolerâncias para detecção de regressão contra o baseline
+TOLERANCIA_VALOR_RELATIVA = 1e-9
+TOLERANCIA_TEMPO_RELATIVA = 0.50   # +50% de tempo
+TOLERANCIA_TEMPO_ABSOLUTA_MS = 1.0  # Ignorar variações abaixo de 1 ms
+
+# ========================================
+# MÓDULO 1: PARSER TMDL
+# ========================================
+
+class TmdlParser:
+    """
+    Parser mínimo de arquivos TMDL (tabelas, colunas, medidas e relacionamentos).
+
+    Extrai apenas o necessário para o harness:
+    - colunas (nome TMDL → sourceColumn, dataType)
+    - renomeações de colunas feitas no Power Query (Table.RenameColumns)
+    - medidas (nome, expressão, pasta, formatString)
+    - relacionamentos (fato → dimensão)
+    """
+
+    PADRAO_NOME = r"('(?:[^']|'')+'|[^\s=]+)"
+
+    @staticmethod
+    def _limpar_nome(nome):
+        """Remove aspas simples de nomes TMDL ('Receita Total' → Receita Total)."""
+        nome = nome.strip()
+        if nome.startswith("'") and nome.endswith("'"):
+            nome = nome[1:-1].replace("''", "'")
+        return nome
+
+    @staticmethod
+    def _indentacao(linha):
+        """Número de tabs no início da linha."""
+        return len(linha) - len(linha.lstrip('\t'))
+
+    @classmethod
+    def parse_tabela(cls, caminho):
+        """
+        Faz o parse de um arquivo de tabela TMDL.
+
+        Parameters
+        ----------
+        caminho : str or Path
+            Arquivo .tmdl da tabela
+
+        Returns
+        -------
+        dict
+            {'nome', 'categoria', 'colunas', 'renomeacoes', 'medidas'}
+        """
+
+        linhas = Path(caminho).read_text(encoding='utf-8-sig').splitlines()
+
+        tabela = {
+            'nome': None,
+            'categoria': None,
+            'colunas': {},
+            'renomeacoes': {},
+            'medidas': []
+        }
+
+        coluna_atual = None
+        medida_atual = None
+        em_bloco_crases = False
+        i = 0
+
+        while i < len(linhas):
+            linha = linhas[i]
+            conteudo = linha.strip()
+            nivel = cls._indentacao(linha)
+
+            # Continuação de expressão multi-linha da medida
+            if medida_atual is not None and medida_atual['_aberta']:
+                if em_bloco_crases:
+                    if conteudo == '```':
+                        em_bloco_crases = False
+                        medida_atual['_aberta'] = False
+                    else:
+                        medida_atual['expressao'] += linha.strip('\t') + '\n'
+                    i += 1
+                    continue
+                if conteudo == '' or nivel >= 3:
+                    medida_atual['expressao'] += linha.strip('\t') + '\n'
+                    i += 1
+                    continue
+                medida_atual['_aberta'] = False
+
+            if nivel == 0 and conteudo.startswith('table '):
+                tabela['nome'] = cls._limpar_nome(conteudo[len('table '):])
+
+            elif nivel == 1 and conteudo.startswith('dataCategory:'):
+                tabela['categoria'] = conteudo.split(':', 1)[1].strip()
+
+            elif nivel == 1 and conteudo.startswith('column '):
+                nome = cls._limpar_nome(conteudo[len('column '):].split('=')[0])
+                coluna_atual = {'nome': nome, 'source': nome, 'tipo': None}
+                tabela['colunas'][nome] = coluna_atual
+                medida_atual = None
+
+            elif nivel == 1 and conteudo.startswith('measure '):
+                match = re.match(r"measure\s+" + cls.PADRAO_NOME + r"\s*=\s*(.*)$", conteudo)
+                if match:
+                    expressao = match.group(2)
+                    medida_atual = {
+                        'nome': cls._limpar_nome(match.group(1)),
+                        'tabela': tabela['nome'],
+                        'expressao': '',
+                        'pasta': None,
+                        'formato': None,
+                        '_aberta': True
+                    }
+                    if expressao == '```':
+                        em_bloco_crases = True
+                    else:
+                        medida_atual['expressao'] = expressao + '\n'
+                    tabela['medidas'].append(medida_atual)
+                coluna_atual = None
+
+            elif nivel == 1 and conteudo.startswith('partition '):
+                coluna_atual = None
+                medida_atual = None
+
+            elif nivel == 2 and coluna_atual is not None:
+                if conteudo.startswith('sourceColumn:'):
+                    coluna_atual['source'] = conteudo.split(':', 1)[1].strip()
+                elif conteudo.startswith('dataType:'):
+                    coluna_atual['tipo'] = conteudo.split(':', 1)[1].strip()
+
+            elif nivel == 2 and medida_atual is not None:
+                if conteudo.startswith('displayFolder:'):
+                    medida_atual['pasta'] = conteudo.split(':', 1)[1].strip()
+                elif conteudo.startswith('formatString:'):
+                    medida_atual['formato'] = conteudo.split(':', 1)[1].strip()
+
+            # Renomeações do Power Query: {{"nome_segmento", "Segmento"}}
+            if 'Table.RenameColumns' in conteudo:
+                for origem, destino in re.findall(r'\{\s*"([^"]+)"\s*,\s*"([^"]+)"\s*\}', conteudo):
+                    tabela['renomeacoes'][destino] = origem
+
+            i += 1
+
+        for medida in tabela['medidas']:
+            medida['expressao'] = medida['expressao'].strip()
+            medida.pop('_aberta', None)
+
+        return tabela
+
+    @classmethod
+    def parse_relacionamentos(cls, caminho):
+        """
+        Faz o parse de relationships.tmdl.
+
+        Returns
+        -------
+        list
+            [(tabela_origem, coluna_origem, tabela_destino, coluna_destino)]
+        """
+
+        relacionamentos = []
+        origem = None
+
+        for linha in Path(caminho).read_text(encoding='utf-8-sig').splitlines():
+            conteudo = linha.strip()
+            if conteudo.startswith('relationship '):
+                origem = None
+            elif conteudo.startswith('fromColumn:'):
+                origem = cls._separar_coluna(conteudo.split(':', 1)[1])
+            elif conteudo.startswith('toColumn:') and origem is not None:
+                destino = cls._separar_coluna(conteudo.split(':', 1)[1])
+                relacionamentos.append((origem[0], origem[1], destino[0], destino[1]))
+
+        return relacionamentos
+
+    @classmethod
+    def _separar_coluna(cls, referencia):
+        """Separa 'tabela.coluna' (com ou sem aspas) em (tabela, coluna)."""
+        match = re.match(r"\s*" + r"('(?:[^']|'')+'|[^.\s]+)" + r"\.(.+)$", referencia)
+        return cls._limpar_nome(match.group(1)), cls._limpar_nome(match.group(2))
+
+# ========================================
+# MÓDULO 2: MODELO GOLD EM MEMÓRIA
+# ========================================
+
+class ModeloGold:
+    """
+    Modelo tabular em memória: tabelas Gold com colunas renomeadas para os
+    nomes do TMDL e relacionamentos fato → dimensão pré-resolvidos.
+    """
+
+    def __init__(self, diretorio_modelo, diretorio_gold):
+        self.diretorio_modelo = Path(diretorio_modelo)
+        self.diretorio_gold = Path(diretorio_gold)
+        self.tabelas = {}
+        self.medidas = {}
+        self.coluna_data = {}       # {tabela_calendario: coluna_data}
+        self.relacionamentos = []   # [(fato, fk, dimensao, pk)]
+        self.indice_fk = {}         # {(fato, dimensao): posições da dimensão por linha do fato}
+        self._carregar()
+
+    def _carregar(self):
+        """Carrega TMDL + CSVs Gold e resolve relacionamentos."""
+
+        for arquivo in sorted((self.diretorio_modelo / 'tables').glob('*.tmdl')):
+            meta = TmdlParser.parse_tabela(arquivo)
+
+            for medida in meta['medidas']:
+                self.medidas[medida['nome']] = medida
+
+            caminho_csv = self.diretorio_gold / f"{meta['nome']}.csv"
+            if not caminho_csv.exists():
+                continue
+
+            df = pd.read_csv(caminho_csv, encoding='utf-8')
+
+            # Mapear colunas do CSV para nomes TMDL
+            mapa = {}
+            for nome, coluna in meta['colunas'].items():
+                origem = meta['renomeacoes'].get(coluna['source'], coluna['source'])
+                if origem in df.columns:
+                    mapa[origem] = nome
+                elif nome in df.columns:
+                    mapa[nome] = nome
+            df = df.rename(columns=mapa)
+
+            for nome, coluna in meta['colunas'].items():
+                if coluna['tipo'] == 'dateTime' and nome in df.columns:
+                    df[nome] = pd.to_datetime(df[nome])
+                    if meta['categoria'] == 'Time':
+                        self.coluna_data[meta['nome']] = nome
+
+            self.tabelas[meta['nome']] = df
+
+        caminho_rel = self.diretorio_modelo / 'relationships.tmdl'
+        if caminho_rel.exists():
+            for fato, fk, dim, pk in TmdlParser.parse_relacionamentos(caminho_rel):
+                if fato not in self.tabelas or dim not in self.tabelas:
+                    continue
+                if fk not in self.tabelas[fato].columns or pk not in self.tabelas[dim].columns:
+                    continue
+
+                chaves_dim = pd.Index(self.tabelas[dim][pk])
+                posicoes = chaves_dim.get_indexer(self.tabelas[fato][fk])
+                self.relacionamentos.append((fato, fk, dim, pk))
+                self.indice_fk[(fato, dim)] = posicoes
+
+    def dimensoes_de(self, tabela):
+        """Dimensões relacionadas a partir de uma tabela (lado muitos)."""
+        return [dim for fato, _, dim, _ in self.relacionamentos if fato == tabela]
+
+# ========================================
+# MÓDULO 3: TOKENIZER E PARSER DAX
+# ========================================
+
+class DaxNaoSuportado(Exception):
+    """Construção DAX fora do subconjunto suportado pelo harness."""
+
+
+TOKENS_DAX = re.compile(r"""
+    (?P<espaco>\s+)
+  | (?P<comentario>//[^\n]*|--[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<numero>\d+\.\d*|\.\d+|\d+)
+  | (?P<coluna>(?:'(?:[^']|'')+'|[^\W\d]\w*)\s*\[[^\]]+\])
+  | (?P<medida>\[[^\]]+\])
+  | (?P<tabela>'(?:[^']|'')+')
+  | (?P<op>&&|\|\||<=|>=|<>|==|[-+*/&=<>(),^])
+  | (?P<id>[^\W\d]\w*(?:\.\w+)*)
+""", re.VERBOSE | re.DOTALL)
+
+
+def tokenizar_dax(expressao):
+    """Converte expressão DAX em lista de tokens (tipo, valor)."""
+
+    tokens = []
+    pos = 0
+    while pos < len(expressao):
+        match = TOKENS_DAX.match(expressao, pos)
+        if not match:
+            raise DaxNaoSuportado(f"Token inválido na posição {pos}: {expressao[pos:pos + 20]!r}")
+        tipo = match.lastgroup
+        valor = match.group(tipo)
+        pos = match.end()
+
+        if tipo in ('espaco', 'comentario'):
+            continue
+        if tipo == 'string':
+            valor = valor[1:-1].replace('""', '"')
+        elif tipo == 'numero':
+            valor = float(valor)
+        elif tipo == 'coluna':
+            nome_tabela, nome_coluna = re.match(r"(.+?)\s*\[([^\]]+)\]$", valor, re.DOTALL).groups()
+            valor = (TmdlParser._limpar_nome(nome_tabela), nome_coluna)
+        elif tipo == 'medida':
+            valor = valor[1:-1]
+        elif tipo == 'tabela':
+            tipo, valor = 'id', TmdlParser._limpar_nome(valor)
+        tokens.append((tipo, valor))
+
+    tokens.append(('fim', None))
+    return tokens
+
+
+class ParserDax:
+    """
+    Parser descendente recursivo para o subconjunto DAX.
+
+    Nós da AST (tuplas):
+    ('num', v) | ('str', s) | ('col', tabela, coluna) | ('medida', nome)
+    ('id', nome) | ('call', FUNCAO, [args]) | ('bin', op, a, b) | ('neg', a)
+    ('let', [(var, expr)], corpo)
+    """
+
+    # Precedência DAX (menor → maior)
+    NIVEIS = [('||',), ('&&',), ('=', '==', '<>', '<', '>', '<=', '>='), ('&',), ('+', '-'), ('*', '/'), ('^',)]
+
+    def __init__(self, expressao):
+        self.tokens = tokenizar_dax(expressao)
+        self.pos = 0
+
+    def _atual(self):
+        return self.tokens[self.pos]
+
+    def _consumir(self, tipo=None, valor=None):
+        token = self.tokens[self.pos]
+        if (tipo and token[0] != tipo) or (valor is not None and token[1] != valor):
+            raise DaxNaoSuportado(f"Esperado {valor or tipo}, encontrado {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        no = self._expressao()
+        self._consumir('fim')
+        return no
+
+    def _expressao(self):
+        tipo, valor = self._atual()
+        if tipo == 'id' and valor.upper() == 'VAR':
+            variaveis = []
+            while self._atual()[0] == 'id' and self._atual()[1].upper() == 'VAR':
+                self._consumir()
+                nome = self._consumir('id')[1]
+                self._consumir('op', '=')
+                variaveis.append((nome, self._expressao()))
+            self._consumir('id')  # RETURN
+            return ('let', variaveis, self._expressao())
+        return self._binario(0)
+
+    def _binario(self, nivel):
+        if nivel == len(self.NIVEIS):
+            return self._unario()
+        esquerda = self._binario(nivel + 1)
+        while self._atual()[0] == 'op' and self._atual()[1] in self.NIVEIS[nivel]:
+            op = self._consumir()[1]
+            esquerda = ('bin', '=' if op == '==' else op, esquerda, self._binario(nivel + 1))
+        return esquerda
+
+    def _unario(self):
+        if self._atual() == ('op', '-'):
+            self._consumir()
+            return ('neg', self._unario())
+        if self._atual() == ('op', '+'):
+            self._consumir()
+            return self._unario()
+        return self._primario()
+
+    def _primario(self):
+        tipo, valor = self._consumir()
+
+        if tipo == 'numero':
+            return ('num', valor)
+        if tipo == 'string':
+            return ('str', valor)
+        if tipo == 'coluna':
+            return ('col', valor[0], valor[1])
+        if tipo == 'medida':
+            return ('medida', valor)
+        if tipo == 'op' and valor == '(':
+            no = self._expressao()
+            self._consumir('op', ')')
+            return no
+        if tipo == 'id':
+            if self._atual() == ('op', '('):
+                self._consumir()
+                args = []
+                if self._atual() != ('op', ')'):
+                    while True:
+                        if self._atual() in (('op', ','), ('op', ')')):
+                            args.append(None)  # Argumento omitido (ex.: RANKX(t, e, , DESC))
+                        else:
+                            args.append(self._expressao())
+                        if self._atual() == ('op', ','):
+                            self._consumir()
+                            continue
+                        break
+                self._consumir('op', ')')
+                return ('call', valor.upper(), args)
+            return ('id', valor)
+
+        raise DaxNaoSuportado(f"Token inesperado: {valor!r}")
+
+# ========================================
+# MÓDULO 4: AVALIADOR DAX
+# ========================================
+
+class TabelaDax:
+    """
+    Resultado de uma expressão de tabela.
+
+    Attributes
+    ----------
+    tabela : str
+        Tabela de origem
+    coluna : str or None
+        Coluna (tabela de uma coluna) ou None (linhas completas)
+    valores : np.ndarray
+        Valores da coluna ou posições de linha da tabela de origem
+    """
+
+    def __init__(self, tabela, coluna, valores):
+        self.tabela = tabela
+        self.coluna = coluna
+        self.valores = valores
+
+
+class AvaliadorDax:
+    """
+    Avaliador do subconjunto DAX sobre o ModeloGold.
+
+    O contexto de filtro é um dict {(tabela, coluna): valores permitidos};
+    coluna None indica um filtro por posições de linha da tabela.
+    Filtros em dimensões propagam para o fato via relacionamentos.
+    """
+
+    INTERVALOS = {'DAY': 'days', 'MONTH': 'months', 'QUARTER': 'months', 'YEAR': 'years'}
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self._ast = {}
+
+    # ----------------------------------------
+    # Contexto de filtro
+    # ----------------------------------------
+
+    def _mascara_propria(self, tabela, ctx):
+        """Máscara de linhas de uma tabela considerando apenas filtros nela."""
+        df = self.modelo.tabelas[tabela]
+        mascara = np.ones(len(df), dtype=bool)
+        for (t, coluna), valores in ctx.items():
+            if t != tabela:
+                continue
+            if coluna is None:
+                filtro = np.zeros(len(df), dtype=bool)
+                filtro[valores] = True
+                mascara &= filtro
+            else:
+                mascara &= df[coluna].isin(valores).to_numpy()
+        return mascara
+
+    def _mascara(self, tabela, ctx):
+        """Máscara de linhas incluindo filtros propagados pelas dimensões."""
+        mascara = self._mascara_propria(tabela, ctx)
+        tabelas_filtradas = {t for t, _ in ctx}
+        for dim in self.modelo.dimensoes_de(tabela):
+            if dim not in tabelas_filtradas:
+                continue
+            mascara_dim = self._mascara_propria(dim, ctx)
+            posicoes = self.modelo.indice_fk[(tabela, dim)]
+            mascara &= np.where(posicoes >= 0, mascara_dim[posicoes], False)
+        return mascara
+
+    def _limpar_tabela(self, ctx, tabela):
+        return {k: v for k, v in ctx.items() if k[0] != tabela}
+
+    def _aplicar_filtro(self, ctx, filtro):
+        """Aplica TabelaDax como filtro (sobrescreve filtros da mesma coluna)."""
+        ctx = dict(ctx)
+        coluna_data = self.modelo.coluna_data.get(filtro.tabela)
+        if filtro.coluna is None or filtro.coluna == coluna_data:
+            # Tabela marcada como calendário: filtro na data remove os demais
+            if coluna_data is not None:
+                ctx = self._limpar_tabela(ctx, filtro.tabela)
+        ctx[(filtro.tabela, filtro.coluna)] = filtro.valores
+        return ctx
+
+    # ----------------------------------------
+    # Avaliação
+    # ----------------------------------------
+
+    def ast_medida(self, nome):
+        """AST da medida (com cache de parse)."""
+        if nome not in self._ast:
+            if nome not in self.modelo.medidas:
+                raise DaxNaoSuportado(f"Medida inexistente: [{nome}]")
+            self._ast[nome] = ParserDax(self.modelo.medidas[nome]['expressao']).parse()
+        return self._ast[nome]
+
+    def avaliar_medida(self, nome, ctx=None):
+        """Avalia uma medida no contexto de filtro informado."""
+        return self._avaliar(self.ast_medida(nome), ctx or {}, {}, None)
+
+    def _avaliar(self, no, ctx, env, linha):
+        tipo = no[0]
+
+        if tipo == 'num':
+            return no[1]
+        if tipo == 'str':
+            return no[1]
+        if tipo == 'medida':
+            if linha is not None:
+                raise DaxNaoSuportado("Medida em contexto de linha (FILTER com medida)")
+            return self._avaliar(self.ast_medida(no[1]), ctx, {}, None)
+        if tipo == 'col':
+            if linha is not None and no[1] in linha:
+                return linha[no[1]][no[2]].to_numpy()
+            raise DaxNaoSuportado(f"Referência de coluna sem contexto de linha: {no[1]}[{no[2]}]")
+        if tipo == 'id':
+            if no[1] in env:
+                return env[no[1]]
+            raise DaxNaoSuportado(f"Identificador desconhecido: {no[1]}")
+        if tipo == 'let':
+            env = dict(env)
+            for nome, expr in no[1]:
+                env[nome] = self._avaliar(expr, ctx, env, linha)
+            return self._avaliar(no[2], ctx, env, linha)
+        if tipo == 'neg':
+            valor = self._avaliar(no[1], ctx, env, linha)
+            return None if valor is None else -valor
+        if tipo == 'bin':
+            return self._binario(no[1], self._avaliar(no[2], ctx, env, linha),
+                                 self._avaliar(no[3], ctx, env, linha))
+        if tipo == 'call':
+            funcao = getattr(self, f"_fn_{no[1].lower()}", None)
+            if funcao is None:
+                raise DaxNaoSuportado(f"Função não suportada: {no[1]}")
+            return funcao(no[2], ctx, env, linha)
+
+        raise DaxNaoSuportado(f"Nó desconhecido: {tipo}")
+
+    @staticmethod
+    def _binario(op, a, b):
+        """Operadores com semântica de BLANK do DAX (BLANK ≈ 0 / "")."""
+        vetorial = isinstance(a, np.ndarray) or isinstance(b, np.ndarray)
+
+        if op == '&':
+            return ('' if a is None else str(a)) + ('' if b is None else str(b))
+        if op in ('+', '-'):
+            if a is None and b is None:
+                return None
+            a = 0 if a is None else a
+            b = 0 if b is None else b
+            return a + b if op == '+' else a - b
+        if op in ('*', '/', '^'):
+            if a is None or b is None:
+                return None
+            if op == '*':
+                return a * b
+            if op == '^':
+                return a ** b
+            if not vetorial and b == 0:
+                raise ZeroDivisionError("Divisão por zero (use DIVIDE)")
+            return a / b
+        if op in ('&&', '||'):
+            a = bool(a) if not isinstance(a, np.ndarray) else a
+            b = bool(b) if not isinstance(b, np.ndarray) else b
+            if vetorial:
+                return np.logical_and(a, b) if op == '&&' else np.logical_or(a, b)
+            return (a and b) if op == '&&' else (a or b)
+
+        # Comparações: BLANK vira 0 (ou "" se o outro lado for texto)
+        if a is None:
+            a = '' if isinstance(b, str) else 0
+        if b is None:
+            b = '' if isinstance(a, str) else 0
+        if op == '=':
+            return a == b
+        if op == '<>':
+            return a != b
+        if op == '<':
+            return a < b
+        if op == '>':
+            return a > b
+        if op == '<=':
+            return a <= b
+        return a >= b
+
+    def _arg(self, args, i, ctx, env, linha, padrao=None):
+        if i >= len(args) or args[i] is None:
+            return padrao
+        return self._avaliar(args[i], ctx, env, linha)
+
+    def _palavra(self, args, i, padrao):
+        """Argumento-palavra (DESC, DENSE, MONTH...)."""
+        if i >= len(args) or args[i] is None:
+            return padrao
+        if args[i][0] != 'id':
+            raise DaxNaoSuportado("Argumento-palavra esperado")
+        return args[i][1].upper()
+
+    def _coluna(self, no):
+        if no is None or no[0] != 'col':
+            raise DaxNaoSuportado("Referência de coluna esperada")
+        tabela, coluna = no[1], no[2]
+        if tabela not in self.modelo.tabelas or coluna not in self.modelo.tabelas[tabela].columns:
+            raise DaxNaoSuportado(f"Coluna não mapeada no Gold: {tabela}[{coluna}]")
+        return tabela, coluna
+
+    def _tabela(self, no, ctx, env, linha):
+        """Avalia expressão de tabela → TabelaDax."""
+        if no[0] == 'id' and no[1] in self.modelo.tabelas:
+            posicoes = np.flatnonzero(self._mascara(no[1], ctx))
+            return TabelaDax(no[1], None, posicoes)
+        if no[0] == 'call' and no[1] in ('ALL', 'VALUES', 'FILTER', 'DATESINPERIOD', 'DATEADD', 'PREVIOUSMONTH'):
+            if no[1] == 'VALUES':
+                tabela, coluna = self._coluna(no[2][0])
+                df = self.modelo.tabelas[tabela]
+                return TabelaDax(tabela, coluna, df.loc[self._mascara(tabela, ctx), coluna].unique())
+            resultado = self._avaliar(no, ctx, env, linha)
+            if isinstance(resultado, TabelaDax):
+                return resultado
+        raise DaxNaoSuportado("Expressão de tabela não suportada")
+
+    def _linhas_iteracao(self, tabela_dax):
+        """Gera (TabelaDax de 1 valor) para iteradores (RANKX, AVERAGEX...)."""
+        for valor in tabela_dax.valores:
+            yield TabelaDax(tabela_dax.tabela, tabela_dax.coluna, np.array([valor]))
+
+    def _datas_contexto(self, no_coluna, ctx):
+        tabela, coluna = self._coluna(no_coluna)
+        df = self.modelo.tabelas[tabela]
+        return tabela, coluna, df.loc[self._mascara_propria(tabela, ctx), coluna]
+
+    # ----------------------------------------
+    # Funções: agregações
+    # ----------------------------------------
+
+    def _agregar(self, args, ctx, linha, operacao):
+        tabela, coluna = self._coluna(args[0])
+        serie = self.modelo.tabelas[tabela].loc[self._mascara(tabela, ctx), coluna].dropna()
+        if len(serie) == 0:
+            return None
+        return getattr(serie, operacao)()
+
+    def _fn_sum(self, args, ctx, env, linha):
+        valor = self._agregar(args, ctx, linha, 'sum')
+        return None if valor is None else float(valor)
+
+    def _fn_distinctcount(self, args, ctx, env, linha):
+        valor = self._agregar(args, ctx, linha, 'nunique')
+        return None if valor is None else int(valor)
+
+    def _fn_countrows(self, args, ctx, env, linha):
+        tabela_dax = self._tabela(args[0], ctx, env, linha)
+        return len(tabela_dax.valores) or None
+
+    def _fn_max(self, args, ctx, env, linha):
+        if len(args) == 2:
+            a, b = self._arg(args, 0, ctx, env, linha), self._arg(args, 1, ctx, env, linha)
+            return max(0 if a is None else a, 0 if b is None else b)
+        return self._agregar(args, ctx, linha, 'max')
+
+    def _fn_min(self, args, ctx, env, linha):
+        if len(args) == 2:
+            a, b = self._arg(args, 0, ctx, env, linha), self._arg(args, 1, ctx, env, linha)
+            return min(0 if a is None else a, 0 if b is None else b)
+        return self._agregar(args, ctx, linha, 'min')
+
+    # ----------------------------------------
+    # Funções: escalares
+    # ----------------------------------------
+
+    def _fn_divide(self, args, ctx, env, linha):
+        numerador = self._arg(args, 0, ctx, env, linha)
+        denominador = self._arg(args, 1, ctx, env, linha)
+        if denominador is None or denominador == 0:
+            return self._arg(args, 2, ctx, env, linha)
+        if numerador is None:
+            return None
+        return numerador / denominador
+
+    def _fn_if(self, args, ctx, env, linha):
+        if self._arg(args, 0, ctx, env, linha):
+            return self._arg(args, 1, ctx, env, linha)
+        return self._arg(args, 2, ctx, env, linha)
+
+    def _fn_switch(self, args, ctx, env, linha):
+        valor = self._arg(args, 0, ctx, env, linha)
+        i = 1
+        while i + 1 < len(args):
+            if self._binario('=', valor, self._arg(args, i, ctx, env, linha)):
+                return self._arg(args, i + 1, ctx, env, linha)
+            i += 2
+        return self._arg(args, i, ctx, env, linha) if i < len(args) else None
+
+    def _fn_abs(self, args, ctx, env, linha):
+        valor = self._arg(args, 0, ctx, env, linha)
+        return None if valor is None else abs(valor)
+
+    def _fn_blank(self, args, ctx, env, linha):
+        return None
+
+    def _fn_isblank(self, args, ctx, env, linha):
+        return self._arg(args, 0, ctx, env, linha) is None
+
+    def _fn_true(self, args, ctx, env, linha):
+        return True
+
+    def _fn_false(self, args, ctx, env, linha):
+        return False
+
+    def _fn_date(self, args, ctx, env, linha):
+        ano, mes, dia = (int(self._arg(args, i, ctx, env, linha)) for i in range(3))
+        return pd.Timestamp(year=ano, month=1, day=1) + pd.DateOffset(months=mes - 1, days=dia - 1)
+
+    def _fn_year(self, args, ctx, env, linha):
+        valor = self._arg(args, 0, ctx, env, linha)
+        return None if valor is None else valor.year
+
+    def _fn_month(self, args, ctx, env, linha):
+        valor = self._arg(args, 0, ctx, env, linha)
+        return None if valor is None else valor.month
+
+    def _fn_day(self, args, ctx, env, linha):
+        valor = self._arg(args, 0, ctx, env, linha)
+        return None if valor is None else valor.day
+
+    # ----------------------------------------
+    # Funções: contexto de filtro
+    # ----------------------------------------
+
+    def _fn_all(self, args, ctx, env, linha):
+        if not args:
+            raise DaxNaoSuportado("ALL() sem argumentos")
+        if args[0][0] == 'id' and args[0][1] in self.modelo.tabelas:
+            tabela = args[0][1]
+            return TabelaDax(tabela, None, np.arange(len(self.modelo.tabelas[tabela])))
+        tabela, coluna = self._coluna(args[0])
+        return TabelaDax(tabela, coluna, self.modelo.tabelas[tabela][coluna].dropna().unique())
+
+    def _fn_filter(self, args, ctx, env, linha):
+        base = self._tabela(args[0], ctx, env, linha)
+        df = self.modelo.tabelas[base.tabela]
+        if base.coluna is None:
+            linhas = df.iloc[base.valores]
+        else:
+            linhas = pd.DataFrame({base.coluna: base.valores})
+        mascara = self._avaliar(args[1], ctx, env, {base.tabela: linhas})
+        mascara = np.broadcast_to(np.asarray(mascara, dtype=bool), len(linhas))
+        return TabelaDax(base.tabela, base.coluna, base.valores[mascara])
+
+    def _fn_calculate(self, args, ctx, env, linha):
+        modificadores = []
+        filtros = []
+
+        # Filtros são avaliados no contexto externo
+        for arg in args[1:]:
+            if arg[0] == 'call' and arg[1] in ('ALL', 'REMOVEFILTERS') and len(arg[2]) <= 1:
+                modificadores.append(arg)
+            elif arg[0] == 'bin':
+                filtros.append(self._filtro_booleano(arg, env))
+            else:
+                filtros.append(self._tabela(arg, ctx, env, linha))
+
+        novo_ctx = dict(ctx)
+        for arg in modificadores:
+            if not arg[2]:
+                novo_ctx = {}
+            elif arg[2][0][0] == 'id':
+                novo_ctx = self._limpar_tabela(novo_ctx, arg[2][0][1])
+            else:
+                chave = self._coluna(arg[2][0])
+                novo_ctx.pop(chave, None)
+        for filtro in filtros:
+            novo_ctx = self._aplicar_filtro(novo_ctx, filtro)
+
+        return self._avaliar(args[0], novo_ctx, env, None)
+
+    def _colunas_referenciadas(self, no, encontradas):
+        if isinstance(no, tuple):
+            if no and no[0] == 'col':
+                encontradas.add((no[1], no[2]))
+            for filho in no[1:]:
+                self._colunas_referenciadas(filho, encontradas)
+        elif isinstance(no, list):
+            for filho in no:
+                self._colunas_referenciadas(filho, encontradas)
+        return encontradas
+
+    def _filtro_booleano(self, no, env):
+        """Filtro booleano de CALCULATE sobre uma coluna (ex.: t[c] = "High")."""
+        colunas = self._colunas_referenciadas(no, set())
+        if len(colunas) != 1:
+            raise DaxNaoSuportado("Filtro booleano deve referenciar exatamente uma coluna")
+        tabela, coluna = self._coluna(('col',) + colunas.pop())
+        valores = self.modelo.tabelas[tabela][coluna].dropna().unique()
+        mascara = self._avaliar(no, {}, env, {tabela: pd.DataFrame({coluna: valores})})
+        mascara = np.broadcast_to(np.asarray(mascara, dtype=bool), len(valores))
+        return TabelaDax(tabela, coluna, valores[mascara])
+
+    # ----------------------------------------
+    # Funções: iteradores e ranking
+    # ----------------------------------------
+
+    def _iterar(self, args, ctx, env):
+        tabela_dax = self._tabela(args[0], ctx, env, None)
+        resultados = []
+        for linha_dax in self._linhas_iteracao(tabela_dax):
+            resultados.append(self._avaliar(args[1], self._aplicar_filtro(ctx, linha_dax), env, None))
+        return resultados
+
+    def _fn_averagex(self, args, ctx, env, linha):
+        valores = [v for v in self._iterar(args, ctx, env) if v is not None]
+        return sum(valores) / len(valores) if valores else None
+
+    def _fn_sumx(self, args, ctx, env, linha):
+        valores = [v for v in self._iterar(args, ctx, env) if v is not None]
+        return sum(valores) if valores else None
+
+    def _fn_maxx(self, args, ctx, env, linha):
+        valores = [v for v in self._iterar(args, ctx, env) if v is not None]
+        return max(valores) if valores else None
+
+    def _fn_minx(self, args, ctx, env, linha):
+        valores = [v for v in self._iterar(args, ctx, env) if v is not None]
+        return min(valores) if valores else None
+
+    def _fn_rankx(self, args, ctx, env, linha):
+        valores = [0 if v is None else v for v in self._iterar(args, ctx, env)]
+        atual = self._arg(args, 2, ctx, env, None)
+        if atual is None:
+            atual = self._avaliar(args[1], ctx, env, None)
+        atual = 0 if atual is None else atual
+
+        ordem = self._palavra(args, 3, 'DESC')
+        empates = self._palavra(args, 4, 'SKIP')
+        if ordem not in ('DESC', 'ASC'):
+            raise DaxNaoSuportado(f"Ordem RANKX não suportada: {ordem}")
+
+        if empates == 'DENSE':
+            valores = set(valores)
+        if ordem == 'DESC':
+            return 1 + sum(1 for v in valores if v > atual)
+        return 1 + sum(1 for v in valores if v < atual)
+
+    # ----------------------------------------
+    # Funções: inteligência temporal
+    # ----------------------------------------
+
+    def _deslocamento(self, n, intervalo):
+        if intervalo not in self.INTERVALOS:
+            raise DaxNaoSuportado(f"Intervalo não suportado: {intervalo}")
+        if intervalo == 'QUARTER':
+            n *= 3
+        return pd.DateOffset(**{self.INTERVALOS[intervalo]: int(n)})
+
+    def _fn_totalytd(self, args, ctx, env, linha):
+        tabela, coluna, datas = self._datas_contexto(args[1], ctx)
+        if len(datas) == 0:
+            return None
+        ultima = datas.max()
+        todas = self.modelo.tabelas[tabela][coluna]
+        ytd = todas[(todas >= pd.Timestamp(year=ultima.year, month=1, day=1)) & (todas <= ultima)]
+        return self._avaliar(args[0], self._aplicar_filtro(ctx, TabelaDax(tabela, coluna, ytd.to_numpy())), env, None)
+
+    def _fn_datesinperiod(self, args, ctx, env, linha):
+        tabela, coluna = self._coluna(args[0])
+        inicio = self._arg(args, 1, ctx, env, linha)
+        n = self._arg(args, 2, ctx, env, linha)
+        deslocamento = self._deslocamento(n, self._palavra(args, 3, 'DAY'))
+        todas = self.modelo.tabelas[tabela][coluna]
+        if inicio is None:
+            return TabelaDax(tabela, coluna, todas.iloc[:0].to_numpy())
+        if n < 0:
+            mascara = (todas > inicio + deslocamento) & (todas <= inicio)
+        else:
+            mascara = (todas >= inicio) & (todas < inicio + deslocamento)
+        return TabelaDax(tabela, coluna, todas[mascara].to_numpy())
+
+    def _fn_dateadd(self, args, ctx, env, linha):
+        tabela, coluna, datas = self._datas_contexto(args[0], ctx)
+        n = self._arg(args, 1, ctx, env, linha)
+        deslocadas = datas + self._deslocamento(n, self._palavra(args, 2, 'DAY'))
+        todas = self.modelo.tabelas[tabela][coluna]
+        return TabelaDax(tabela, coluna, todas[todas.isin(deslocadas)].to_numpy())
+
+    def _fn_previousmonth(self, args, ctx, env, linha):
+        tabela, coluna, datas = self._datas_contexto(args[0], ctx)
+        todas = self.modelo.tabelas[tabela][coluna]
+        if len(datas) == 0:
+            return TabelaDax(tabela, coluna, todas.iloc[:0].to_numpy())
+        mes_anterior = (datas.min() - pd.DateOffset(months=1)).to_period('M')
+        return TabelaDax(tabela, coluna, todas[todas.dt.to_period('M') == mes_anterior].to_numpy())
+
+# ========================================
+# MÓDULO 5: HARNESS (VALOR + TEMPO + REGRESSÃO)
+# ========================================
+
+class DaxMeasureHarness:
+    """
+    Avalia todas as medidas do TMDL, mede o tempo de cada uma e compara
+    com um baseline salvo para detectar regressões de valor e de custo.
+    """
+
+    def __init__(self, diretorio_modelo, diretorio_gold, repeticoes=REPETICOES_TIMING):
+        self.diretorio_modelo = diretorio_modelo
+        self.diretorio_gold = diretorio_gold
+        self.repeticoes = repeticoes
+        self.modelo = None
+        self.avaliador = None
+
+    def carregar(self):
+        """Carrega TMDL e tabelas Gold."""
+        print("=" * 80)
+        print("DAX MEASURE HARNESS - Avaliação Offline (TMDL → Gold)")
+        print("=" * 80)
+        print(f"Modelo: {self.diretorio_modelo}")
+        print(f"Gold: {self.diretorio_gold}")
+        print(f"Timestamp: {datetime.now().isoformat()}\n")
+
+        inicio = time.perf_counter()
+        self.modelo = ModeloGold(self.diretorio_modelo, self.diretorio_gold)
+        self.avaliador = AvaliadorDax(self.modelo)
+        duracao = (time.perf_counter() - inicio) * 1000
+
+        print(f"✅ {len(self.modelo.tabelas)} tabelas Gold carregadas, "
+              f"{len(self.modelo.medidas)} medidas, "
+              f"{len(self.modelo.relacionamentos)} relacionamentos ({duracao:.1f} ms)\n")
+
+    @staticmethod
+    def _serializar(valor):
+        if valor is None:
+            return None
+        if isinstance(valor, (pd.Timestamp, datetime)):
+            return valor.isoformat()
+        if isinstance(valor, (np.bool_, bool)):
+            return bool(valor)
+        if isinstance(valor, (np.integer, int)):
+            return int(valor)
+        if isinstance(valor, (np.floating, float)):
+            return float(valor)
+        return str(valor)
+
+    @staticmethod
+    def _contexto_de_dict(contexto):
+        """Converte {'dim_geografia[pais]': 'Canada'} em contexto de filtro."""
+        ctx = {}
+        for referencia, valores in (contexto or {}).items():
+            tabela, coluna = re.match(r"(.+?)\[(.+)\]$", referencia).groups()
+            if not isinstance(valores, (list, tuple, set)):
+                valores = [valores]
+            ctx[(tabela, coluna)] = np.array(list(valores), dtype=object)
+        return ctx
+
+    def avaliar_todas(self, contexto=None):
+        """
+        Avalia todas as medidas em um contexto de filtro.
+
+        Parameters
+        ----------
+        contexto : dict, optional
+            Filtros no formato {'tabela[coluna]': valor ou lista}
+
+        Returns
+        -------
+        list
+            Resultado por medida (nome, pasta, status, valor, tempo_ms, motivo)
+        """
+
+        print(f"🧮 Avaliando medidas (contexto: {contexto or 'total geral'})...")
+        print("-" * 80)
+
+        ctx = self._contexto_de_dict(contexto)
+        resultados = []
+
+        for nome, medida in self.modelo.medidas.items():
+            resultado = {
+                'nome': nome,
+                'pasta': medida['pasta'],
+                'status': 'OK',
+                'valor': None,
+                'tempo_ms': None,
+                'motivo': None
+            }
+
+            try:
+                tempos = []
+                for _ in range(self.repeticoes):
+                    inicio = time.perf_counter()
+                    valor = self.avaliador.avaliar_medida(nome, ctx)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+
+                resultado['valor'] = self._serializar(valor)
+                resultado['tempo_ms'] = round(float(np.median(tempos)), 4)
+                print(f"   ✅ {nome:40s} = {resultado['valor']!s:>24} ({resultado['tempo_ms']:.3f} ms)")
+
+            except DaxNaoSuportado as e:
+                resultado['status'] = 'NAO_SUPORTADA'
+                resultado['motivo'] = str(e)
+                print(f"   ⏭️  {nome:40s} NÃO SUPORTADA: {e}")
+
+            except Exception as e:
+                resultado['status'] = 'ERRO'
+                resultado['motivo'] = f"{type(e).__name__}: {e}"
+                print(f"   ❌ {nome:40s} ERRO: {resultado['motivo']}")
+
+            resultados.append(resultado)
+
+        print()
+        return resultados
+
+    @staticmethod
+    def comparar_baseline(resultados, baseline):
+        """
+        Compara resultados com um baseline salvo.
+
+        Returns
+        -------
+        list
+            Regressões detectadas (tipo REGRESSAO_VALOR ou REGRESSAO_CUSTO)
+        """
+
+        anteriores = {m['nome']: m for m in baseline.get('medidas', [])}
+        regressoes = []
+
+        for atual in resultados:
+            anterior = anteriores.get(atual['nome'])
+            if anterior is None or atual['status'] != 'OK' or anterior['status'] != 'OK':
+                continue
+
+            v_atual, v_anterior = atual['valor'], anterior['valor']
+            if isinstance(v_atual, (int, float)) and isinstance(v_anterior, (int, float)):
+                escala = max(abs(v_anterior), 1.0)
+                mudou = abs(v_atual - v_anterior) > TOLERANCIA_VALOR_RELATIVA * escala
+            else:
+                mudou = v_atual != v_anterior
+
+            if mudou:
+                regressoes.append({
+                    'tipo': 'REGRESSAO_VALOR',
+                    'medida': atual['nome'],
+                    'anterior': v_anterior,
+                    'atual': v_atual
+                })
+
+            t_atual, t_anterior = atual['tempo_ms'], anterior['tempo_ms']
+            if (t_atual - t_anterior > TOLERANCIA_TEMPO_ABSOLUTA_MS
+                    and t_atual > t_anterior * (1 + TOLERANCIA_TEMPO_RELATIVA)):
+                regressoes.append({
+                    'tipo': 'REGRESSAO_CUSTO',
+                    'medida': atual['nome'],
+                    'anterior_ms': t_anterior,
+                    'atual_ms': t_atual
+                })
+
+        return regressoes
+
+    def executar(self, contexto=None, caminho_baseline=CAMINHO_BASELINE):
+        """Executa o harness completo e salva o relatório JSON."""
+
+        self.carregar()
+        resultados = self.avaliar_todas(contexto)
+
+        relatorio = {
+            'timestamp': datetime.now().isoformat(),
+            'modelo': str(self.diretorio_modelo),
+            'contexto': contexto or {},
+            'repeticoes': self.repeticoes,
+            'total_medidas': len(resultados),
+            'avaliadas': sum(1 for r in resultados if r['status'] == 'OK'),
+            'nao_suportadas': sum(1 for r in resultados if r['status'] == 'NAO_SUPORTADA'),
+            'erros': sum(1 for r in resultados if r['status'] == 'ERRO'),
+            'tempo_total_ms': round(sum(r['tempo_ms'] or 0 for r in resultados), 4),
+            'medidas': resultados,
+            'regressoes': []
+        }
+
+        # Comparar com baseline (ou criar o primeiro)
+        Path(caminho_baseline).parent.mkdir(parents=True, exist_ok=True)
+        if Path(caminho_baseline).exists():
+            with open(caminho_baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('contexto', {}) == relatorio['contexto']:
+                relatorio['regressoes'] = self.comparar_baseline(resultados, baseline)
+        else:
+            with open(caminho_baseline, 'w', encoding='utf-8') as f:
+                json.dump(relatorio, f, indent=2, ensure_ascii=False)
+            print(f"🆕 Baseline criado: {caminho_baseline}\n")
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        caminho_relatorio = CAMINHO_RELATORIO.format(timestamp=timestamp)
+        with open(caminho_relatorio, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+        print("=" * 80)
+        print("📊 RESUMO DO HARNESS")
+        print("=" * 80)
+        print(f"Medidas avaliadas: {relatorio['avaliadas']}/{relatorio['total_medidas']}")
+        print(f"Não suportadas: {relatorio['nao_suportadas']}")
+        print(f"Erros: {relatorio['erros']}")
+        print(f"Tempo total (mediana por medida): {relatorio['tempo_total_ms']:.2f} ms")
+
+        if relatorio['regressoes']:
+            print(f"\n🚨 {len(relatorio['regressoes'])} REGRESSÕES vs baseline:")
+            for regressao in relatorio['regressoes']:
+                print(f"   {regressao['tipo']}: {regressao['medida']}")
+        else:
+            print("\n✅ Nenhuma regressão vs baseline")
+
+        print(f"\n📝 Relatório salvo: {caminho_relatorio}\n")
+
+        return relatorio
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Execução do harness de medidas DAX.
+
+    USO:
+        python dax_measure_harness.py
+
+    OUTPUT:
+        - outputs/reports/dax_harness_*.json (valores + tempos)
+        - outputs/reports/dax_harness_baseline.json (criado na 1ª execução)
+
+    RETORNO:
+        0: Sem erros nem regressões
+        1: Medidas com erro ou regressões detectadas
+    """
+
+    harness = DaxMeasureHarness(DIRETORIO_MODELO, DIRETORIO_GOLD)
+    relatorio = harness.executar()
+
+    sys.exit(1 if relatorio['erros'] or relatorio['regressoes'] else 0)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ÍNDICES BITMAP - CHAVES ESTRANGEIRAS DA TABELA FATO (CAMADA GOLD)
+Analytics Architect - Financial Data Fortress 2026
+
+Autor: Analytics Architect
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Evitar um scan booleano completo de fato_financeiro para cada predicado em
+agregações filtradas (ex.: "Canada AND Government AND Q4").
+Cada valor de produto_sk, geografia_sk, segmento_sk, desconto_sk e do mês
+(derivado de tempo_sk) ganha um bitmap compactado (1 bit por linha do fato).
+Filtros multi-predicado viram ORs (dentro da coluna) e ANDs (entre colunas)
+de bitmaps antes de qualquer coluna de métrica ser lida.
+
+PERSISTÊNCIA:
+- data/03_gold/_bitmap_index/bitmap_<coluna>.npz (zlib via savez_compressed)
+- data/03_gold/_bitmap_index/metadata.json (linhas indexadas, colunas,
+  impressão digital das linhas indexadas)
+
+GROUNDING SOURCE:
+- ARQUITETURA_CAMADA_OURO.md (Seção: Star Schema)
+- build_star_schema.py (FKs da Fato_Financeiro)
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+DIRETORIO_GOLD = "data/03_gold"
+DIRETORIO_INDICES = "data/03_gold/_bitmap_index"
+
+# FKs indexadas diretamente
+COLUNAS_INDEXADAS = ['produto_sk', 'geografia_sk', 'segmento_sk', 'desconto_sk']
+
+# Coluna derivada de tempo_sk via dim_tempo (AAAAMM)
+COLUNA_MES = 'mes'
+
+# Colunas que definem os bitmaps (impressão digital das linhas indexadas)
+COLUNAS_IMPRESSAO = COLUNAS_INDEXADAS + ['tempo_sk']
+
+# Contagem de bits por byte (popcount sem depender de np.bitwise_count)
+POPCOUNT_BYTE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# ========================================
+# MÓDULO 1: OPERAÇÕES DE BITMAP
+# ========================================
+
+def _anexar_bits(buffer, n_linhas, bits_novos):
+    """
+    Escreve bits após os n_linhas primeiros de um bitmap compactado (np.packbits).
+
+    `buffer` já tem capacidade para os bits novos e é alterado no lugar:
+    apenas o último byte parcial é reprocessado, então o custo é
+    proporcional ao delta, não ao tamanho do fato.
+    """
+    inicio, resto = divmod(n_linhas, 8)
+    if resto:
+        cauda = np.unpackbits(buffer[inicio:inicio + 1])[:resto].astype(bool)
+        bits_novos = np.concatenate([cauda, bits_novos])
+    empacotados = np.packbits(bits_novos)
+    buffer[inicio:inicio + len(empacotados)] = empacotados
+
+
+def impressao_linhas(fato, colunas, inicio=0):
+    """
+    Impressão digital das linhas do fato nas colunas informadas.
+
+    Soma de hash(linha) * (2 * posição + 1) em uint64: depende da ordem, e
+    a impressão de um prefixo estendido é a do prefixo mais a das linhas
+    novas (sem reler o prefixo). `inicio` é a posição da primeira linha.
+    Também usada pelos stores de rankings e sketches do fato.
+    """
+    colunas = [coluna for coluna in colunas if coluna in fato.columns]
+    hashes = pd.util.hash_pandas_object(fato[colunas], index=False).to_numpy()
+    pesos = 2 * np.arange(inicio, inicio + len(fato), dtype=np.uint64) + 1
+    return int((hashes * pesos).sum(dtype=np.uint64))
+
+
+def contar_bits(bitmap):
+    """Número de linhas selecionadas por um bitmap compactado."""
+    return int(POPCOUNT_BYTE[bitmap].sum(dtype=np.int64))
+
+# ========================================
+# MÓDULO 2: ÍNDICE BITMAP DO FATO
+# ========================================
+
+class GoldBitmapIndex:
+    """
+    Índice bitmap por valor para as FKs de fato_financeiro.
+
+    Estrutura em memória:
+    - bitmaps[coluna][valor] = np.ndarray[uint8] (1 bit por linha do fato),
+      visão dos bytes usados de um buffer cuja capacidade dobra ao encher
+      (anexar não copia o bitmap inteiro a cada partição)
+    - n_linhas = linhas do fato já indexadas
+    - impressao = impressão digital dessas linhas (impressao_linhas sobre
+      COLUNAS_IMPRESSAO)
+
+    Examples
+    --------
+    >>> indice = GoldBitmapIndex.construir(fato, dim_tempo)
+    >>> bitmap = indice.filtrar({'geografia_sk': 1, 'segmento_sk': 1,
+    ...                          'mes': [201410, 201411, 201412]})
+    >>> indice.agregar(fato, 'lucro', {'geografia_sk': 1})
+    """
+
+    def __init__(self):
+        self.bitmaps = {coluna: {} for coluna in COLUNAS_INDEXADAS + [COLUNA_MES]}
+        self.n_linhas = 0
+        self.impressao = 0
+        self._buffers = {coluna: {} for coluna in self.bitmaps}
+        self._capacidade = 0
+
+    def _atualizar_visoes(self):
+        """bitmaps[coluna][valor] = bytes usados do buffer correspondente."""
+        n_bytes = (self.n_linhas + 7) // 8
+        self.bitmaps = {
+            coluna: {valor: buffer[:n_bytes] for valor, buffer in buffers.items()}
+            for coluna, buffers in self._buffers.items()
+        }
+
+    def _reservar(self, n_bytes):
+        """Garante capacidade para n_bytes por bitmap (dobrando, custo amortizado)."""
+        if n_bytes <= self._capacidade:
+            return
+        self._capacidade = max(n_bytes, 2 * self._capacidade)
+        usados = (self.n_linhas + 7) // 8
+        for buffers in self._buffers.values():
+            for valor, buffer in buffers.items():
+                novo = np.zeros(self._capacidade, dtype=np.uint8)
+                novo[:usados] = buffer[:usados]
+                buffers[valor] = novo
+
+    # ----------------------------------------
+    # Construção e manutenção
+    # ----------------------------------------
+
+    @staticmethod
+    def _colunas_particao(fato, dim_tempo):
+        """Extrai as colunas indexadas (FKs + mês derivado de tempo_sk)."""
+        colunas = {coluna: fato[coluna].to_numpy() for coluna in COLUNAS_INDEXADAS if coluna in fato.columns}
+
+        mes_por_tempo = pd.Series(
+            (dim_tempo['ano'] * 100 + dim_tempo['mes']).to_numpy(),
+            index=dim_tempo['tempo_sk'].to_numpy()
+        )
+        colunas[COLUNA_MES] = fato['tempo_sk'].map(mes_por_tempo).to_numpy()
+
+        return colunas
+
+    @classmethod
+    def construir(cls, fato, dim_tempo):
+        """
+        Constrói o índice completo a partir da tabela fato.
+
+        Parameters
+        ----------
+        fato : pd.DataFrame
+            fato_financeiro
+        dim_tempo : pd.DataFrame
+            dim_tempo (tempo_sk, ano, mes)
+
+        Returns
+        -------
+        GoldBitmapIndex
+        """
+        indice = cls()
+        indice.anexar_particao(fato, dim_tempo)
+        return indice
+
+    def anexar_particao(self, fato_delta, dim_tempo):
+        """
+        Atualiza o índice com uma partição anexada ao fato.
+
+        As linhas do delta devem seguir as linhas já indexadas, na mesma
+        ordem em que foram anexadas ao arquivo do fato.
+
+        Parameters
+        ----------
+        fato_delta : pd.DataFrame
+            Novas linhas de fato_financeiro
+        dim_tempo : pd.DataFrame
+            dim_tempo (tempo_sk, ano, mes)
+        """
+
+        n_delta = len(fato_delta)
+        if n_delta == 0:
+            return
+
+        self._reservar((self.n_linhas + n_delta + 7) // 8)
+
+        # Valores ausentes no delta não são tocados: o buffer além de
+        # n_linhas já é zero
+        for coluna, valores in self._colunas_particao(fato_delta, dim_tempo).items():
+            buffers = self._buffers[coluna]
+            codigos, uniques = pd.factorize(valores, use_na_sentinel=True)
+
+            for codigo, valor in enumerate(uniques):
+                valor = valor.item() if hasattr(valor, 'item') else valor
+                if valor not in buffers:
+                    buffers[valor] = np.zeros(self._capacidade, dtype=np.uint8)
+                _anexar_bits(buffers[valor], self.n_linhas, codigos == codigo)
+
+        self.impressao = (self.impressao + impressao_linhas(fato_delta, COLUNAS_IMPRESSAO, self.n_linhas)) % 2 ** 64
+        self.n_linhas += n_delta
+        self._atualizar_visoes()
+
+    def sincronizar(self, fato, dim_tempo):
+        """
+        Alinha o índice com o fato atual.
+
+        Se o fato cresceu, indexa apenas a cauda anexada; se encolheu ou
+        se as linhas já indexadas mudaram (arquivo reescrito, detectado
+        pela impressão digital), reconstrói o índice.
+
+        Returns
+        -------
+        int
+            Linhas indexadas nesta chamada
+        """
+        if len(fato) < self.n_linhas or impressao_linhas(fato.iloc[:self.n_linhas], COLUNAS_IMPRESSAO) != self.impressao:
+            self.__init__()
+        delta = fato.iloc[self.n_linhas:]
+        self.anexar_particao(delta, dim_tempo)
+        return len(delta)
+
+    # ----------------------------------------
+    # Consultas
+    # ----------------------------------------
+
+    def _vazio(self, valor_bit=0):
+        return np.full((self.n_linhas + 7) // 8, valor_bit, dtype=np.uint8)
+
+    def bitmap(self, coluna, valores):
+        """OR dos bitmaps de um ou mais valores de uma coluna."""
+        if coluna not in self.bitmaps:
+            raise KeyError(f"Coluna não indexada: {coluna}")
+        if not isinstance(valores, (list, tuple, set, np.ndarray)):
+            valores = [valores]
+
+        resultado = self._vazio()
+        for valor in valores:
+            bitmap = self.bitmaps[coluna].get(valor)
+            if bitmap is not None:
+                np.bitwise_or(resultado, bitmap, out=resultado)
+        return resultado
+
+    def filtrar(self, predicados):
+        """
+        AND de predicados entre colunas (OR de valores dentro da coluna).
+
+        Parameters
+        ----------
+        predicados : dict
+            {coluna: valor ou lista de valores}
+
+        Returns
+        -------
+        np.ndarray
+            Bitmap compactado das linhas selecionadas
+        """
+        resultado = self._vazio(0xFF)
+        for coluna, valores in predicados.items():
+            np.bitwise_and(resultado, self.bitmap(coluna, valores), out=resultado)
+
+        # Zerar bits de preenchimento do último byte
+        resto = self.n_linhas % 8
+        if resto and len(resultado):
+            resultado[-1] &= np.uint8((0xFF << (8 - resto)) & 0xFF)
+        return resultado
+
+    def linhas(self, predicados):
+        """Posições (iloc) das linhas do fato que satisfazem os predicados."""
+        bits = np.unpackbits(self.filtrar(predicados), count=self.n_linhas)
+        return np.flatnonzero(bits)
+
+    def contar(self, predicados):
+        """Contagem de linhas sem materializar posições."""
+        return contar_bits(self.filtrar(predicados))
+
+    def agregar(self, fato, metrica, predicados, operacao='sum'):
+        """
+        Agrega uma métrica lendo apenas as linhas selecionadas pelo bitmap.
+
+        Parameters
+        ----------
+        fato : pd.DataFrame
+            fato_financeiro (alinhado com o índice)
+        metrica : str
+            Coluna de métrica (ex.: 'lucro', 'receita_liquida')
+        predicados : dict
+            {coluna: valor ou lista de valores}
+        operacao : str
+            Agregação numpy ('sum', 'mean', 'min', 'max')
+        """
+        posicoes = self.linhas(predicados)
+        valores = fato[metrica].to_numpy()[posicoes]
+        if len(valores) == 0:
+            return None
+        return float(getattr(np, operacao)(valores))
+
+    # ----------------------------------------
+    # Persistência
+    # ----------------------------------------
+
+    def salvar(self, diretorio=DIRETORIO_INDICES):
+        """Persiste os bitmaps (um .npz por coluna) ao lado das tabelas Gold."""
+        Path(diretorio).mkdir(parents=True, exist_ok=True)
+
+        tamanho_total = 0
+        for coluna, bitmaps in self.bitmaps.items():
+            valores = np.array(list(bitmaps.keys()))
+            matriz = np.stack(list(bitmaps.values())) if bitmaps else np.zeros((0, 0), dtype=np.uint8)
+            caminho = Path(diretorio) / f"bitmap_{coluna}.npz"
+            np.savez_compressed(caminho, valores=valores, bitmaps=matriz)
+            tamanho_total += caminho.stat().st_size
+
+        with open(Path(diretorio) / 'metadata.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'n_linhas': self.n_linhas,
+                'impressao': str(self.impressao),
+                'colunas': list(self.bitmaps.keys()),
+                'valores_por_coluna': {c: len(b) for c, b in self.bitmaps.items()},
+                'data_atualizacao': datetime.now().isoformat()
+            }, f, indent=2, ensure_ascii=False)
+
+        return tamanho_total
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_INDICES):
+        """Carrega índice persistido (ou None se não existir)."""
+        caminho_meta = Path(diretorio) / 'metadata.json'
+        if not caminho_meta.exists():
+            return None
+
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        indice = cls()
+        indice.n_linhas = meta['n_linhas']
+        # Índice salvo sem impressão: sincronizar() reconstrói
+        indice.impressao = int(meta['impressao']) if 'impressao' in meta else None
+        indice._capacidade = (indice.n_linhas + 7) // 8
+        for coluna in meta['colunas']:
+            with np.load(Path(diretorio) / f"bitmap_{coluna}.npz") as dados:
+                indice._buffers[coluna] = {
+                    valor.item(): bitmap.copy() for valor, bitmap in zip(dados['valores'], dados['bitmaps'])
+                }
+        indice._atualizar_visoes()
+        return indice
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Constrói/sincroniza o índice bitmap e demonstra um filtro multi-predicado.
+
+    USO:
+        python gold_bitmap_index.py
+
+    OUTPUT:
+        - data/03_gold/_bitmap_index/*.npz
+        - data/03_gold/_bitmap_index/metadata.json
+    """
+
+    print("=" * 80)
+    print("GOLD BITMAP INDEX - FKs de Fato_Financeiro")
+    print("=" * 80 + "\n")
+
+    fato = pd.read_csv(f"{DIRETORIO_GOLD}/fato_financeiro.csv")
+    dim_tempo = pd.read_csv(f"{DIRETORIO_GOLD}/dim_tempo.csv")
+    dim_geografia = pd.read_csv(f"{DIRETORIO_GOLD}/dim_geografia.csv")
+    dim_segmento = pd.read_csv(f"{DIRETORIO_GOLD}/dim_segmento.csv")
+
+    indice = GoldBitmapIndex.carregar() or GoldBitmapIndex()
+    novas = indice.sincronizar(fato, dim_tempo)
+    tamanho = indice.salvar()
+
+    print(f"✅ {indice.n_linhas} linhas indexadas ({novas} nesta execução)")
+    print(f"   Bitmaps por coluna: { {c: len(b) for c, b in indice.bitmaps.items()} }")
+    print(f"   Tamanho em disco: {tamanho / 1024:.1f} KB\n")
+
+    # Demo: Canada AND Government AND Q4 (todos os anos)
+    canada = dim_geografia.loc[dim_geografia['pais'] == 'Canada', 'geografia_sk'].tolist()
+    governo = dim_segmento.loc[dim_segmento['nome_segmento'] == 'Government', 'segmento_sk'].tolist()
+    meses_q4 = [m for m in indice.bitmaps[COLUNA_MES] if m % 100 in (10, 11, 12)]
+
+    predicados = {'geografia_sk': canada, 'segmento_sk': governo, COLUNA_MES: meses_q4}
+    print("🔍 Filtro: Canada AND Government AND Q4")
+    print(f"   Linhas: {indice.contar(predicados)}")
+    print(f"   Lucro: {indice.agregar(fato, 'lucro', predicados)}\n")
+
+    sys.exit(0)
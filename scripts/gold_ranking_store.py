@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RANKING STORE - TOP-N PRÉ-CALCULADO E INCREMENTAL (CAMADA GOLD)
+Analytics Architect - Financial Data Fortress 2026
+
+Autor: Analytics Architect
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Evitar recomputar rankings (Ranking Receita por Pais, Ranking Lucro por Pais,
+rankings de produto em _extract_data.py) com groupby + sort_values completos
+a cada consulta. O store mantém:
+- totais por (dimensão, período, membro) para receita, lucro e unidades
+- ranks densos por (dimensão, período, métrica)
+Deltas do fato somam nos totais e apenas os grupos (dimensão, período)
+tocados são re-ranqueados.
+
+PERÍODOS:
+- 'TOTAL' | 'AAAA' (ano) | 'AAAA-MM' (mês)
+
+PERSISTÊNCIA:
+- data/03_gold/_rankings/totais.csv
+- data/03_gold/_rankings/rankings.csv
+- data/03_gold/_rankings/metadata.json (linhas do fato já aplicadas e sua
+  impressão digital: fato reescrito reconstrói o store)
+
+GROUNDING SOURCE:
+- Financeiro.SemanticModel (medidas RANKX ... DENSE)
+- _extract_data.py (rankings por país e produto)
+- gold_bitmap_index.py (impressao_linhas)
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from gold_bitmap_index import impressao_linhas
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+DIRETORIO_GOLD = "data/03_gold"
+DIRETORIO_RANKINGS = "data/03_gold/_rankings"
+
+# Dimensão → (arquivo da dimensão, FK no fato, coluna de nome)
+DIMENSOES_RANKING = {
+    'pais': ('dim_geografia', 'geografia_sk', 'pais'),
+    'produto': ('dim_produto', 'produto_sk', 'nome_produto'),
+    'segmento': ('dim_segmento', 'segmento_sk', 'nome_segmento')
+}
+
+METRICAS_RANKING = ['receita_liquida', 'lucro', 'unidades_vendidas']
+
+PERIODO_TOTAL = 'TOTAL'
+
+# Colunas que alteram totais e rankings (impressão digital das linhas aplicadas)
+COLUNAS_IMPRESSAO = [fk for _, fk, _ in DIMENSOES_RANKING.values()] + ['tempo_sk'] + METRICAS_RANKING
+
+# ========================================
+# MÓDULO 1: STORE DE RANKINGS
+# ========================================
+
+class GoldRankingStore:
+    """
+    Rankings densos pré-calculados e mantidos por deltas do fato.
+
+    Examples
+    --------
+    >>> store = GoldRankingStore.carregar() or GoldRankingStore()
+    >>> store.sincronizar(fato, dim_tempo)
+    >>> store.top_n('pais', 'receita_liquida', n=3)
+    """
+
+    COLUNAS_CHAVE = ['dimensao', 'periodo', 'membro_sk']
+
+    def __init__(self):
+        self.totais = pd.DataFrame(columns=self.COLUNAS_CHAVE + METRICAS_RANKING)
+        self.rankings = pd.DataFrame(columns=['dimensao', 'periodo', 'metrica', 'membro_sk', 'valor', 'rank'])
+        self.linhas_aplicadas = 0
+        self.impressao = 0
+
+    # ----------------------------------------
+    # Manutenção incremental
+    # ----------------------------------------
+
+    @staticmethod
+    def _agregar_delta(fato_delta, dim_tempo):
+        """Totais do delta por (dimensão, período, membro)."""
+        calendario = dim_tempo.set_index('tempo_sk')[['ano', 'mes']]
+        ano = fato_delta['tempo_sk'].map(calendario['ano'])
+        mes = fato_delta['tempo_sk'].map(calendario['mes'])
+
+        periodos = {
+            'total': pd.Series(PERIODO_TOTAL, index=fato_delta.index),
+            'ano': ano.astype('Int64').astype(str),
+            'mes': ano.astype('Int64').astype(str) + '-' + mes.astype('Int64').astype(str).str.zfill(2)
+        }
+
+        partes = []
+        for dimensao, (_, fk, _) in DIMENSOES_RANKING.items():
+            for periodo in periodos.values():
+                agregado = (fato_delta[METRICAS_RANKING]
+                            .groupby([periodo.rename('periodo'), fato_delta[fk].rename('membro_sk')])
+                            .sum()
+                            .reset_index())
+                agregado.insert(0, 'dimensao', dimensao)
+                partes.append(agregado)
+
+        return pd.concat(partes, ignore_index=True)
+
+    def aplicar_delta(self, fato_delta, dim_tempo):
+        """
+        Soma um delta do fato nos totais e re-ranqueia os grupos afetados.
+
+        Parameters
+        ----------
+        fato_delta : pd.DataFrame
+            Linhas novas de fato_financeiro
+        dim_tempo : pd.DataFrame
+            dim_tempo (tempo_sk, ano, mes)
+
+        Returns
+        -------
+        int
+            Grupos (dimensão, período) re-ranqueados
+        """
+
+        if len(fato_delta) == 0:
+            return 0
+
+        delta = self._agregar_delta(fato_delta, dim_tempo).dropna(subset=['membro_sk'])
+        delta['membro_sk'] = delta['membro_sk'].astype(np.int64)
+
+        totais = (pd.concat([self.totais, delta], ignore_index=True)
+                  .groupby(self.COLUNAS_CHAVE, sort=False)[METRICAS_RANKING]
+                  .sum()
+                  .reset_index())
+        self.totais = totais
+
+        # Re-ranquear apenas grupos tocados pelo delta
+        afetados = delta[['dimensao', 'periodo']].drop_duplicates()
+        chave_afetados = pd.MultiIndex.from_frame(afetados)
+        mascara_totais = pd.MultiIndex.from_frame(totais[['dimensao', 'periodo']]).isin(chave_afetados)
+
+        novos = totais[mascara_totais].melt(
+            id_vars=self.COLUNAS_CHAVE, value_vars=METRICAS_RANKING,
+            var_name='metrica', value_name='valor'
+        )
+        novos['rank'] = (novos.groupby(['dimensao', 'periodo', 'metrica'])['valor']
+                         .rank(method='dense', ascending=False)
+                         .astype(np.int64))
+
+        if len(self.rankings):
+            mascara_rank = pd.MultiIndex.from_frame(self.rankings[['dimensao', 'periodo']]).isin(chave_afetados)
+            self.rankings = pd.concat([self.rankings[~mascara_rank], novos], ignore_index=True)
+        else:
+            self.rankings = novos[self.rankings.columns]
+
+        self.impressao = (self.impressao + impressao_linhas(fato_delta, COLUNAS_IMPRESSAO, self.linhas_aplicadas)) % 2 ** 64
+        self.linhas_aplicadas += len(fato_delta)
+        return len(afetados)
+
+    def sincronizar(self, fato, dim_tempo):
+        """
+        Aplica apenas a cauda do fato ainda não vista pelo store.
+
+        Se o fato encolheu ou as linhas já aplicadas mudaram (arquivo
+        reescrito, detectado pela impressão digital), o store é reconstruído.
+
+        Returns
+        -------
+        int
+            Linhas do fato aplicadas nesta chamada
+        """
+        if (len(fato) < self.linhas_aplicadas
+                or impressao_linhas(fato.iloc[:self.linhas_aplicadas], COLUNAS_IMPRESSAO) != self.impressao):
+            self.__init__()
+        delta = fato.iloc[self.linhas_aplicadas:]
+        self.aplicar_delta(delta, dim_tempo)
+        return len(delta)
+
+    # ----------------------------------------
+    # Consultas
+    # ----------------------------------------
+
+    def _filtrar(self, dimensao, metrica, periodo):
+        ranking = self.rankings
+        return ranking[(ranking['dimensao'] == dimensao)
+                       & (ranking['periodo'] == str(periodo))
+                       & (ranking['metrica'] == metrica)]
+
+    def top_n(self, dimensao, metrica, n=5, periodo=PERIODO_TOTAL):
+        """Top-N membros (membro_sk, valor, rank) por métrica e período."""
+        resultado = self._filtrar(dimensao, metrica, periodo).sort_values(['rank', 'membro_sk'])
+        if n is not None:
+            resultado = resultado[resultado['rank'] <= n]
+        return resultado[['membro_sk', 'valor', 'rank']].reset_index(drop=True)
+
+    def rank(self, dimensao, metrica, membro_sk, periodo=PERIODO_TOTAL):
+        """Rank denso de um membro (None se ausente no período)."""
+        resultado = self._filtrar(dimensao, metrica, periodo)
+        resultado = resultado[resultado['membro_sk'] == membro_sk]
+        return int(resultado['rank'].iloc[0]) if len(resultado) else None
+
+    def tabela_ranking(self, dimensao, metrica, dim, periodo=PERIODO_TOTAL):
+        """
+        Tabela pronta para visual: nome do membro + todas as métricas,
+        ordenada pelo rank da métrica informada.
+
+        Parameters
+        ----------
+        dim : pd.DataFrame
+            Tabela da dimensão (para resolver o nome do membro)
+        """
+        _, fk, coluna_nome = DIMENSOES_RANKING[dimensao]
+        totais = self.totais[(self.totais['dimensao'] == dimensao)
+                             & (self.totais['periodo'] == str(periodo))]
+        ordem = self._filtrar(dimensao, metrica, periodo)[['membro_sk', 'rank']]
+
+        tabela = (totais.merge(ordem, on='membro_sk')
+                  .merge(dim[[fk, coluna_nome]], left_on='membro_sk', right_on=fk)
+                  .sort_values(['rank', 'membro_sk']))
+        return tabela[[coluna_nome] + METRICAS_RANKING + ['rank']].reset_index(drop=True)
+
+    # ----------------------------------------
+    # Persistência
+    # ----------------------------------------
+
+    def salvar(self, diretorio=DIRETORIO_RANKINGS):
+        Path(diretorio).mkdir(parents=True, exist_ok=True)
+        self.totais.to_csv(f"{diretorio}/totais.csv", index=False, encoding='utf-8')
+        self.rankings.to_csv(f"{diretorio}/rankings.csv", index=False, encoding='utf-8')
+        with open(f"{diretorio}/metadata.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'linhas_aplicadas': self.linhas_aplicadas,
+                'impressao': str(self.impressao),
+                'data_atualizacao': datetime.now().isoformat()
+            }, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_RANKINGS):
+        """Carrega store persistido (ou None se não existir)."""
+        caminho_meta = Path(diretorio) / 'metadata.json'
+        if not caminho_meta.exists():
+            return None
+
+        store = cls()
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        store.linhas_aplicadas = meta['linhas_aplicadas']
+        # Store salvo sem impressão: sincronizar() reconstrói
+        store.impressao = int(meta['impressao']) if 'impressao' in meta else None
+        tipos = {'periodo': str}
+        store.totais = pd.read_csv(f"{diretorio}/totais.csv", dtype=tipos)
+        store.rankings = pd.read_csv(f"{diretorio}/rankings.csv", dtype=tipos)
+        return store
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Sincroniza o ranking store com o fato e exibe os rankings principais.
+
+    USO:
+        python gold_ranking_store.py
+
+    OUTPUT:
+        - data/03_gold/_rankings/*.csv
+    """
+
+    print("=" * 80)
+    print("GOLD RANKING STORE - Top-N Incremental")
+    print("=" * 80 + "\n")
+
+    fato = pd.read_csv(f"{DIRETORIO_GOLD}/fato_financeiro.csv")
+    dim_tempo = pd.read_csv(f"{DIRETORIO_GOLD}/dim_tempo.csv")
+    dim_geografia = pd.read_csv(f"{DIRETORIO_GOLD}/dim_geografia.csv")
+
+    store = GoldRankingStore.carregar() or GoldRankingStore()
+    aplicadas = store.sincronizar(fato, dim_tempo)
+    store.salvar()
+
+    print(f"✅ {aplicadas} linhas do fato aplicadas ({store.linhas_aplicadas} no total)")
+    print(f"   Linhas no store de rankings: {len(store.rankings)}\n")
+
+    for metrica in ('receita_liquida', 'lucro'):
+        print(f"🏆 Ranking por país ({metrica}):")
+        print(store.tabela_ranking('pais', metrica, dim_geografia).to_string(index=False))
+        print()
+
+    sys.exit(0)
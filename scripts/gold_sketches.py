@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SKETCHES STREAMING - CONTAGENS DISTINTAS E QUANTIS (CAMADA GOLD)
+Analytics Architect - Financial Data Fortress 2026
+
+Autor: Analytics Architect
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Responder perguntas como "mediana de lucro por transação por país" ou
+"produtos distintos vendidos por mês" sem sort/groupby completo do fato.
+Cada partição Gold (mês AAAAMM, derivado de tempo_sk) mantém sketches
+mergeáveis:
+- HyperLogLog para contagens distintas das FKs
+- KLL para quantis de lucro, receita_liquida e unidades_vendidas
+  (global e por dimensão)
+Respostas aproximadas vêm do merge dos sketches das partições, sem
+reler linhas do fato.
+
+PERSISTÊNCIA:
+- data/03_gold/_sketches/particao_<AAAAMM>.json (sketches, linhas aplicadas
+  e impressão digital dessas linhas: partição reescrita é reconstruída)
+
+GROUNDING SOURCE:
+- ARQUITETURA_CAMADA_OURO.md (Seção: Star Schema / Partition Pruning)
+- gold_bitmap_index.py (mesma definição de partição mensal, impressao_linhas)
+"""
+
+import pandas as pd
+import numpy as np
+import base64
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from gold_bitmap_index import impressao_linhas
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+DIRETORIO_GOLD = "data/03_gold"
+DIRETORIO_SKETCHES = "data/03_gold/_sketches"
+
+# Colunas com contagem distinta (HyperLogLog)
+COLUNAS_DISTINTAS = ['produto_sk', 'geografia_sk', 'segmento_sk', 'tempo_sk']
+
+# Métricas com quantis (KLL) e dimensões de agrupamento
+METRICAS_QUANTIS = ['lucro', 'receita_liquida', 'unidades_vendidas']
+DIMENSOES_QUANTIS = ['geografia_sk', 'produto_sk', 'segmento_sk']
+
+# Colunas que alteram os sketches (impressão digital das linhas aplicadas)
+COLUNAS_IMPRESSAO = list(dict.fromkeys(COLUNAS_DISTINTAS + DIMENSOES_QUANTIS + METRICAS_QUANTIS))
+
+# Precisão do HLL: 2^12 registradores → erro padrão ≈ 1.04/√4096 ≈ 1.6%
+HLL_PRECISAO = 12
+
+# Capacidade do compactador de topo do KLL (erro de rank ≈ 1.65/k)
+KLL_K = 200
+
+# ========================================
+# MÓDULO 1: HYPERLOGLOG
+# ========================================
+
+class HyperLogLog:
+    """
+    HyperLogLog vetorizado (hash 64 bits via pandas).
+
+    Merge = máximo elemento a elemento dos registradores.
+    """
+
+    def __init__(self, precisao=HLL_PRECISAO, registradores=None):
+        self.precisao = precisao
+        self.m = 1 << precisao
+        self.registradores = (registradores if registradores is not None
+                              else np.zeros(self.m, dtype=np.uint8))
+
+    def atualizar(self, valores):
+        """Adiciona um lote de valores (qualquer dtype hashável pelo pandas)."""
+        valores = pd.Series(valores).dropna()
+        if len(valores) == 0:
+            return
+
+        hashes = pd.util.hash_pandas_object(valores, index=False).to_numpy(dtype=np.uint64)
+        bits_resto = 64 - self.precisao
+
+        indices = (hashes >> np.uint64(bits_resto)).astype(np.int64)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+
+        # Posição do primeiro bit 1 (resto < 2^53 → conversão float exata)
+        _, comprimento = np.frexp(resto.astype(np.float64))
+        rank = (bits_resto - comprimento + 1).astype(np.uint8)
+
+        np.maximum.at(self.registradores, indices, rank)
+
+    def merge(self, outro):
+        """Une outro HLL (mesma precisão) a este."""
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+        return self
+
+    def estimar(self):
+        """Cardinalidade estimada (com correção para faixa pequena)."""
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimativa = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registradores.astype(np.float64)))
+
+        zeros = int(np.count_nonzero(self.registradores == 0))
+        if estimativa <= 2.5 * self.m and zeros > 0:
+            estimativa = self.m * np.log(self.m / zeros)  # Linear counting
+
+        return float(estimativa)
+
+    def para_dict(self):
+        return {
+            'precisao': self.precisao,
+            'registradores': base64.b64encode(self.registradores.tobytes()).decode('ascii')
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        registradores = np.frombuffer(base64.b64decode(dados['registradores']), dtype=np.uint8).copy()
+        return cls(dados['precisao'], registradores)
+
+# ========================================
+# MÓDULO 2: KLL (QUANTIS)
+# ========================================
+
+class KllSketch:
+    """
+    Sketch KLL de quantis com compactadores por nível.
+
+    Um item no nível h representa 2^h itens originais. Ao exceder a
+    capacidade, o nível é ordenado e metade dos itens (posições pares ou
+    ímpares, alternadamente) sobe para o nível seguinte.
+    """
+
+    def __init__(self, k=KLL_K, niveis=None, n=0, semente=0):
+        self.k = k
+        self.niveis = niveis if niveis is not None else [np.empty(0, dtype=np.float64)]
+        self.n = n
+        self._paridade = semente
+
+    def _capacidade(self, nivel):
+        altura = len(self.niveis)
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (altura - nivel - 1))))
+
+    def _compactar(self):
+        while True:
+            for nivel, itens in enumerate(self.niveis):
+                if len(itens) > self._capacidade(nivel):
+                    break
+            else:
+                return
+
+            itens = np.sort(itens)
+            sobra = itens[-1:] if len(itens) % 2 else itens[:0]
+            pares = itens[:len(itens) - len(sobra)]
+
+            self._paridade ^= 1
+            promovidos = pares[self._paridade::2]
+
+            self.niveis[nivel] = sobra
+            if nivel + 1 == len(self.niveis):
+                self.niveis.append(np.empty(0, dtype=np.float64))
+            self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+
+    def atualizar(self, valores):
+        """Adiciona um lote de valores numéricos."""
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self.n += len(valores)
+        self._compactar()
+
+    def merge(self, outro):
+        """Une outro sketch KLL a este."""
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0, dtype=np.float64))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self._compactar()
+        return self
+
+    def quantil(self, q):
+        """Quantil aproximado q ∈ [0, 1] (None se vazio)."""
+        if self.n == 0:
+            return None
+
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(v), 2 ** h, dtype=np.float64) for h, v in enumerate(self.niveis)])
+        ordem = np.argsort(itens, kind='stable')
+        acumulado = np.cumsum(pesos[ordem])
+
+        alvo = q * acumulado[-1]
+        posicao = min(int(np.searchsorted(acumulado, alvo, side='left')), len(itens) - 1)
+        return float(itens[ordem][posicao])
+
+    def para_dict(self):
+        return {'k': self.k, 'n': self.n, 'niveis': [v.tolist() for v in self.niveis]}
+
+    @classmethod
+    def de_dict(cls, dados):
+        niveis = [np.asarray(v, dtype=np.float64) for v in dados['niveis']]
+        return cls(dados['k'], niveis, dados['n'])
+
+# ========================================
+# MÓDULO 3: STORE DE SKETCHES POR PARTIÇÃO
+# ========================================
+
+class GoldSketchStore:
+    """
+    Sketches mantidos por partição mensal do fato.
+
+    Estrutura por partição:
+    - linhas → linhas da partição já aplicadas (na ordem do fato)
+    - impressao → impressão digital dessas linhas (impressao_linhas)
+    - hll[coluna] → HyperLogLog
+    - kll['metrica|dimensao|valor'] → KllSketch ('metrica|*|*' = global)
+    """
+
+    def __init__(self, diretorio=DIRETORIO_SKETCHES):
+        self.diretorio = Path(diretorio)
+        self.particoes = {}
+        self._alteradas = set()
+
+    @staticmethod
+    def _chave_kll(metrica, dimensao=None, valor=None):
+        return f"{metrica}|{dimensao or '*'}|{'*' if valor is None else valor}"
+
+    @staticmethod
+    def _particoes_do_fato(fato, dim_tempo):
+        mes_por_tempo = pd.Series(
+            (dim_tempo['ano'] * 100 + dim_tempo['mes']).to_numpy(),
+            index=dim_tempo['tempo_sk'].to_numpy()
+        )
+        return fato['tempo_sk'].map(mes_por_tempo)
+
+    def _particao(self, chave):
+        if chave not in self.particoes:
+            caminho = self.diretorio / f"particao_{chave}.json"
+            if caminho.exists():
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+                self.particoes[chave] = {
+                    'linhas': dados['linhas'],
+                    # Partição salva sem impressão: sincronizar() reconstrói
+                    'impressao': int(dados['impressao']) if 'impressao' in dados else None,
+                    'hll': {c: HyperLogLog.de_dict(v) for c, v in dados['hll'].items()},
+                    'kll': {c: KllSketch.de_dict(v) for c, v in dados['kll'].items()}
+                }
+            else:
+                self.particoes[chave] = self._particao_vazia()
+        return self.particoes[chave]
+
+    @staticmethod
+    def _particao_vazia():
+        return {'linhas': 0, 'impressao': 0, 'hll': {}, 'kll': {}}
+
+    def atualizar(self, fato_delta, dim_tempo):
+        """
+        Atualiza os sketches das partições tocadas por um delta do fato.
+
+        Parameters
+        ----------
+        fato_delta : pd.DataFrame
+            Linhas novas de fato_financeiro
+        dim_tempo : pd.DataFrame
+            dim_tempo (tempo_sk, ano, mes)
+
+        Returns
+        -------
+        list
+            Partições atualizadas
+        """
+
+        fato_delta = fato_delta.assign(_particao=self._particoes_do_fato(fato_delta, dim_tempo))
+        atualizadas = []
+
+        for chave, grupo in fato_delta.groupby('_particao', sort=True):
+            chave = int(chave)
+            particao = self._particao(chave)
+            particao['impressao'] = (
+                (particao['impressao'] or 0) + impressao_linhas(grupo, COLUNAS_IMPRESSAO, particao['linhas'])
+            ) % 2 ** 64
+            particao['linhas'] += len(grupo)
+
+            for coluna in COLUNAS_DISTINTAS:
+                if coluna in grupo.columns:
+                    particao['hll'].setdefault(coluna, HyperLogLog()).atualizar(grupo[coluna])
+
+            for metrica in METRICAS_QUANTIS:
+                if metrica not in grupo.columns:
+                    continue
+                particao['kll'].setdefault(self._chave_kll(metrica), KllSketch()).atualizar(grupo[metrica])
+
+                for dimensao in DIMENSOES_QUANTIS:
+                    if dimensao not in grupo.columns:
+                        continue
+                    for valor, subgrupo in grupo.groupby(dimensao)[metrica]:
+                        chave_kll = self._chave_kll(metrica, dimensao, int(valor))
+                        particao['kll'].setdefault(chave_kll, KllSketch()).atualizar(subgrupo)
+
+            self._alteradas.add(chave)
+            atualizadas.append(chave)
+
+        return atualizadas
+
+    def sincronizar(self, fato, dim_tempo):
+        """
+        Aplica apenas as linhas do fato ainda não vistas, por partição.
+
+        'linhas' (persistido por partição) é o watermark: as primeiras
+        'linhas' linhas da partição, na ordem do fato, já estão nos
+        sketches. Partição com menos linhas que isso, ou cujas primeiras
+        'linhas' linhas não batem com a impressão digital salva (fato
+        reescrito), é reconstruída; partições que sumiram do fato são
+        removidas.
+
+        Returns
+        -------
+        int
+            Linhas do fato aplicadas nesta chamada
+        """
+        particoes = self._particoes_do_fato(fato, dim_tempo)
+        ordem_na_particao = fato.groupby(particoes.to_numpy(), dropna=False).cumcount().to_numpy()
+
+        aplicadas = {}
+        for chave, grupo in fato.groupby(particoes.to_numpy(), sort=False):
+            chave = int(chave)
+            particao = self._particao(chave)
+            if (len(grupo) < particao['linhas']
+                    or impressao_linhas(grupo.iloc[:particao['linhas']], COLUNAS_IMPRESSAO) != particao['impressao']):
+                self.particoes[chave] = self._particao_vazia()
+                self._alteradas.add(chave)
+            aplicadas[chave] = self.particoes[chave]['linhas']
+
+        for chave in set(self.listar_particoes()) - set(aplicadas):
+            self.particoes.pop(chave, None)
+            self._alteradas.discard(chave)
+            (self.diretorio / f"particao_{chave}.json").unlink(missing_ok=True)
+
+        ja_aplicadas = particoes.map(aplicadas).fillna(0).to_numpy()
+        delta = fato[ordem_na_particao >= ja_aplicadas]
+        self.atualizar(delta, dim_tempo)
+        return len(delta)
+
+    def salvar(self):
+        """Persiste apenas as partições alteradas."""
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        for chave in sorted(self._alteradas):
+            particao = self.particoes[chave]
+            with open(self.diretorio / f"particao_{chave}.json", 'w', encoding='utf-8') as f:
+                json.dump({
+                    'particao': chave,
+                    'linhas': particao['linhas'],
+                    'impressao': str(particao['impressao']),
+                    'data_atualizacao': datetime.now().isoformat(),
+                    'hll': {c: s.para_dict() for c, s in particao['hll'].items()},
+                    'kll': {c: s.para_dict() for c, s in particao['kll'].items()}
+                }, f, ensure_ascii=False)
+        salvas = len(self._alteradas)
+        self._alteradas.clear()
+        return salvas
+
+    def listar_particoes(self):
+        """Partições disponíveis (em disco ou em memória)."""
+        em_disco = {int(p.stem.split('_')[1]) for p in self.diretorio.glob('particao_*.json')}
+        return sorted(em_disco | set(self.particoes))
+
+    # ----------------------------------------
+    # Consultas aproximadas (merge de partições)
+    # ----------------------------------------
+
+    def contagem_distinta(self, coluna, particoes=None):
+        """Contagem distinta aproximada de uma coluna nas partições informadas."""
+        resultado = HyperLogLog()
+        for chave in particoes or self.listar_particoes():
+            sketch = self._particao(chave)['hll'].get(coluna)
+            if sketch is not None:
+                resultado.merge(sketch)
+        return resultado.estimar()
+
+    def quantil(self, metrica, q, dimensao=None, valor=None, particoes=None):
+        """Quantil aproximado de uma métrica (global ou de um membro da dimensão)."""
+        chave_kll = self._chave_kll(metrica, dimensao, valor)
+        resultado = KllSketch()
+        for chave in particoes or self.listar_particoes():
+            sketch = self._particao(chave)['kll'].get(chave_kll)
+            if sketch is not None:
+                resultado.merge(sketch)
+        return resultado.quantil(q)
+
+    def quantis_por(self, metrica, q, dimensao, particoes=None):
+        """Quantil aproximado por membro da dimensão ({valor: quantil})."""
+        membros = set()
+        prefixo = f"{metrica}|{dimensao}|"
+        for chave in particoes or self.listar_particoes():
+            membros.update(int(c[len(prefixo):]) for c in self._particao(chave)['kll'] if c.startswith(prefixo))
+        return {m: self.quantil(metrica, q, dimensao, m, particoes) for m in sorted(membros)}
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Constrói os sketches por partição e responde consultas de exemplo.
+
+    USO:
+        python gold_sketches.py
+
+    OUTPUT:
+        - data/03_gold/_sketches/particao_*.json
+    """
+
+    print("=" * 80)
+    print("GOLD SKETCHES - HyperLogLog + KLL por Partição Mensal")
+    print("=" * 80 + "\n")
+
+    fato = pd.read_csv(f"{DIRETORIO_GOLD}/fato_financeiro.csv")
+    dim_tempo = pd.read_csv(f"{DIRETORIO_GOLD}/dim_tempo.csv")
+    dim_geografia = pd.read_csv(f"{DIRETORIO_GOLD}/dim_geografia.csv")
+
+    store = GoldSketchStore()
+    aplicadas = store.sincronizar(fato, dim_tempo)
+    salvas = store.salvar()
+    print(f"✅ {aplicadas} linhas novas do fato aplicadas; {salvas} partições com sketches atualizados\n")
+
+    print("📊 Mediana aproximada de lucro por transação, por país:")
+    nomes = dict(zip(dim_geografia['geografia_sk'], dim_geografia['pais']))
+    for sk, mediana in store.quantis_por('lucro', 0.5, 'geografia_sk').items():
+        print(f"   {nomes.get(sk, sk):30s} {mediana:>14,.2f}")
+
+    print("\n📦 Produtos distintos vendidos por mês (aproximado):")
+    for particao in store.listar_particoes():
+        print(f"   {particao}: {store.contagem_distinta('produto_sk', [particao]):.0f}")
+    print()
+
+    sys.exit(0)
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+METADATA STORE CONCORRENTE - WATERMARKS, BASELINE E EXECUÇÕES
+Data Reliability Engineer (SRE) - Financial Data Fortress 2026
+
+Autor: Data Reliability Engineer (SRE)
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+O monitor abria sqlite3.connect com journal padrão (rollback) e cada
+componente criava suas tabelas e fazia commit por comando. Com vários
+pipelines (bronze_to_silver, silver_to_gold, ...) gravando no mesmo banco
+de metadados, leitores bloqueavam escritores e transações concorrentes
+falhavam com "database is locked". Este módulo centraliza o acesso:
+- WAL: leitores não bloqueiam o escritor (e vice-versa)
+- busy_timeout: escritores esperam o lock em vez de falhar na hora
+- Transações BEGIN IMMEDIATE: o lock de escrita é obtido no início,
+  sem deadlock de upgrade leitura → escrita; cada execução grava tudo em
+  uma transação (lote) em vez de um commit por comando
+- Trava por pipeline (lease com expiração em travas_pipeline): uma única
+  execução ativa por pipeline; pipelines diferentes rodam em paralelo
+
+TABELAS:
+- watermark, checkpoint_arquivo, indice_hash_linhas (carga incremental)
+- baseline_sazonal (estatísticas acumuladas do detector de anomalias)
+- execucoes_pipeline (histórico de execuções / commit exactly-once)
+- travas_pipeline (leases por pipeline)
+
+GROUNDING SOURCE:
+- data_reliability_monitor.py (IncrementalLoader, AnomalyDetector, ExecucaoTransacional)
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+CAMINHO_METADATA_DB = "metadata/incremental_load.db"
+
+# Espera máxima pelo lock de escrita antes de "database is locked"
+TIMEOUT_OCUPADO_S = 30.0
+
+# Lease da trava por pipeline: expirada, outra execução pode assumir
+# (o dono renova entre etapas com renovar_trava)
+TTL_TRAVA_S = 600
+
+# ========================================
+# MÓDULO 1: CONEXÃO E TRANSAÇÕES
+# ========================================
+
+def conectar(db_path, timeout_s=TIMEOUT_OCUPADO_S):
+    """
+    Conexão SQLite em modo WAL com busy timeout.
+
+    O timeout do sqlite3.connect é o busy handler: escritores concorrentes
+    esperam o lock por até timeout_s segundos.
+    """
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=timeout_s)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Em WAL, NORMAL só sincroniza no checkpoint (transações seguem atômicas)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+@contextmanager
+def transacao(conn):
+    """
+    Transação de escrita (BEGIN IMMEDIATE ... COMMIT, ROLLBACK em erro).
+
+    Dentro de uma transação já aberta, apenas reaproveita a transação: o
+    commit fica com o bloco mais externo.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+# ========================================
+# MÓDULO 2: STORE DE METADADOS
+# ========================================
+
+class MetadataStore:
+    """
+    Banco de metadados compartilhado pelos pipelines.
+
+    Examples
+    --------
+    >>> store = MetadataStore()
+    >>> if store.adquirir_trava('silver_to_gold', 'execucao_1'):
+    ...     with store.transacao():
+    ...         store.conn.execute("UPDATE watermark SET ...")
+    ...         store.liberar_trava('silver_to_gold', 'execucao_1')
+    """
+
+    def __init__(self, db_path=CAMINHO_METADATA_DB, timeout_s=TIMEOUT_OCUPADO_S):
+        self.db_path = db_path
+        self.timeout_s = timeout_s
+        self.conn = None
+        self._inicializar_db()
+
+    def _inicializar_db(self):
+        """Cria as tabelas de metadados se não existirem."""
+        self.conn = conectar(self.db_path, self.timeout_s)
+
+        with self.transacao():
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS watermark (
+                    pipeline_nome TEXT PRIMARY KEY,
+                    ultimo_timestamp_processado TEXT,
+                    ultimo_hash TEXT,
+                    registros_processados INTEGER,
+                    data_atualizacao TEXT
+                )
+            """)
+
+            # Checkpoint de leitura (offset no arquivo)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoint_arquivo (
+                    pipeline_nome TEXT PRIMARY KEY,
+                    caminho TEXT,
+                    inode INTEGER,
+                    mtime_ns INTEGER,
+                    tamanho_bytes INTEGER,
+                    offset_bytes INTEGER,
+                    linhas INTEGER,
+                    hash_cabecalho TEXT,
+                    hash_ancora TEXT,
+                    data_atualizacao TEXT
+                )
+            """)
+
+            # Índice de hashes de linha (arrays uint64 em BLOB; valores: float64
+            # da métrica gravada, para retirar a versão antiga do baseline)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS indice_hash_linhas (
+                    pipeline_nome TEXT PRIMARY KEY,
+                    linhas INTEGER,
+                    chaves BLOB,
+                    conteudos BLOB,
+                    valores BLOB,
+                    data_atualizacao TEXT
+                )
+            """)
+            colunas = {linha[1] for linha in self.conn.execute("PRAGMA table_info(indice_hash_linhas)")}
+            if 'valores' not in colunas:
+                self.conn.execute("ALTER TABLE indice_hash_linhas ADD COLUMN valores BLOB")
+
+            # num_transacoes: linhas do grupo; contagem/media/m2: lucros não nulos
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS baseline_sazonal (
+                    pipeline_nome TEXT,
+                    pais TEXT,
+                    trimestre INTEGER,
+                    num_transacoes INTEGER,
+                    contagem INTEGER,
+                    media REAL,
+                    m2 REAL,
+                    data_atualizacao TEXT,
+                    PRIMARY KEY (pipeline_nome, pais, trimestre)
+                )
+            """)
+
+            # Histórico de execuções (protocolo de commit exactly-once)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS execucoes_pipeline (
+                    execucao_id TEXT PRIMARY KEY,
+                    pipeline_nome TEXT,
+                    status TEXT,
+                    timestamp TEXT,
+                    arquivos TEXT,
+                    registros INTEGER,
+                    data_inicio TEXT,
+                    data_fim TEXT
+                )
+            """)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_execucoes_pipeline_status
+                ON execucoes_pipeline (pipeline_nome, status)
+            """)
+
+            # Lease por pipeline (expira_em em segundos desde epoch)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS travas_pipeline (
+                    pipeline_nome TEXT PRIMARY KEY,
+                    dono TEXT,
+                    expira_em REAL,
+                    data_aquisicao TEXT
+                )
+            """)
+
+    def transacao(self):
+        """Transação de escrita na conexão do store (ver transacao())."""
+        return transacao(self.conn)
+
+    def adquirir_trava(self, pipeline_nome, dono, ttl_s=TTL_TRAVA_S):
+        """
+        Adquire (ou renova) a trava do pipeline.
+
+        Parameters
+        ----------
+        pipeline_nome : str
+            Pipeline a travar
+        dono : str
+            Identificador da execução (ex.: execucao_id)
+        ttl_s : float
+            Validade do lease; renovar chamando de novo com o mesmo dono
+
+        Returns
+        -------
+        bool
+            True se `dono` detém a trava; False se outra execução a detém
+        """
+        agora = time.time()
+        with self.transacao():
+            cursor = self.conn.execute("""
+                INSERT INTO travas_pipeline (pipeline_nome, dono, expira_em, data_aquisicao)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (pipeline_nome) DO UPDATE SET
+                    dono = excluded.dono,
+                    expira_em = excluded.expira_em,
+                    data_aquisicao = excluded.data_aquisicao
+                WHERE travas_pipeline.dono = excluded.dono OR travas_pipeline.expira_em < ?
+            """, (pipeline_nome, dono, agora + ttl_s, datetime.now().isoformat(), agora))
+            return cursor.rowcount == 1
+
+    def renovar_trava(self, pipeline_nome, dono, ttl_s=TTL_TRAVA_S):
+        """
+        Renova o lease se a trava ainda pertencer a `dono`.
+
+        Dentro de uma transação aberta, também confirma a posse até o
+        commit: com o lock de escrita, nenhuma outra execução assume a trava.
+
+        Returns
+        -------
+        bool
+            False se a trava foi liberada ou assumida por outra execução
+        """
+        with self.transacao():
+            cursor = self.conn.execute(
+                "UPDATE travas_pipeline SET expira_em = ? WHERE pipeline_nome = ? AND dono = ?",
+                (time.time() + ttl_s, pipeline_nome, dono)
+            )
+            return cursor.rowcount == 1
+
+    def liberar_trava(self, pipeline_nome, dono):
+        """
+        Libera a trava se ainda pertencer a `dono` (pode ir na transação corrente).
+
+        Returns
+        -------
+        bool
+            False se a trava já não pertencia a `dono`
+        """
+        with self.transacao():
+            cursor = self.conn.execute(
+                "DELETE FROM travas_pipeline WHERE pipeline_nome = ? AND dono = ?",
+                (pipeline_nome, dono)
+            )
+            return cursor.rowcount == 1
+
+    def fechar(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+# ========================================
+# MÓDULO 3: TESTE DE ESTRESSE
+# ========================================
+
+def _escritor(db_path, indice, pipelines, iteracoes, linhas_baseline):
+    """
+    Escritor do teste de estresse (executa em processo separado).
+
+    A cada iteração: adquire a trava do pipeline, lê o contador do
+    watermark FORA de transação e grava contador + 1, baseline e execução
+    em uma única transação que também libera a trava. Sem exclusão mútua
+    real, escritores do mesmo pipeline perderiam incrementos. Se a
+    transação falhar (lock de escrita esgotado), a trava é liberada no
+    finally: um erro não deixa o pipeline travado até o lease expirar.
+
+    Returns
+    -------
+    tuple
+        (confirmadas, travas_negadas, erros, latencias_s)
+    """
+    store = MetadataStore(db_path)
+    pipeline_nome = f"pipeline_{indice % pipelines}"
+    confirmadas = negadas = erros = 0
+    latencias = []
+
+    for iteracao in range(iteracoes):
+        dono = f"escritor_{indice}_{iteracao}_{uuid.uuid4().hex[:8]}"
+        inicio = time.perf_counter()
+        com_trava = False
+        try:
+            if not store.adquirir_trava(pipeline_nome, dono, ttl_s=TIMEOUT_OCUPADO_S):
+                negadas += 1
+                time.sleep(0.001)
+                continue
+            com_trava = True
+
+            linha = store.conn.execute(
+                "SELECT registros_processados FROM watermark WHERE pipeline_nome = ?",
+                (pipeline_nome,)
+            ).fetchone()
+            contador = linha[0] if linha else 0
+            time.sleep(0.0005)  # trabalho do lote entre leitura e commit
+
+            agora = datetime.now().isoformat()
+            with store.transacao():
+                store.conn.execute("""
+                    INSERT OR REPLACE INTO watermark
+                    (pipeline_nome, ultimo_timestamp_processado, ultimo_hash, registros_processados, data_atualizacao)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (pipeline_nome, agora, dono, contador + 1, agora))
+                store.conn.executemany("""
+                    INSERT OR REPLACE INTO baseline_sazonal
+                    (pipeline_nome, pais, trimestre, num_transacoes, contagem, media, m2, data_atualizacao)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (pipeline_nome, f"pais_{k}", k % 4 + 1, contador + 1, contador + 1, float(k), 0.0, agora)
+                    for k in range(linhas_baseline)
+                ])
+                store.conn.execute("""
+                    INSERT INTO execucoes_pipeline
+                    (execucao_id, pipeline_nome, status, timestamp, registros, data_inicio, data_fim)
+                    VALUES (?, ?, 'concluida', ?, 1, ?, ?)
+                """, (dono, pipeline_nome, agora, agora, agora))
+                store.liberar_trava(pipeline_nome, dono)
+            com_trava = False
+
+            confirmadas += 1
+            latencias.append(time.perf_counter() - inicio)
+        except sqlite3.OperationalError:
+            erros += 1
+        finally:
+            if com_trava:
+                # Transação desfeita: a trava ainda é deste escritor
+                try:
+                    store.liberar_trava(pipeline_nome, dono)
+                except sqlite3.OperationalError:
+                    pass  # expira com o lease (ttl_s)
+
+    store.fechar()
+    return confirmadas, negadas, erros, latencias
+
+
+def teste_estresse(db_path, escritores=8, iteracoes=200, linhas_baseline=25):
+    """
+    N escritores concorrentes (2 por pipeline) no mesmo banco de metadados.
+
+    Returns
+    -------
+    dict
+        Totais, vazão, latências e consistência (watermark == execuções confirmadas)
+    """
+    pipelines = max(1, escritores // 2)
+    MetadataStore(db_path).fechar()
+
+    inicio = time.perf_counter()
+    with Pool(escritores) as pool:
+        resultados = pool.starmap(_escritor, [
+            (db_path, indice, pipelines, iteracoes, linhas_baseline)
+            for indice in range(escritores)
+        ])
+    duracao = time.perf_counter() - inicio
+
+    confirmadas = sum(r[0] for r in resultados)
+    latencias = np.array([l for r in resultados for l in r[3]]) * 1000
+
+    store = MetadataStore(db_path)
+    contador_total = store.conn.execute("SELECT COALESCE(SUM(registros_processados), 0) FROM watermark").fetchone()[0]
+    execucoes = store.conn.execute("SELECT COUNT(*) FROM execucoes_pipeline").fetchone()[0]
+    travas_restantes = store.conn.execute("SELECT COUNT(*) FROM travas_pipeline").fetchone()[0]
+    store.fechar()
+
+    return {
+        'escritores': escritores,
+        'pipelines': pipelines,
+        'confirmadas': confirmadas,
+        'travas_negadas': sum(r[1] for r in resultados),
+        'erros': sum(r[2] for r in resultados),
+        'duracao_s': round(duracao, 3),
+        'transacoes_por_s': round(confirmadas / duracao, 1) if duracao > 0 else None,
+        'latencia_p50_ms': round(float(np.percentile(latencias, 50)), 2) if len(latencias) else None,
+        'latencia_p95_ms': round(float(np.percentile(latencias, 95)), 2) if len(latencias) else None,
+        'consistente': contador_total == confirmadas == execucoes and travas_restantes == 0
+    }
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Teste de estresse: N escritores concorrentes em um banco temporário.
+
+    USO:
+        python metadata_store.py [escritores] [iteracoes]
+
+    OUTPUT:
+        - Console (vazão, latências, travas negadas, erros, consistência)
+    """
+
+    escritores = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    iteracoes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 80)
+    print("METADATA STORE - Teste de Estresse (escritores concorrentes)")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        resultado = teste_estresse(str(Path(diretorio) / "stress_metadata.db"), escritores, iteracoes)
+
+    print(f"Escritores: {resultado['escritores']} | Pipelines: {resultado['pipelines']} | Iterações: {iteracoes}\n")
+    print(f"✅ Transações confirmadas: {resultado['confirmadas']:,} ({resultado['transacoes_por_s']:,} /s)")
+    print(f"⏸️ Travas negadas (pipeline ocupado): {resultado['travas_negadas']:,}")
+    print(f"⏱️ Latência p50: {resultado['latencia_p50_ms']} ms | p95: {resultado['latencia_p95_ms']} ms")
+    print(f"{'✅' if resultado['erros'] == 0 else '❌'} Erros de lock: {resultado['erros']}")
+    print(f"{'✅' if resultado['consistente'] else '❌'} Watermarks consistentes com as execuções confirmadas\n")
+
+    sys.exit(0 if resultado['erros'] == 0 and resultado['consistente'] else 1)
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COMPILADOR DE REGRAS DECLARATIVAS DE VALIDAÇÃO
+Senior Data Quality Engineer - Financial Data Fortress 2026
+
+Autor: Senior Data Quality Engineer
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING | RULE_INDIAN_NUM_SYSTEM
+
+OBJETIVO:
+Fonte única das regras de negócio que antes estavam duplicadas entre os
+regexes de validate_bronze_quality.py, os validadores do
+FinancialRecordContract e o rules.json. A seção "data_validation_rules" do
+rules.json declara cada regra uma única vez; este módulo compila cada regra
+em um predicado vetorizado sobre colunas inteiras (máscara NumPy de
+violações) e mede o tempo de execução por regra.
+
+TIPOS DE REGRA:
+- regex_proibido: padrões que não podem ocorrer (Bronze; motor fundido)
+- faixa: ge/le sobre coluna numérica (opcionalmente inteira)
+- comprimento: min_length/max_length sobre coluna texto
+- dominio: valores permitidos (com normalização opcional 'strip')
+- identidade: coluna = Σ coeficiente × termo, com tolerância
+- data: formato de data (strptime) + padrão regex
+- condicional: se coluna == valor, então outra coluna <= limite
+
+SEMÂNTICA DAS MÁSCARAS:
+True = linha viola (ou não pode ser comprovada válida: tipo inesperado,
+NaN, coluna ausente). Os consumidores tratam essas linhas conforme a
+camada (quarentena na Bronze; reavaliação Pydantic na Silver).
+
+GROUNDING SOURCE:
+- rules.json (data_validation_rules)
+- validate_bronze_quality.py (expectations customizadas)
+- data_reliability_monitor.py (FinancialRecordContract)
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import sys
+import time
+from pathlib import Path
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+# rules.json na raiz do repositório (independe do diretório de execução)
+CAMINHO_REGRAS = Path(__file__).resolve().parent.parent / "rules.json"
+
+SECAO_REGRAS = "data_validation_rules"
+
+# ========================================
+# MÓDULO 1: ESPECIFICAÇÃO
+# ========================================
+
+_especificacao_cache = {}
+
+def carregar_especificacao(caminho=CAMINHO_REGRAS):
+    """
+    Lista de regras declaradas em rules.json (ordem do arquivo).
+
+    Returns
+    -------
+    list
+        Regras (dicts) da seção data_validation_rules
+    """
+    chave = str(caminho)
+    if chave not in _especificacao_cache:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            _especificacao_cache[chave] = json.load(f)[SECAO_REGRAS]['regras']
+    return _especificacao_cache[chave]
+
+
+def regras_da_camada(camada, caminho=CAMINHO_REGRAS):
+    """Regras de uma camada ('bronze' ou 'silver')."""
+    return [regra for regra in carregar_especificacao(caminho) if regra['camada'] == camada]
+
+
+def regra_por_id(id_regra, caminho=CAMINHO_REGRAS):
+    """Regra declarada com o id informado."""
+    for regra in carregar_especificacao(caminho):
+        if regra['id'] == id_regra:
+            return regra
+    raise KeyError(f"Regra não declarada em rules.json: {id_regra}")
+
+
+def padroes_regex(caminho=CAMINHO_REGRAS):
+    """
+    Padrões das regras regex_proibido no formato do motor fundido.
+
+    Returns
+    -------
+    dict
+        {id_regra: [(nome_padrao, regex), ...]}
+    """
+    return {
+        regra['id']: list(regra['padroes'].items())
+        for regra in carregar_especificacao(caminho) if regra['tipo'] == 'regex_proibido'
+    }
+
+
+def restricoes_campo(coluna, camada='silver', caminho=CAMINHO_REGRAS):
+    """
+    Restrições de faixa/comprimento de uma coluna como kwargs de pydantic.Field.
+
+    Examples
+    --------
+    >>> restricoes_campo('country')
+    {'min_length': 3, 'max_length': 100}
+    """
+    restricoes = {}
+    for regra in regras_da_camada(camada, caminho):
+        if regra.get('coluna') != coluna:
+            continue
+        if regra['tipo'] == 'faixa':
+            restricoes.update({k: regra[k] for k in ('ge', 'le') if k in regra})
+        elif regra['tipo'] == 'comprimento':
+            restricoes.update({k: regra[k] for k in ('min_length', 'max_length') if k in regra})
+    return restricoes
+
+
+def valor_esperado_identidade(regra, valores):
+    """
+    Lado direito de uma regra 'identidade' para um registro.
+
+    Parameters
+    ----------
+    regra : dict
+        Regra do tipo identidade
+    valores : dict
+        Valores do registro (ex.: info.data de um validador Pydantic)
+
+    Returns
+    -------
+    float or None
+        None se algum termo estiver ausente
+    """
+    esperado = None
+    for termo, coeficiente in regra['termos'].items():
+        if termo not in valores:
+            return None
+        parcela = coeficiente * valores[termo]
+        esperado = parcela if esperado is None else esperado + parcela
+    return esperado
+
+# ========================================
+# MÓDULO 2: PREDICADOS VETORIZADOS
+# ========================================
+
+def _serie_texto(serie):
+    """True se todos os valores não nulos da coluna são str."""
+    if isinstance(serie.dtype, pd.StringDtype):
+        return True
+    return serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) in ('string', 'empty')
+
+
+def _valores_numericos(serie):
+    """Array float da coluna, ou None se a coluna não for numérica."""
+    if not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return None
+    return serie.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _todas(df):
+    return np.ones(len(df), dtype=bool)
+
+
+def _compilar_faixa(regra):
+    coluna = regra['coluna']
+
+    def predicado(df):
+        valores = _valores_numericos(df[coluna])
+        if valores is None:
+            return _todas(df)
+        with np.errstate(invalid='ignore'):
+            validos = np.isfinite(valores)
+            if regra.get('inteiro'):
+                validos &= np.floor(valores) == valores
+            if 'ge' in regra:
+                validos &= valores >= regra['ge']
+            if 'le' in regra:
+                validos &= valores <= regra['le']
+        return ~validos
+
+    return predicado, [coluna]
+
+
+def _compilar_comprimento(regra):
+    coluna = regra['coluna']
+
+    def predicado(df):
+        serie = df[coluna]
+        if not _serie_texto(serie):
+            return _todas(df)
+        validos = serie.notna().to_numpy(dtype=bool, copy=True)
+        tamanhos = serie.str.len().to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            if 'min_length' in regra:
+                validos &= tamanhos >= regra['min_length']
+            if 'max_length' in regra:
+                validos &= tamanhos <= regra['max_length']
+        return ~validos
+
+    return predicado, [coluna]
+
+
+def _compilar_dominio(regra):
+    coluna = regra['coluna']
+    permitidos = list(regra['valores'])
+
+    def predicado(df):
+        serie = df[coluna]
+        if not _serie_texto(serie):
+            return _todas(df)
+        if regra.get('normalizar') == 'strip':
+            serie = serie.str.strip()
+        return ~serie.isin(permitidos).to_numpy(dtype=bool)
+
+    return predicado, [coluna]
+
+
+def _compilar_identidade(regra):
+    coluna = regra['coluna']
+    termos = list(regra['termos'].items())
+
+    def predicado(df):
+        atual = _valores_numericos(df[coluna])
+        parcelas = [(_valores_numericos(df[termo]), coeficiente) for termo, coeficiente in termos]
+        if atual is None or any(valores is None for valores, _ in parcelas):
+            return _todas(df)
+        # Mesma ordem de operações do validador por registro
+        esperado = parcelas[0][1] * parcelas[0][0]
+        for valores, coeficiente in parcelas[1:]:
+            esperado = esperado + coeficiente * valores
+        with np.errstate(invalid='ignore'):
+            return ~(np.abs(atual - esperado) <= regra['tolerancia'])
+
+    return predicado, [coluna] + [termo for termo, _ in termos]
+
+
+def _compilar_data(regra):
+    coluna = regra['coluna']
+
+    def predicado(df):
+        serie = df[coluna]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return serie.isna().to_numpy(dtype=bool)
+        if not _serie_texto(serie):
+            return _todas(df)
+        formato_ok = serie.str.match(regra['padrao'], na=False).to_numpy(dtype=bool)
+        datas = pd.to_datetime(serie.where(formato_ok), format=regra['formato'], errors='coerce')
+        return ~(formato_ok & datas.notna().to_numpy(dtype=bool))
+
+    return predicado, [coluna]
+
+
+def _compilar_condicional(regra):
+    se, entao = regra['se'], regra['entao']
+
+    def predicado(df):
+        condicao = (df[se['coluna']] == se['igual']).fillna(False).to_numpy(dtype=bool)
+        valores = _valores_numericos(df[entao['coluna']])
+        if valores is None:
+            return condicao
+        with np.errstate(invalid='ignore'):
+            return condicao & ~(valores <= entao['le'])
+
+    return predicado, [se['coluna'], entao['coluna']]
+
+
+def _compilar_regex_proibido(regra):
+    # Import local: bronze_expectation_engine lê os padrões deste módulo
+    from bronze_expectation_engine import MotorExpectativasFundido
+
+    colunas = regra['colunas']
+
+    def predicado(df):
+        alvo = df.columns if colunas == '*' else [c for c in colunas if c in df.columns]
+        violacoes = np.zeros(len(df), dtype=bool)
+        for coluna in alvo:
+            bits, _ = MotorExpectativasFundido.avaliar_coluna(df[coluna], [regra['id']])
+            violacoes |= bits != 0
+        return violacoes
+
+    return predicado, []
+
+
+COMPILADORES = {
+    'faixa': _compilar_faixa,
+    'comprimento': _compilar_comprimento,
+    'dominio': _compilar_dominio,
+    'identidade': _compilar_identidade,
+    'data': _compilar_data,
+    'condicional': _compilar_condicional,
+    'regex_proibido': _compilar_regex_proibido
+}
+
+# ========================================
+# MÓDULO 3: CONJUNTO COMPILADO
+# ========================================
+
+class ConjuntoRegrasCompilado:
+    """
+    Regras declarativas compiladas em predicados vetorizados.
+
+    Parameters
+    ----------
+    regras : list
+        Regras da especificação (ex.: regras_da_camada('silver'))
+
+    Examples
+    --------
+    >>> conjunto = ConjuntoRegrasCompilado(regras_da_camada('silver'))
+    >>> violacoes, tempos = conjunto.avaliar(df)
+    >>> violacoes['sales_identity'].sum()
+    """
+
+    def __init__(self, regras):
+        self.regras = []
+        for regra in regras:
+            if regra['tipo'] not in COMPILADORES:
+                raise ValueError(f"Tipo de regra desconhecido '{regra['tipo']}' ({regra['id']})")
+            predicado, colunas = COMPILADORES[regra['tipo']](regra)
+            self.regras.append((regra, predicado, colunas))
+
+    def avaliar(self, df):
+        """
+        Avalia todas as regras sobre o DataFrame.
+
+        Coluna ausente: todas as linhas contam como violação da regra.
+
+        Returns
+        -------
+        tuple
+            ({id_regra: np.ndarray[bool] de violações}, {id_regra: segundos})
+        """
+        violacoes = {}
+        tempos = {}
+
+        for regra, predicado, colunas in self.regras:
+            inicio = time.perf_counter()
+            if all(coluna in df.columns for coluna in colunas):
+                violacoes[regra['id']] = predicado(df)
+            else:
+                violacoes[regra['id']] = _todas(df)
+            tempos[regra['id']] = time.perf_counter() - inicio
+
+        return violacoes, tempos
+
+    def mascara_validos(self, df):
+        """
+        Linhas sem nenhuma violação.
+
+        Returns
+        -------
+        tuple
+            (np.ndarray[bool], {id_regra: segundos})
+        """
+        violacoes, tempos = self.avaliar(df)
+        validos = np.ones(len(df), dtype=bool)
+        for mascara in violacoes.values():
+            validos &= ~mascara
+        return validos, tempos
+
+
+def imprimir_tempos(tempos, limite=None):
+    """Tempo por regra (ms), da mais lenta para a mais rápida."""
+    ordenados = sorted(tempos.items(), key=lambda item: item[1], reverse=True)
+    for id_regra, segundos in ordenados[:limite]:
+        print(f"      {id_regra:<32} {segundos * 1000:>9.2f} ms")
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Compila as regras de uma camada e avalia um CSV, exibindo violações e tempos.
+
+    USO:
+        python rule_compiler.py [camada] [caminho_csv]
+
+    OUTPUT:
+        - Console (violações e tempo por regra)
+    """
+
+    camada = sys.argv[1] if len(sys.argv) > 1 else 'silver'
+    padrao_csv = "data/02_silver/Financials_Silver.csv" if camada == 'silver' else "data/01_bronze/Financials.csv"
+    caminho = sys.argv[2] if len(sys.argv) > 2 else padrao_csv
+
+    print("=" * 80)
+    print(f"RULE COMPILER - Regras declarativas ({camada})")
+    print("=" * 80)
+    print(f"Arquivo: {caminho}\n")
+
+    df = pd.read_csv(caminho, encoding='utf-8')
+    conjunto = ConjuntoRegrasCompilado(regras_da_camada(camada))
+    violacoes, tempos = conjunto.avaliar(df)
+
+    print(f"📋 {len(conjunto.regras)} regras compiladas | {len(df):,} linhas\n")
+    for id_regra, mascara in violacoes.items():
+        icone = "✅" if not mascara.any() else "❌"
+        print(f"   {icone} {id_regra:<32} violações: {int(mascara.sum()):,}")
+
+    print(f"\n⏱️ Tempo por regra:")
+    imprimir_tempos(tempos)
+    print()
+
+    sys.exit(0)
@@ -640,10 +640,11 @@ if __name__ == "__main__":
     Execução do motor de transformação Bronze → Silver.
     
     USO:
-        python transform_bronze_to_silver.py
+        python transform_bronze_to_silver.py [caminho_bronze]
     
     INPUT:
-        - Financials.csv (Bronze)
+        - Financials.csv (Bronze) ou linhas aprovadas pela quarentena por
+          linha (outputs/approved/bronze_approved_*.csv)
     
     OUTPUT:
         - Financials_Silver.csv (Silver)
@@ -651,7 +652,7 @@ if __name__ == "__main__":
     """
     
     engine = SilverTransformationEngine(
-        caminho_bronze=CAMINHO_BRONZE,
+        caminho_bronze=sys.argv[1] if len(sys.argv) > 1 else CAMINHO_BRONZE,
         caminho_silver=CAMINHO_SILVER
     )
     
@@ -12,6 +12,10 @@ OBJETIVO:
 Validar a qualidade do arquivo Financials.csv antes de ingressar na camada Silver.
 Detectar anomalias críticas que comprometem a integridade dos dados.
 
+REGRAS:
+Padrões e colunas das validações 2-5 declarados em rules.json
+(data_validation_rules, camada bronze; ver rule_compiler.py).
+
 GROUNDING SOURCE:
 - RELATORIO_AUDITORIA_BRONZE.md (Seção: Perfilamento Analítico)
 - Financials.csv (701 linhas, 16 colunas)
@@ -21,17 +25,31 @@ import great_expectations as gx
 from great_expectations.core import ExpectationSuite, ExpectationConfiguration
 from great_expectations.dataset import PandasDataset
 import pandas as pd
+import numpy as np
 import re
+import os
 import sys
+import time
 from datetime import datetime
 import json
 
+from bronze_expectation_engine import MotorExpectativasFundido, REGRAS_EXPECTATIVA, CODIGOS_MOTIVO, decodificar_motivos
+from rule_compiler import regras_da_camada, regra_por_id, imprimir_tempos
+from bronze_byte_prescan import BronzeBytePrescan
+from validation_cache import CacheValidacao, CAMINHO_CACHE_DB
+from parallel_validation import avaliar_paralelo
+from validation_history import HistoricoValidacao, CAMINHO_HISTORICO_DB, imprimir_alertas
+
 # ========================================
 # CONFIGURAÇÕES GLOBAIS
 # ========================================
 
 CAMINHO_CSV = "data/01_bronze/Financials.csv"
 CAMINHO_QUARENTENA = "outputs/quarantine/bronze_failed_{timestamp}.csv"
+CAMINHO_APROVADOS = "outputs/approved/bronze_approved_{timestamp}.csv"
+
+# Modo streaming: linhas por chunk (memória limitada)
+CHUNKSIZE_STREAMING = 100_000
 
 # 16 Colunas obrigatórias conforme documentação
 COLUNAS_OBRIGATORIAS = [
@@ -41,11 +59,8 @@ COLUNAS_OBRIGATORIAS = [
     "Date", "Month Number", "Month Name", "Year"
 ]
 
-# Colunas monetárias que podem conter Lakhs/Crores
-COLUNAS_MONETARIAS = [
-    "Manufacturing Price", "Sale Price", "Gross Sales",
-    "Discounts", " Sales", "COGS", "Profit"
-]
+# Colunas monetárias que podem conter Lakhs/Crores (rules.json)
+COLUNAS_MONETARIAS = regra_por_id('indian_number_notation')['colunas']
 
 # ========================================
 # EXPECTATIONS CUSTOMIZADAS
@@ -87,7 +102,7 @@ class CustomFinancialExpectations:
         
         # Regex para detectar Lakhs/Crores
         # Exemplo: "5,29,550" ou " 5,29,550 " (com espaços)
-        padrao_indiano = r'\d{1,3}(,\d{2})+'
+        padrao_indiano = REGRAS_EXPECTATIVA['indian_number_notation'][0][1]
         
         # Detectar valores suspeitos
         mascara_invalidos = valores_str.str.contains(
@@ -133,7 +148,7 @@ class CustomFinancialExpectations:
         
         # Regex para detectar "$-" com possíveis espaços invisíveis
         # Exemplos: "$-", "$ -", " $- ", "$  -"
-        padrao_dollar_dash = r'\$\s*-'
+        padrao_dollar_dash = REGRAS_EXPECTATIVA['dollar_dash_notation'][0][1]
         
         mascara_invalidos = valores_str.str.contains(
             padrao_dollar_dash, 
@@ -178,7 +193,7 @@ class CustomFinancialExpectations:
         
         # Regex para detectar parênteses com números
         # Exemplos: "$(4,533.75)", " $(4,533.75) ", "$( 4,533.75)"
-        padrao_parenteses = r'\$?\s*\(\s*[\d,\.]+\s*\)'
+        padrao_parenteses = REGRAS_EXPECTATIVA['parentheses_for_negative'][0][1]
         
         mascara_invalidos = valores_str.str.contains(
             padrao_parenteses, 
@@ -227,16 +242,8 @@ class CustomFinancialExpectations:
         
         valores_str = df[column].astype(str)
         
-        # Padrões de caracteres invisíveis
-        padroes_invisiveis = {
-            'zero_width_space': r'\u200B',
-            'non_breaking_space': r'\u00A0',
-            'tab': r'\t',
-            'carriage_return': r'\r',
-            'multiple_spaces': r'  +',  # 2+ espaços consecutivos
-            'leading_whitespace': r'^\s+',
-            'trailing_whitespace': r'\s+$'
-        }
+        # Padrões de caracteres invisíveis (rules.json)
+        padroes_invisiveis = dict(REGRAS_EXPECTATIVA['invisible_characters'])
         
         chars_encontrados = {}
         mascara_invalidos = pd.Series([False] * len(df))
@@ -271,11 +278,25 @@ class BronzeQualityValidator:
     Validador de qualidade para camada Bronze usando Great Expectations.
     """
     
-    def __init__(self, caminho_csv):
+    def __init__(self, caminho_csv, workers=1, historico_db=CAMINHO_HISTORICO_DB):
         self.caminho_csv = caminho_csv
+        self.workers = workers
+        self.historico_db = historico_db
+        self.modo_execucao = 'tudo' if workers <= 1 else f'paralelo_{workers}'
+        self.inicio_execucao = time.perf_counter()
         self.df = None
         self.context = gx.get_context()
         self.custom_expectations = CustomFinancialExpectations()
+        self.motor = None
+        self.motor_invisiveis = None
+        self.prescan = None
+        self.linhas_prescan = None
+        self.modo_streaming = False
+        self.blocos_cache = None
+        self.caminho_cache = None
+        self.linhas_validadas = None
+        self.bytes_validados = None
+        self.quarentena_lote_inteiro = False
         self.resultados = {
             'validacao_bem_sucedida': False,
             'timestamp': datetime.now().isoformat(),
@@ -310,6 +331,220 @@ class BronzeQualityValidator:
             print(f"❌ ERRO ao carregar CSV: {e}")
             sys.exit(1)
     
+    def executar_prescan(self):
+        """
+        PRÉ-VARREDURA: Bytes suspeitos (invisíveis/encoding) via mmap.
+        
+        Se o arquivo estiver limpo, a família "caracteres invisíveis" é
+        dispensada; caso contrário, é avaliada apenas nas linhas afetadas
+        (ou no arquivo inteiro, se o mapeamento linha → registro não for
+        garantido).
+        """
+        print("🔍 PRÉ-VARREDURA: Bytes suspeitos (mmap)")
+        print("-" * 80)
+        
+        self.prescan = BronzeBytePrescan(self.caminho_csv)
+        relatorio = self.prescan.executar()
+        
+        self.resultados['prescan_bytes'] = {
+            'limpo': relatorio['limpo'],
+            'ocorrencias': relatorio['ocorrencias'],
+            'linhas_afetadas': relatorio['linhas_afetadas'],
+            'amostras': relatorio['amostras'][:10],
+            'bom_utf8': relatorio['bom_utf8'],
+            'offset_utf8_invalido': relatorio['offset_utf8_invalido']
+        }
+        
+        if relatorio['limpo']:
+            print("✅ Nenhum byte suspeito - validação de caracteres invisíveis dispensada\n")
+        elif relatorio['requer_verificacao_completa']:
+            print(f"⚠️ Bytes suspeitos: {relatorio['ocorrencias']}")
+            print("   Campos multilinha/linhas em branco/CR - verificação completa por coluna\n")
+        else:
+            print(f"⚠️ Bytes suspeitos: {relatorio['ocorrencias']}")
+            print(f"   Verificação por coluna restrita a {relatorio['linhas_afetadas']} linhas")
+            if relatorio['amostras']:
+                print(f"   Primeira ocorrência: linha {relatorio['amostras'][0]['linha']}, "
+                      f"offset {relatorio['amostras'][0]['offset']}")
+            print()
+        
+        return relatorio
+    
+    def montar_plano_expectativas(self):
+        """
+        Plano {coluna: [regras]} equivalente às validações 2 a 5.
+
+        Returns
+        -------
+        dict
+            Entrada para MotorExpectativasFundido
+        """
+        plano = {coluna: [] for coluna in self.df.columns}
+        
+        # Regras regex_proibido da camada Bronze (rules.json), na ordem declarada
+        for regra in regras_da_camada('bronze'):
+            if regra['tipo'] != 'regex_proibido':
+                continue
+            colunas = self.df.columns if regra['colunas'] == '*' else regra['colunas']
+            for coluna in colunas:
+                if coluna in plano:
+                    plano[coluna].append(regra['id'])
+        
+        return plano
+    
+    def resultado_expectativa(self, coluna, regra):
+        """
+        Resultado de uma expectation a partir da varredura fundida.
+        
+        Na primeira chamada todas as regras de todas as colunas são avaliadas
+        em uma única varredura por coluna (bronze_expectation_engine); as
+        chamadas seguintes apenas consultam os acumuladores.
+        """
+        if self.motor is None:
+            plano = self.montar_plano_expectativas()
+            linhas = self.prescan.linhas_dataframe() if self.prescan is not None else None
+            if linhas is not None and len(linhas) and (linhas.min() < 0 or linhas.max() >= len(self.df)):
+                # Linha física sem registro correspondente: mapeamento inválido
+                print(f"   ⚠️ Pré-varredura aponta linhas fora do DataFrame ({len(self.df)} registros); "
+                      f"verificação completa de caracteres invisíveis")
+                linhas = None
+            
+            if linhas is not None:
+                self.linhas_prescan = linhas
+                # Invisíveis apenas nas linhas apontadas pela pré-varredura
+                for regras in plano.values():
+                    regras.remove('invisible_characters')
+                self.motor_invisiveis = MotorExpectativasFundido(
+                    {coluna: ['invisible_characters'] for coluna in self.df.columns}
+                )
+                self.motor_invisiveis.processar(self.df.iloc[linhas], total_linhas=len(self.df))
+            
+            if self.workers > 1:
+                # Únicos de cada coluna divididos entre processos (serial se não compensar)
+                self.motor, self.resultados['paralelismo'] = avaliar_paralelo(
+                    self.df, plano, max_workers=self.workers
+                )
+            else:
+                self.motor = MotorExpectativasFundido(plano)
+                self.motor.processar(self.df)
+        
+        if regra == 'invisible_characters' and self.motor_invisiveis is not None:
+            return self.motor_invisiveis.resultado(coluna, regra)
+        
+        return self.motor.resultado(coluna, regra)
+    
+    def registrar_tempos_regras(self):
+        """
+        Tempo de execução por regra (motor fundido) em resultados['tempos_regras_ms'].
+        
+        A varredura compartilhada (fatoração + regex combinado por coluna) é
+        reportada à parte como '_varredura_fundida'.
+        """
+        if self.motor is None:
+            return {}
+        
+        tempos = dict(self.motor.tempos_regras)
+        varredura = self.motor.tempo_varredura
+        if self.motor_invisiveis is not None:
+            for regra, segundos in self.motor_invisiveis.tempos_regras.items():
+                tempos[regra] = tempos.get(regra, 0.0) + segundos
+            varredura += self.motor_invisiveis.tempo_varredura
+        tempos['_varredura_fundida'] = varredura
+        
+        self.resultados['tempos_regras_ms'] = {
+            regra: round(segundos * 1000, 3) for regra, segundos in tempos.items()
+        }
+        
+        print("⏱️ TEMPO POR REGRA")
+        print("-" * 80)
+        imprimir_tempos(tempos)
+        print()
+        
+        return tempos
+    
+    def registrar_historico(self, caminho_relatorio=None):
+        """
+        Grava a execução no histórico (SQLite) e alerta regressões.
+        
+        Registra linhas, bytes, duração, linhas com falha e, por regra,
+        duração e falhas; compara vazão e taxa de falha com a baseline móvel
+        do mesmo modo (validation_history.py). Chamado ao fim da execução
+        (após quarentena/relatório): a duração cobre a execução inteira.
+        No modo incremental, linhas e bytes de vazão são apenas os dos
+        blocos revalidados.
+        
+        Parameters
+        ----------
+        caminho_relatorio : str, optional
+            Relatório JSON já salvo; regravado com o registro do histórico
+        """
+        regras = {}
+        linhas = 0
+        linhas_com_falha = 0
+        
+        if self.motor is not None:
+            motores = [self.motor] + ([self.motor_invisiveis] if self.motor_invisiveis is not None else [])
+            for motor in motores:
+                for (coluna, regra), acumulador in motor.acumuladores.items():
+                    regras.setdefault(regra, {'duracao_ms': 0.0, 'falhas': 0})
+                    regras[regra]['falhas'] += acumulador.unexpected_count
+            for regra, duracao_ms in self.resultados.get('tempos_regras_ms', {}).items():
+                regras.setdefault(regra, {'duracao_ms': 0.0, 'falhas': 0})
+                regras[regra]['duracao_ms'] = duracao_ms
+            
+            linhas = self.motor.total_linhas
+            if self.motor_invisiveis is not None:
+                linhas_com_falha = int((self.codigos_motivo() != 0).sum())
+            else:
+                linhas_com_falha = self.motor.linhas_com_falha
+        
+        bytes_lidos = self.bytes_validados
+        if bytes_lidos is None:
+            bytes_lidos = os.path.getsize(self.caminho_csv) if linhas else 0
+        
+        historico = HistoricoValidacao(self.historico_db)
+        execucao_id, alertas = historico.registrar(
+            'bronze', self.modo_execucao, self.caminho_csv,
+            linhas=linhas,
+            bytes_lidos=bytes_lidos,
+            duracao_s=time.perf_counter() - self.inicio_execucao,
+            linhas_com_falha=linhas_com_falha,
+            sucesso=self.resultados['validacao_bem_sucedida'],
+            regras=regras,
+            linhas_validadas=self.linhas_validadas
+        )
+        historico.fechar()
+        
+        self.resultados['historico'] = {'execucao_id': execucao_id, 'alertas': alertas}
+        if caminho_relatorio is not None:
+            with open(caminho_relatorio, 'w', encoding='utf-8') as f:
+                json.dump(self.resultados, f, indent=2, ensure_ascii=False)
+        
+        print(f"📈 HISTÓRICO: execução #{execucao_id} ({self.modo_execucao})")
+        print("-" * 80)
+        imprimir_alertas(alertas)
+        print()
+        
+        return alertas
+    
+    def codigos_motivo(self):
+        """
+        Bitfield de regras violadas por linha do DataFrame carregado.
+        
+        Returns
+        -------
+        np.ndarray
+            int64 por linha (0 = linha limpa); bits em CODIGOS_MOTIVO
+        """
+        if self.motor is None:
+            self.resultado_expectativa(self.df.columns[0], 'invisible_characters')
+        
+        codigos = self.motor.ultimos_codigos.copy()
+        if self.motor_invisiveis is not None:
+            codigos[self.linhas_prescan] |= self.motor_invisiveis.ultimos_codigos
+        
+        return codigos
+    
     def validar_schema(self):
         """
         VALIDAÇÃO 1: Verificar se possui as 16 colunas obrigatórias.
@@ -343,6 +578,8 @@ class BronzeQualityValidator:
                 })
             
             self.resultados['expectations_falhadas'] += 1
+            # Schema inválido: linhas não são confiáveis, lote inteiro vai para quarentena
+            self.quarentena_lote_inteiro = True
             print()
             return False
         
@@ -362,9 +599,7 @@ class BronzeQualityValidator:
         
         for coluna in COLUNAS_MONETARIAS:
             if coluna in self.df.columns:
-                resultado = self.custom_expectations.expect_no_indian_number_notation(
-                    self.df, coluna
-                )
+                resultado = self.resultado_expectativa(coluna, 'indian_number_notation')
                 
                 if not resultado['success']:
                     falhas_encontradas = True
@@ -396,9 +631,7 @@ class BronzeQualityValidator:
         print("-" * 80)
         
         if "Discounts" in self.df.columns:
-            resultado = self.custom_expectations.expect_no_dollar_dash_notation(
-                self.df, "Discounts"
-            )
+            resultado = self.resultado_expectativa("Discounts", 'dollar_dash_notation')
             
             if not resultado['success']:
                 print(f"❌ FALHA: Discounts")
@@ -431,9 +664,7 @@ class BronzeQualityValidator:
         print("-" * 80)
         
         if "Profit" in self.df.columns:
-            resultado = self.custom_expectations.expect_no_parentheses_for_negative(
-                self.df, "Profit"
-            )
+            resultado = self.resultado_expectativa("Profit", 'parentheses_for_negative')
             
             if not resultado['success']:
                 print(f"❌ FALHA: Profit")
@@ -468,9 +699,7 @@ class BronzeQualityValidator:
         falhas_encontradas = False
         
         for coluna in self.df.columns:
-            resultado = self.custom_expectations.expect_no_invisible_characters(
-                self.df, coluna
-            )
+            resultado = self.resultado_expectativa(coluna, 'invisible_characters')
             
             if not resultado['success']:
                 falhas_encontradas = True
@@ -498,7 +727,12 @@ class BronzeQualityValidator:
     def executar_quarentena(self):
         """
         PROTOCOLO DE QUARENTENA:
-        Se qualquer validação falhar, desviar lote para quarentena.
+        Linhas que violam alguma expectation são desviadas para quarentena com
+        o bitfield de motivos ('codigo_motivo') e os nomes das regras
+        ('motivos'); linhas limpas seguem para a Silver em um arquivo aprovado.
+        
+        Schema inválido ou fail-fast abortado: o lote inteiro vai para
+        quarentena (as linhas não são confiáveis).
         """
         print("=" * 80)
         print("🔒 PROTOCOLO DE QUARENTENA ATIVADO")
@@ -511,24 +745,156 @@ class BronzeQualityValidator:
         import os
         os.makedirs('outputs/quarantine', exist_ok=True)
         
-        # Salvar lote falhado
-        self.df.to_csv(caminho_quarentena, index=False)
+        if self.quarentena_lote_inteiro:
+            # Salvar lote falhado (streaming: cópia do arquivo, sem carregá-lo)
+            if self.modo_streaming:
+                import shutil
+                shutil.copyfile(self.caminho_csv, caminho_quarentena)
+            else:
+                self.df.to_csv(caminho_quarentena, index=False)
+            
+            self.resultados['quarentena'] = {'modo': 'lote'}
+            print(f"❌ LOTE DESVIADO PARA QUARENTENA")
+        else:
+            caminho_aprovados = CAMINHO_APROVADOS.format(timestamp=timestamp)
+            os.makedirs('outputs/approved', exist_ok=True)
+            
+            resumo = self._quarentena_por_linha(caminho_quarentena, caminho_aprovados)
+            resumo['modo'] = 'linha'
+            resumo['caminho_aprovados'] = caminho_aprovados
+            self.resultados['quarentena'] = resumo
+            
+            print(f"❌ {resumo['linhas_quarentena']:,} LINHAS DESVIADAS PARA QUARENTENA")
+            print(f"   Motivos: {resumo['linhas_por_motivo']}")
+            print(f"✅ {resumo['linhas_aprovadas']:,} linhas aprovadas para a Silver: {caminho_aprovados}")
         
         # Salvar relatório JSON
         caminho_relatorio = f"outputs/quarantine/report_{timestamp}.json"
         with open(caminho_relatorio, 'w', encoding='utf-8') as f:
             json.dump(self.resultados, f, indent=2, ensure_ascii=False)
         
-        print(f"❌ LOTE DESVIADO PARA QUARENTENA")
         print(f"   Arquivo: {caminho_quarentena}")
         print(f"   Relatório: {caminho_relatorio}")
         print(f"   Expectations falhadas: {self.resultados['expectations_falhadas']}")
         print(f"   Expectations passadas: {self.resultados['expectations_passadas']}\n")
         
-        print("⚠️ AÇÃO NECESSÁRIA: Corrigir anomalias antes de prosseguir para Silver\n")
+        if self.quarentena_lote_inteiro:
+            print("⚠️ AÇÃO NECESSÁRIA: Corrigir anomalias antes de prosseguir para Silver\n")
+        else:
+            print("⚠️ AÇÃO NECESSÁRIA: Corrigir linhas em quarentena; linhas aprovadas seguem para Silver\n")
         
         return caminho_quarentena, caminho_relatorio
     
+    def _quarentena_por_linha(self, caminho_quarentena, caminho_aprovados):
+        """
+        Separa linhas em quarentena (com motivos) e aprovadas.
+        
+        Em memória usa os códigos já calculados; no modo incremental usa os
+        códigos (e trechos já separados) do cache de blocos; no streaming
+        faz uma passada em chunks (memória limitada) para obter os códigos.
+        
+        Returns
+        -------
+        dict
+            linhas_quarentena, linhas_aprovadas, linhas_por_motivo
+        """
+        if self.blocos_cache is not None:
+            return self._quarentena_por_bloco(caminho_quarentena, caminho_aprovados)
+        
+        if self.modo_streaming:
+            plano = self.montar_plano_expectativas()
+            lotes = (
+                (chunk, MotorExpectativasFundido(plano).processar(chunk).ultimos_codigos)
+                for chunk in pd.read_csv(self.caminho_csv, encoding='utf-8', chunksize=CHUNKSIZE_STREAMING)
+            )
+        else:
+            lotes = [(self.df, self.codigos_motivo())]
+        
+        resumo = {
+            'linhas_quarentena': 0,
+            'linhas_aprovadas': 0,
+            'linhas_por_motivo': {regra: 0 for regra in CODIGOS_MOTIVO}
+        }
+        
+        primeiro = True
+        for lote, codigos in lotes:
+            quarentena, aprovados = self._separar_lote(lote, codigos)
+            
+            modo = 'w' if primeiro else 'a'
+            quarentena.to_csv(caminho_quarentena, mode=modo, header=primeiro, index=False)
+            aprovados.to_csv(caminho_aprovados, mode=modo, header=primeiro, index=False)
+            primeiro = False
+            
+            self._contabilizar_motivos(resumo, codigos)
+        
+        return resumo
+    
+    @staticmethod
+    def _separar_lote(lote, codigos, linha_inicial=0):
+        """
+        Divide um lote em (quarentena com motivos, aprovados).
+        
+        `linha_inicial`: linhas antes do lote quando o índice do lote
+        recomeça em 0 (blocos do cache).
+        """
+        falhas = codigos != 0
+        
+        quarentena = lote[falhas].copy()
+        # Linha no CSV de origem (cabeçalho = linha 1), como no monitor
+        quarentena['linha_origem'] = quarentena.index + linha_inicial + 2
+        quarentena['codigo_motivo'] = codigos[falhas]
+        quarentena['motivos'] = decodificar_motivos(codigos[falhas])
+        
+        return quarentena, lote[~falhas]
+    
+    @staticmethod
+    def _contabilizar_motivos(resumo, codigos):
+        """Soma linhas em quarentena, aprovadas e por motivo ao resumo."""
+        falhas = codigos != 0
+        resumo['linhas_quarentena'] += int(falhas.sum())
+        resumo['linhas_aprovadas'] += int((~falhas).sum())
+        for regra, bit in CODIGOS_MOTIVO.items():
+            resumo['linhas_por_motivo'][regra] += int(((codigos & bit) != 0).sum())
+    
+    def _quarentena_por_bloco(self, caminho_quarentena, caminho_aprovados):
+        """
+        Quarentena por linha do modo incremental a partir do cache de blocos.
+        
+        Contagens saem dos códigos de motivo em cache (nenhuma expectation é
+        reexecutada); blocos cujos trechos já foram separados na mesma linha
+        inicial são copiados sem reler o CSV pelo pandas.
+        
+        Returns
+        -------
+        dict
+            linhas_quarentena, linhas_aprovadas, linhas_por_motivo, blocos_reaproveitados
+        """
+        resumo = {
+            'linhas_quarentena': 0,
+            'linhas_aprovadas': 0,
+            'linhas_por_motivo': {regra: 0 for regra in CODIGOS_MOTIVO}
+        }
+        for bloco in self.blocos_cache:
+            self._contabilizar_motivos(resumo, bloco['codigos'])
+        
+        colunas = list(self.df.columns)
+        cache = CacheValidacao(self.caminho_cache)
+        cache.blocos = self.blocos_cache
+        try:
+            with open(caminho_quarentena, 'w', encoding='utf-8', newline='') as saida_quarentena, \
+                 open(caminho_aprovados, 'w', encoding='utf-8', newline='') as saida_aprovados:
+                saida_quarentena.write(pd.DataFrame(
+                    columns=colunas + ['linha_origem', 'codigo_motivo', 'motivos']).to_csv(index=False))
+                saida_aprovados.write(pd.DataFrame(columns=colunas).to_csv(index=False))
+                
+                resumo['blocos_reaproveitados'] = cache.escrever_quarentena(
+                    self.caminho_csv, self._separar_lote, saida_quarentena, saida_aprovados
+                )
+        finally:
+            cache.fechar()
+        
+        return resumo
+    
     def gerar_relatorio_sucesso(self):
         """Gera relatório de sucesso se todas as validações passarem."""
         print("=" * 80)
@@ -554,7 +920,9 @@ class BronzeQualityValidator:
     def validar_tudo(self):
         """Executa todas as validações em sequência."""
         
+        self.inicio_execucao = time.perf_counter()
         self.carregar_dados()
+        self.executar_prescan()
         
         # Executar cada validação
         validacoes = [
@@ -569,13 +937,184 @@ class BronzeQualityValidator:
         todas_passaram = all(validacoes)
         
         self.resultados['validacao_bem_sucedida'] = todas_passaram
+        self.registrar_tempos_regras()
         
+        return self._encerrar(todas_passaram)
+
+    def _encerrar(self, todas_passaram):
+        """
+        Quarentena ou relatório de sucesso e, por último, o histórico.
+        
+        Returns
+        -------
+        tuple
+            (sucesso: bool, caminho da quarentena ou do relatório)
+        """
         if not todas_passaram:
             caminho_quarentena, caminho_relatorio = self.executar_quarentena()
+            self.registrar_historico(caminho_relatorio)
             return False, caminho_quarentena
+        
+        caminho_relatorio = self.gerar_relatorio_sucesso()
+        self.registrar_historico(caminho_relatorio)
+        return True, caminho_relatorio
+    
+    def _validar_cabecalho(self):
+        """
+        Schema a partir apenas do cabeçalho (nrows=0), sem ler o corpo.
+        
+        Returns
+        -------
+        bool
+            False se o schema falhar (lote deve ir para quarentena)
+        """
+        try:
+            self.df = pd.read_csv(self.caminho_csv, encoding='utf-8', nrows=0)
+        except Exception as e:
+            print(f"❌ ERRO ao ler cabeçalho do CSV: {e}")
+            sys.exit(1)
+        
+        self.resultados['total_colunas'] = len(self.df.columns)
+        
+        if not self.validar_schema():
+            self.resultados['validacao_bem_sucedida'] = False
+            return False
+        
+        return True
+    
+    def validar_streaming(self, chunksize=CHUNKSIZE_STREAMING, orcamento_erros=None):
+        """
+        Executa todas as validações em modo streaming, com fail-fast.
+        
+        1. Schema validado apenas pelo cabeçalho (nrows=0); se falhar, o
+           corpo do arquivo nem é lido
+        2. Expectations avaliadas chunk a chunk pelo motor fundido (memória
+           limitada a um chunk)
+        3. Se o número de linhas com falha ultrapassar `orcamento_erros`,
+           a leitura é abortada e o lote vai para quarentena
+        
+        Parameters
+        ----------
+        chunksize : int
+            Linhas por chunk
+        orcamento_erros : int, optional
+            Máximo de linhas com alguma expectation violada (None = sem limite)
+        
+        Returns
+        -------
+        tuple
+            (sucesso: bool, caminho do relatório ou da quarentena)
+        """
+        print("=" * 80)
+        print("BRONZE QUALITY VALIDATOR - Modo Streaming")
+        print("=" * 80)
+        print(f"Arquivo: {self.caminho_csv}")
+        print(f"Chunksize: {chunksize:,} | Orçamento de erros: {orcamento_erros}")
+        print(f"Timestamp: {self.resultados['timestamp']}\n")
+        
+        self.modo_streaming = True
+        self.modo_execucao = 'streaming'
+        self.inicio_execucao = time.perf_counter()
+        
+        if not self._validar_cabecalho():
+            return self._encerrar(False)
+        
+        self.motor = MotorExpectativasFundido(self.montar_plano_expectativas())
+        abortado = False
+        
+        leitor = pd.read_csv(self.caminho_csv, encoding='utf-8', chunksize=chunksize)
+        for numero_chunk, chunk in enumerate(leitor, start=1):
+            self.motor.processar(chunk)
+            print(f"   Chunk {numero_chunk}: {self.motor.total_linhas:,} linhas | "
+                  f"{self.motor.linhas_com_falha:,} com falha")
+            
+            if orcamento_erros is not None and self.motor.linhas_com_falha > orcamento_erros:
+                abortado = True
+                print(f"\n❌ FAIL-FAST: orçamento de erros excedido "
+                      f"({self.motor.linhas_com_falha:,} > {orcamento_erros:,}) - leitura abortada\n")
+                
+                self.resultados['detalhes_falhas'].append({
+                    'validacao': 'fail_fast',
+                    'linhas_avaliadas': self.motor.total_linhas,
+                    'linhas_com_falha': self.motor.linhas_com_falha,
+                    'orcamento_erros': orcamento_erros
+                })
+                self.resultados['expectations_falhadas'] += 1
+                self.quarentena_lote_inteiro = True
+                break
+        
+        if hasattr(leitor, 'close'):
+            leitor.close()
+        
+        return self._concluir_por_motor(abortado)
+    
+    def validar_incremental(self, caminho_cache=CAMINHO_CACHE_DB):
+        """
+        Executa todas as validações reaproveitando o cache de blocos.
+        
+        O arquivo é dividido em blocos alinhados a quebras de linha; blocos
+        cujo hash de conteúdo já foi validado (com a mesma versão das regras)
+        não são relidos pelo pandas. Arquivo inalterado → nenhuma expectation
+        é executada; arquivo com append → apenas os blocos novos.
+        
+        Returns
+        -------
+        tuple
+            (sucesso: bool, caminho do relatório ou da quarentena)
+        """
+        print("=" * 80)
+        print("BRONZE QUALITY VALIDATOR - Modo Incremental (Cache de Blocos)")
+        print("=" * 80)
+        print(f"Arquivo: {self.caminho_csv}")
+        print(f"Cache: {caminho_cache}")
+        print(f"Timestamp: {self.resultados['timestamp']}\n")
+        
+        self.modo_streaming = True
+        self.modo_execucao = 'incremental'
+        self.inicio_execucao = time.perf_counter()
+        
+        if not self._validar_cabecalho():
+            return self._encerrar(False)
+        
+        cache = CacheValidacao(caminho_cache)
+        self.motor, estatisticas = cache.avaliar_arquivo(self.caminho_csv, self.montar_plano_expectativas())
+        self.blocos_cache = cache.blocos
+        self.caminho_cache = caminho_cache
+        cache.fechar()
+        
+        self.resultados['cache_validacao'] = estatisticas
+        self.linhas_validadas = estatisticas['linhas_validadas']
+        self.bytes_validados = estatisticas['bytes_validados']
+        if estatisticas['blocos_cache']:
+            # Custo dominado pelo cache: baseline própria (sem vazão se nada foi revalidado)
+            self.modo_execucao = 'incremental_cache'
+        
+        if estatisticas['blocos'] and estatisticas['blocos_validados'] == 0:
+            print(f"✅ Arquivo inalterado: {estatisticas['blocos']} blocos reaproveitados do cache")
         else:
-            caminho_relatorio = self.gerar_relatorio_sucesso()
-            return True, caminho_relatorio
+            print(f"📦 Blocos: {estatisticas['blocos']} | cache: {estatisticas['blocos_cache']} | "
+                  f"validados: {estatisticas['blocos_validados']} ({estatisticas['bytes_validados']:,} bytes)")
+        
+        return self._concluir_por_motor(abortado=False)
+    
+    def _concluir_por_motor(self, abortado):
+        """Validações 2-5 a partir dos acumuladores do motor (streaming/cache)."""
+        self.resultados['total_linhas'] = self.motor.total_linhas
+        print(f"\n✅ {self.motor.total_linhas:,} linhas avaliadas\n")
+        
+        validacoes = [
+            self.validar_lakhs_crores(),
+            self.validar_dollar_dash(),
+            self.validar_parenteses(),
+            self.validar_caracteres_invisiveis()
+        ]
+        
+        todas_passaram = all(validacoes) and not abortado
+        
+        self.resultados['validacao_bem_sucedida'] = todas_passaram
+        self.registrar_tempos_regras()
+        
+        return self._encerrar(todas_passaram)
 
 # ========================================
 # EXECUÇÃO PRINCIPAL
@@ -587,14 +1126,30 @@ if __name__ == "__main__":
     
     USO:
         python validate_bronze_quality.py
+        python validate_bronze_quality.py --streaming [orcamento_erros]
+        python validate_bronze_quality.py --incremental
+        python validate_bronze_quality.py --workers 8
     
     RETORNO:
         0: Sucesso (todas validações passaram)
         1: Falha (lote em quarentena)
     """
     
-    validador = BronzeQualityValidator(CAMINHO_CSV)
-    sucesso, caminho_output = validador.validar_tudo()
+    workers = 1
+    if '--workers' in sys.argv:
+        workers = int(sys.argv[sys.argv.index('--workers') + 1])
+    
+    validador = BronzeQualityValidator(CAMINHO_CSV, workers=workers)
+    
+    if '--streaming' in sys.argv:
+        # Orçamento só logo após --streaming (valores de outras flags, como --workers 8, não contam)
+        seguinte = sys.argv[sys.argv.index('--streaming') + 1:][:1]
+        orcamento = int(seguinte[0]) if seguinte and not seguinte[0].startswith('--') else None
+        sucesso, caminho_output = validador.validar_streaming(orcamento_erros=orcamento)
+    elif '--incremental' in sys.argv:
+        sucesso, caminho_output = validador.validar_incremental()
+    else:
+        sucesso, caminho_output = validador.validar_tudo()
     
     # Exit code para integração com pipelines (Airflow, etc.)
     sys.exit(0 if sucesso else 1)
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CACHE DE VALIDAÇÃO POR HASH DE CONTEÚDO - CAMADA BRONZE
+Senior Data Quality Engineer - Financial Data Fortress 2026
+
+Autor: Senior Data Quality Engineer
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Evitar revalidar arquivos Bronze já validados (reexecuções, etapas
+downstream). O arquivo é dividido em blocos de tamanho fixo alinhados a
+quebras de linha; cada bloco é identificado pelo SHA-256 do seu conteúdo
+(com o cabeçalho) e os resultados das expectations do bloco ficam em cache:
+- Arquivo inalterado: todos os blocos em cache → validação dispensada
+- Arquivo com append: apenas os blocos novos (e o último bloco parcial
+  anterior) são validados
+- Mudança nas regras: a versão das regras faz parte da chave
+
+QUARENTENA:
+- Cada bloco guarda também o bitfield de motivos por linha; a quarentena
+  por linha do modo incremental não reexecuta expectations
+- Os trechos de quarentena/aprovados gerados para um bloco ficam em cache
+  junto com a linha inicial do bloco; bloco na mesma posição → trechos
+  copiados sem reler o bloco pelo pandas
+
+BLOCOS:
+- Fim do bloco = primeira quebra de linha após o tamanho alvo
+- Estendido até a próxima quebra enquanto houver aspas abertas (campos
+  multilinha nunca são cortados)
+
+PERSISTÊNCIA:
+- metadata/validation_cache.db (SQLite em WAL via metadata_store.conectar:
+  validações concorrentes gravam blocos no mesmo cache)
+
+GROUNDING SOURCE:
+- bronze_expectation_engine.py (acumuladores mergeáveis)
+- data_reliability_monitor.py (padrão de metadados em SQLite)
+- metadata_store.py (conexão WAL com busy timeout, transações IMMEDIATE)
+"""
+
+import pandas as pd
+import hashlib
+import io
+import json
+import mmap
+import numpy as np
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from bronze_expectation_engine import MotorExpectativasFundido, REGRAS_EXPECTATIVA, LIMITE_AMOSTRAS
+from metadata_store import conectar, transacao
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+CAMINHO_CACHE_DB = "metadata/validation_cache.db"
+
+TAMANHO_BLOCO_CACHE = 8 * 1024 * 1024  # 8 MB por bloco
+
+# ========================================
+# MÓDULO 1: CACHE DE BLOCOS
+# ========================================
+
+def versao_regras(plano):
+    """
+    Versão (hash) das regras + plano de expectations.
+
+    Qualquer mudança em padrões, colunas ou limite de amostras invalida o cache.
+    """
+    conteudo = json.dumps({
+        'regras': REGRAS_EXPECTATIVA,
+        'plano': plano,
+        'limite_amostras': LIMITE_AMOSTRAS
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:16]
+
+
+class CacheValidacao:
+    """
+    Cache de resultados de expectations por bloco de conteúdo.
+
+    Examples
+    --------
+    >>> cache = CacheValidacao()
+    >>> motor, estatisticas = cache.avaliar_arquivo(CAMINHO_CSV, plano)
+    >>> motor.resultado('Profit', 'parentheses_for_negative')
+    """
+
+    def __init__(self, db_path=CAMINHO_CACHE_DB, tamanho_bloco=TAMANHO_BLOCO_CACHE):
+        self.db_path = db_path
+        self.tamanho_bloco = tamanho_bloco
+        self.conn = None
+        self.blocos = []
+        self._inicializar_db()
+
+    def _inicializar_db(self):
+        """Cria banco do cache se não existir (WAL, busy timeout)."""
+        self.conn = conectar(self.db_path)
+        with transacao(self.conn):
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS blocos_validados (
+                    hash_bloco TEXT,
+                    versao_regras TEXT,
+                    linhas INTEGER,
+                    resultado TEXT,
+                    codigos BLOB,
+                    data_validacao TEXT,
+                    PRIMARY KEY (hash_bloco, versao_regras)
+                )
+            """)
+            colunas = {linha[1] for linha in self.conn.execute("PRAGMA table_info(blocos_validados)")}
+            if 'codigos' not in colunas:
+                self.conn.execute("ALTER TABLE blocos_validados ADD COLUMN codigos BLOB")
+
+            # Trechos CSV (sem cabeçalho) já separados para a quarentena por linha
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS trechos_quarentena (
+                    hash_bloco TEXT,
+                    versao_regras TEXT,
+                    linha_inicial INTEGER,
+                    quarentena TEXT,
+                    aprovados TEXT,
+                    PRIMARY KEY (hash_bloco, versao_regras)
+                )
+            """)
+
+    def _limites_blocos(self, mapa, inicio_dados, tamanho):
+        """Gera (inicio, fim) de blocos alinhados a quebras de linha."""
+        inicio = inicio_dados
+        while inicio < tamanho:
+            alvo = inicio + self.tamanho_bloco
+            if alvo >= tamanho:
+                fim = tamanho
+            else:
+                quebra = mapa.find(b'\n', alvo)
+                fim = tamanho if quebra == -1 else quebra + 1
+
+            # Não cortar campos entre aspas (multilinha)
+            aspas = mapa[inicio:fim].count(b'"')
+            while aspas % 2 and fim < tamanho:
+                quebra = mapa.find(b'\n', fim)
+                proximo = tamanho if quebra == -1 else quebra + 1
+                aspas += mapa[fim:proximo].count(b'"')
+                fim = proximo
+
+            yield inicio, fim
+            inicio = fim
+
+    def _buscar(self, hash_bloco, versao):
+        cursor = self.conn.execute(
+            "SELECT resultado, codigos FROM blocos_validados WHERE hash_bloco = ? AND versao_regras = ?",
+            (hash_bloco, versao)
+        )
+        linha = cursor.fetchone()
+        # Blocos gravados sem códigos de motivo são revalidados
+        if linha is None or linha[1] is None:
+            return None
+        return json.loads(linha[0]), np.frombuffer(linha[1], dtype=np.int64)
+
+    def _gravar(self, hash_bloco, versao, motor):
+        # Uma transação curta por bloco: o lock de escrita não fica retido
+        # enquanto os blocos seguintes são validados
+        with transacao(self.conn):
+            self.conn.execute("""
+                INSERT OR REPLACE INTO blocos_validados
+                (hash_bloco, versao_regras, linhas, resultado, codigos, data_validacao)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                hash_bloco,
+                versao,
+                motor.total_linhas,
+                json.dumps(motor.para_dict(), ensure_ascii=False),
+                motor.ultimos_codigos.astype(np.int64).tobytes(),
+                datetime.now().isoformat()
+            ))
+
+    def avaliar_arquivo(self, caminho_csv, plano):
+        """
+        Avalia o plano de expectations no arquivo, reaproveitando blocos em cache.
+
+        Parameters
+        ----------
+        caminho_csv : str
+            CSV Bronze
+        plano : dict
+            {coluna: [regras]} (ver MotorExpectativasFundido)
+
+        Returns
+        -------
+        tuple
+            (motor com acumuladores de todo o arquivo, estatísticas do cache)
+
+        Notes
+        -----
+        `self.blocos` recebe, por bloco, hash, posição em bytes, linha
+        inicial e bitfield de motivos por linha (ver escrever_quarentena).
+        """
+
+        versao = versao_regras(plano)
+        motor = MotorExpectativasFundido(plano)
+        estatisticas = {'versao_regras': versao, 'blocos': 0, 'blocos_cache': 0,
+                        'blocos_validados': 0, 'linhas_validadas': 0, 'bytes_validados': 0}
+        self.blocos = []
+
+        tamanho = Path(caminho_csv).stat().st_size
+        if tamanho == 0:
+            return motor, estatisticas
+
+        with open(caminho_csv, 'rb') as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                quebra = mapa.find(b'\n')
+                inicio_dados = tamanho if quebra == -1 else quebra + 1
+                cabecalho = mapa[:inicio_dados]
+
+                for inicio, fim in self._limites_blocos(mapa, inicio_dados, tamanho):
+                    bloco = mapa[inicio:fim]
+                    hash_bloco = hashlib.sha256(cabecalho + bloco).hexdigest()
+                    estatisticas['blocos'] += 1
+
+                    registro = {'hash_bloco': hash_bloco, 'versao_regras': versao,
+                                'inicio': inicio, 'fim': fim, 'linha_inicial': motor.total_linhas}
+
+                    em_cache = self._buscar(hash_bloco, versao)
+                    if em_cache is not None:
+                        resultado, registro['codigos'] = em_cache
+                        motor.merge(MotorExpectativasFundido.de_dict(plano, resultado))
+                        self.blocos.append(registro)
+                        estatisticas['blocos_cache'] += 1
+                        continue
+
+                    df_bloco = pd.read_csv(io.BytesIO(cabecalho + bloco), encoding='utf-8')
+                    motor_bloco = MotorExpectativasFundido(plano).processar(df_bloco)
+                    self._gravar(hash_bloco, versao, motor_bloco)
+                    motor.merge(motor_bloco)
+                    registro['codigos'] = motor_bloco.ultimos_codigos
+                    self.blocos.append(registro)
+
+                    estatisticas['blocos_validados'] += 1
+                    estatisticas['linhas_validadas'] += motor_bloco.total_linhas
+                    estatisticas['bytes_validados'] += fim - inicio
+            finally:
+                mapa.close()
+
+        return motor, estatisticas
+
+    def escrever_quarentena(self, caminho_csv, separar, saida_quarentena, saida_aprovados):
+        """
+        Escreve os trechos de quarentena/aprovados dos blocos de `self.blocos`.
+
+        Trechos em cache para o bloco na mesma linha inicial são copiados;
+        os demais blocos são relidos e separados por `separar` com os códigos
+        de motivo do cache (sem reexecutar expectations) e gravados no cache.
+
+        Parameters
+        ----------
+        caminho_csv : str
+            CSV Bronze avaliado por avaliar_arquivo
+        separar : callable
+            separar(df_bloco, codigos, linha_inicial) -> (quarentena, aprovados),
+            DataFrames a serializar sem cabeçalho
+        saida_quarentena, saida_aprovados : file
+            Arquivos de texto abertos (cabeçalhos já escritos)
+
+        Returns
+        -------
+        int
+            Blocos cujos trechos vieram do cache
+        """
+
+        reaproveitados = 0
+        with open(caminho_csv, 'rb') as f:
+            cabecalho = f.readline()
+
+            for bloco in self.blocos:
+                cursor = self.conn.execute(
+                    "SELECT linha_inicial, quarentena, aprovados FROM trechos_quarentena "
+                    "WHERE hash_bloco = ? AND versao_regras = ?",
+                    (bloco['hash_bloco'], bloco['versao_regras'])
+                )
+                linha = cursor.fetchone()
+                if linha is not None and linha[0] == bloco['linha_inicial']:
+                    saida_quarentena.write(linha[1])
+                    saida_aprovados.write(linha[2])
+                    reaproveitados += 1
+                    continue
+
+                f.seek(bloco['inicio'])
+                conteudo = f.read(bloco['fim'] - bloco['inicio'])
+                df_bloco = pd.read_csv(io.BytesIO(cabecalho + conteudo), encoding='utf-8')
+                quarentena, aprovados = separar(df_bloco, bloco['codigos'], bloco['linha_inicial'])
+                trecho_quarentena = quarentena.to_csv(header=False, index=False)
+                trecho_aprovados = aprovados.to_csv(header=False, index=False)
+
+                saida_quarentena.write(trecho_quarentena)
+                saida_aprovados.write(trecho_aprovados)
+                with transacao(self.conn):
+                    self.conn.execute("""
+                        INSERT OR REPLACE INTO trechos_quarentena
+                        (hash_bloco, versao_regras, linha_inicial, quarentena, aprovados)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (bloco['hash_bloco'], bloco['versao_regras'], bloco['linha_inicial'],
+                          trecho_quarentena, trecho_aprovados))
+
+        return reaproveitados
+
+    def fechar(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Avalia o CSV Bronze com cache de blocos e exibe a taxa de acerto.
+
+    USO:
+        python validation_cache.py [caminho_csv]
+
+    OUTPUT:
+        - metadata/validation_cache.db
+    """
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "data/01_bronze/Financials.csv"
+
+    print("=" * 80)
+    print("VALIDATION CACHE - Blocos por Hash de Conteúdo")
+    print("=" * 80)
+    print(f"Arquivo: {caminho}\n")
+
+    colunas = pd.read_csv(caminho, encoding='utf-8', nrows=0).columns
+    plano = {coluna: ['invisible_characters'] for coluna in colunas}
+
+    cache = CacheValidacao()
+    motor, estatisticas = cache.avaliar_arquivo(caminho, plano)
+    cache.fechar()
+
+    print(f"📦 Blocos: {estatisticas['blocos']} "
+          f"(cache: {estatisticas['blocos_cache']}, validados: {estatisticas['blocos_validados']})")
+    print(f"   Linhas avaliadas: {motor.total_linhas:,} | com falha: {motor.linhas_com_falha:,}\n")
+
+    sys.exit(0)
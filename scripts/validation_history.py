@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HISTÓRICO DE EXECUÇÕES DE VALIDAÇÃO - REGRESSÃO DE VAZÃO E FALHAS
+Data Reliability Engineer (SRE) - Financial Data Fortress 2026
+
+Autor: Data Reliability Engineer (SRE)
+Data: 2026-10-19
+Conformidade: RULE_STRICT_GROUNDING
+
+OBJETIVO:
+Cada execução do validador Bronze e do validador de Data Contract gravava
+apenas um JSON avulso em outputs/reports ou outputs/quarantine, sem histórico
+e sem tempos. Este módulo registra cada execução em SQLite (linhas, bytes,
+duração, vazão, linhas com falha e, por expectation/regra, duração e
+falhas) e compara a execução com a baseline móvel das anteriores:
+- Vazão (linhas/s) abaixo de (1 - QUEDA_VAZAO_MAXIMA) × mediana → alerta
+- Taxa de falha acima de mediana + SALTO_TAXA_FALHA → alerta
+A baseline é por (validador, modo): streaming, incremental e backends do
+contrato têm perfis de custo diferentes. A vazão é medida sobre as linhas
+efetivamente validadas (blocos em cache não contam); execuções servidas
+inteiramente pelo cache não têm vazão e ficam fora da baseline de vazão.
+
+PERSISTÊNCIA:
+- metadata/validation_history.db (SQLite em WAL via metadata_store.conectar:
+  validadores rodando em paralelo gravam no mesmo histórico)
+
+GROUNDING SOURCE:
+- data_reliability_monitor.py (padrão de metadados em SQLite)
+- metadata_store.py (conexão WAL com busy timeout, transações IMMEDIATE)
+- validate_bronze_quality.py (resultados, tempos_regras_ms)
+"""
+
+import numpy as np
+import sys
+from datetime import datetime
+
+from metadata_store import conectar, transacao
+
+# ========================================
+# CONFIGURAÇÕES GLOBAIS
+# ========================================
+
+CAMINHO_HISTORICO_DB = "metadata/validation_history.db"
+
+# Baseline móvel: últimas N execuções do mesmo (validador, modo)
+JANELA_BASELINE = 20
+MIN_EXECUCOES_BASELINE = 5
+
+# Limiares de regressão
+QUEDA_VAZAO_MAXIMA = 0.30   # vazão < 70% da mediana
+SALTO_TAXA_FALHA = 0.05     # +5 pontos percentuais sobre a mediana
+
+# ========================================
+# MÓDULO 1: HISTÓRICO
+# ========================================
+
+class HistoricoValidacao:
+    """
+    Histórico de execuções de validação com detecção de regressões.
+
+    Examples
+    --------
+    >>> historico = HistoricoValidacao()
+    >>> execucao_id, alertas = historico.registrar(
+    ...     'bronze', 'tudo', 'data/01_bronze/Financials.csv',
+    ...     linhas=700, bytes_lidos=180000, duracao_s=0.05,
+    ...     linhas_com_falha=0, sucesso=True,
+    ...     regras={'invisible_characters': {'duracao_ms': 9.1, 'falhas': 0}}
+    ... )
+    """
+
+    def __init__(self, db_path=CAMINHO_HISTORICO_DB):
+        self.db_path = db_path
+        self.conn = None
+        self._inicializar_db()
+
+    def _inicializar_db(self):
+        """Cria banco de histórico se não existir."""
+        self.conn = conectar(self.db_path)
+        with transacao(self.conn):
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS execucoes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    validador TEXT,
+                    modo TEXT,
+                    fonte TEXT,
+                    data_execucao TEXT,
+                    linhas INTEGER,
+                    linhas_validadas INTEGER,
+                    bytes INTEGER,
+                    duracao_s REAL,
+                    linhas_por_segundo REAL,
+                    linhas_com_falha INTEGER,
+                    taxa_falha REAL,
+                    sucesso INTEGER
+                )
+            """)
+            colunas = {linha[1] for linha in self.conn.execute("PRAGMA table_info(execucoes)")}
+            if 'linhas_validadas' not in colunas:
+                self.conn.execute("ALTER TABLE execucoes ADD COLUMN linhas_validadas INTEGER")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS execucoes_regras (
+                    execucao_id INTEGER,
+                    regra TEXT,
+                    duracao_ms REAL,
+                    falhas INTEGER,
+                    PRIMARY KEY (execucao_id, regra)
+                )
+            """)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_execucoes_validador
+                ON execucoes (validador, modo, id)
+            """)
+
+    def registrar(self, validador, modo, fonte, linhas, bytes_lidos, duracao_s,
+                  linhas_com_falha, sucesso, regras=None, linhas_validadas=None):
+        """
+        Grava uma execução e compara com a baseline móvel.
+
+        Parameters
+        ----------
+        validador : str
+            'bronze' ou 'contrato'
+        modo : str
+            Modo/backend da execução (ex.: 'streaming', 'vetorizado')
+        fonte : str
+            Arquivo ou origem validada
+        linhas : int
+            Linhas do lote/arquivo (base da taxa de falha)
+        bytes_lidos : int
+            Bytes efetivamente lidos e validados
+        duracao_s : float
+            Duração de toda a execução
+        linhas_com_falha : int
+            Linhas com ao menos uma violação
+        sucesso : bool
+            Resultado da validação
+        regras : dict, optional
+            {regra: {'duracao_ms': float, 'falhas': int}}
+        linhas_validadas : int, optional
+            Linhas efetivamente revalidadas (base da vazão); padrão: `linhas`.
+            0 (tudo em cache) → execução sem vazão
+
+        Returns
+        -------
+        tuple
+            (execucao_id, alertas: list de dicts)
+        """
+
+        if linhas_validadas is None:
+            linhas_validadas = linhas
+        vazao = linhas_validadas / duracao_s if linhas_validadas and duracao_s > 0 else None
+        taxa_falha = linhas_com_falha / linhas if linhas else 0.0
+
+        # Baseline calculada antes de inserir a execução atual
+        alertas = self.detectar_regressoes(validador, modo, vazao, taxa_falha)
+
+        with transacao(self.conn):
+            cursor = self.conn.execute("""
+                INSERT INTO execucoes
+                (validador, modo, fonte, data_execucao, linhas, linhas_validadas, bytes,
+                 duracao_s, linhas_por_segundo, linhas_com_falha, taxa_falha, sucesso)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                validador, modo, fonte, datetime.now().isoformat(),
+                int(linhas), int(linhas_validadas), int(bytes_lidos), float(duracao_s),
+                vazao, int(linhas_com_falha), taxa_falha, int(bool(sucesso))
+            ))
+            execucao_id = cursor.lastrowid
+
+            self.conn.executemany("""
+                INSERT INTO execucoes_regras (execucao_id, regra, duracao_ms, falhas)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (execucao_id, regra, float(dados.get('duracao_ms', 0.0)), int(dados.get('falhas', 0)))
+                for regra, dados in (regras or {}).items()
+            ])
+
+        return execucao_id, alertas
+
+    def baseline(self, validador, modo, janela=JANELA_BASELINE):
+        """
+        Mediana de vazão e taxa de falha das últimas execuções.
+
+        Returns
+        -------
+        dict or None
+            None se houver menos de MIN_EXECUCOES_BASELINE execuções;
+            vazao_mediana None se menos de MIN_EXECUCOES_BASELINE delas
+            tiverem vazão (execuções servidas pelo cache)
+        """
+        linhas = self.conn.execute("""
+            SELECT linhas_por_segundo, taxa_falha FROM execucoes
+            WHERE validador = ? AND modo = ?
+            ORDER BY id DESC LIMIT ?
+        """, (validador, modo, janela)).fetchall()
+
+        if len(linhas) < MIN_EXECUCOES_BASELINE:
+            return None
+
+        vazoes = np.array([v for v, _ in linhas if v is not None], dtype=float)
+        taxas = np.array([t for _, t in linhas], dtype=float)
+        return {
+            'execucoes': len(linhas),
+            'vazao_mediana': float(np.median(vazoes)) if len(vazoes) >= MIN_EXECUCOES_BASELINE else None,
+            'taxa_falha_mediana': float(np.median(taxas))
+        }
+
+    def detectar_regressoes(self, validador, modo, vazao, taxa_falha):
+        """Alertas de queda de vazão e salto de taxa de falha vs baseline."""
+        referencia = self.baseline(validador, modo)
+        if referencia is None:
+            return []
+
+        alertas = []
+        mediana_vazao = referencia['vazao_mediana']
+        if vazao is not None and mediana_vazao and vazao < (1 - QUEDA_VAZAO_MAXIMA) * mediana_vazao:
+            alertas.append({
+                'tipo': 'QUEDA_VAZAO',
+                'atual': round(vazao, 1),
+                'baseline': round(mediana_vazao, 1),
+                'variacao_percentual': round((vazao / mediana_vazao - 1) * 100, 1)
+            })
+
+        mediana_taxa = referencia['taxa_falha_mediana']
+        if taxa_falha > mediana_taxa + SALTO_TAXA_FALHA:
+            alertas.append({
+                'tipo': 'SALTO_TAXA_FALHA',
+                'atual': round(taxa_falha * 100, 2),
+                'baseline': round(mediana_taxa * 100, 2),
+                'variacao_pontos': round((taxa_falha - mediana_taxa) * 100, 2)
+            })
+
+        return alertas
+
+    def ultimas_execucoes(self, validador=None, limite=10):
+        """Execuções mais recentes (opcionalmente de um validador)."""
+        consulta = """
+            SELECT id, validador, modo, data_execucao, linhas, duracao_s,
+                   linhas_por_segundo, linhas_com_falha, sucesso
+            FROM execucoes
+        """
+        parametros = ()
+        if validador is not None:
+            consulta += " WHERE validador = ?"
+            parametros = (validador,)
+        consulta += " ORDER BY id DESC LIMIT ?"
+        return self.conn.execute(consulta, parametros + (limite,)).fetchall()
+
+    def fechar(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def imprimir_alertas(alertas):
+    """Exibe alertas de regressão (ou confirmação de estabilidade)."""
+    if not alertas:
+        print("   ✅ Sem regressão de vazão ou de taxa de falha vs baseline")
+        return
+    for alerta in alertas:
+        if alerta['tipo'] == 'QUEDA_VAZAO':
+            print(f"   ⚠️ QUEDA DE VAZÃO: {alerta['atual']:,.1f} linhas/s "
+                  f"(baseline {alerta['baseline']:,.1f}; {alerta['variacao_percentual']:+.1f}%)")
+        else:
+            print(f"   ⚠️ SALTO NA TAXA DE FALHA: {alerta['atual']:.2f}% "
+                  f"(baseline {alerta['baseline']:.2f}%; +{alerta['variacao_pontos']:.2f} p.p.)")
+
+# ========================================
+# EXECUÇÃO PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    """
+    Lista as execuções mais recentes registradas no histórico.
+
+    USO:
+        python validation_history.py [validador]
+
+    OUTPUT:
+        - Console
+    """
+
+    validador = sys.argv[1] if len(sys.argv) > 1 else None
+
+    print("=" * 80)
+    print("VALIDATION HISTORY - Execuções Recentes")
+    print("=" * 80 + "\n")
+
+    historico = HistoricoValidacao()
+    for id_, nome, modo, data, linhas, duracao, vazao, falhas, sucesso in historico.ultimas_execucoes(validador):
+        icone = "✅" if sucesso else "❌"
+        vazao_txt = f"{vazao:,.0f}" if vazao is not None else "-"
+        print(f"{icone} #{id_:<5} {data[:19]} {nome}:{modo:<12} {linhas:>10,} linhas "
+              f"{duracao:>8.3f}s {vazao_txt:>12} linhas/s  falhas: {falhas:,}")
+    historico.fechar()
+
+    sys.exit(0)